@@ -50,35 +50,34 @@ class ActivityDelete(ABAction):
         if choice == QtWidgets.QMessageBox.No:
             return
 
-
-
-        # use the activity controller to delete multiple activities
-        for act in activities:
-            db, code = act.key
-
-            try:
-                group_name = ActivityParameter.get(
-                    (ActivityParameter.database == db)
-                    & (ActivityParameter.code == code)
-                ).group
-
-                # remove activity parameters from its group
-                parameters.remove_from_group(group_name, act)
-
-                # Also clear the group if there are no more parameters in it
-                if (
-                    not ActivityParameter.select()
-                    .where(ActivityParameter.group == group_name)
-                    .exists()
-                ):
-                    Group.delete().where(Group.name == group_name).execute()
-                    GroupDependency.delete().where(
-                        GroupDependency.group == group_name
-                    ).execute()
-            except ActivityParameter.DoesNotExist:
-                # no parameters found for this activity
-                pass
-
-            act.upstream().delete()
-
-            act.delete()
+        # delete the activities in a batch, so the metadata is updated once for all of them
+        with bd.databases.batch():
+            for act in activities:
+                db, code = act.key
+
+                try:
+                    group_name = ActivityParameter.get(
+                        (ActivityParameter.database == db)
+                        & (ActivityParameter.code == code)
+                    ).group
+
+                    # remove activity parameters from its group
+                    parameters.remove_from_group(group_name, act)
+
+                    # Also clear the group if there are no more parameters in it
+                    if (
+                        not ActivityParameter.select()
+                        .where(ActivityParameter.group == group_name)
+                        .exists()
+                    ):
+                        Group.delete().where(Group.name == group_name).execute()
+                        GroupDependency.delete().where(
+                            GroupDependency.group == group_name
+                        ).execute()
+                except ActivityParameter.DoesNotExist:
+                    # no parameters found for this activity
+                    pass
+
+                act.upstream().delete()
+
+                act.delete()
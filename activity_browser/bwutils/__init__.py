@@ -3,11 +3,13 @@
 bwutils is a collection of methods that build upon brightway2 and are generic enough to provide here so that we avoid
 re-typing the same code in different parts of the Activity Browser.
 """
+from .activity_index import AB_activity_index
 from .commontasks import cleanup_deleted_bw_projects as cleanup
 from .metadata import AB_metadata
 from .montecarlo import MonteCarloLCA
 from .multilca import MLCA, Contributions
 from .pedigree import PedigreeMatrix
+from .results_cache import AB_results_cache
 from .sensitivity_analysis import GlobalSensitivityAnalysis
 from .superstructure import SuperstructureContributions, SuperstructureMLCA
 from .uncertainty import (CFUncertaintyInterface, ExchangeUncertaintyInterface,
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+from logging import getLogger
+
+from activity_browser.mod import bw2data as bd
+from activity_browser.mod.bw2data.backends import ActivityDataset
+
+log = getLogger(__name__)
+
+
+class ActivityIndex(object):
+    """Bidirectional index between the integer ids and the (database, code) keys of the activities in the project.
+
+    Brightway 2.5 indexes its matrices by activity id, while the Activity Browser works with keys. Instead of a
+    `get_activity` call (and thus a query) per id or key, the index is read from the ActivityDataset table in one query
+    when it is first needed. It is cleared when the project changes or when activities or databases are changed, and
+    read again on the next lookup.
+
+    Ids or keys that are not in the index, like activities that were added after it was read, are queried separately
+    and added to the index.
+    """
+
+    def __init__(self):
+        self._keys = None  # id: key
+        self._ids = None  # key: id
+
+        bd.projects.current_changed.connect(self.clear)
+        bd.databases.records_changed.connect(self.records_changed)
+
+    def clear(self) -> None:
+        self._keys = None
+        self._ids = None
+
+    def records_changed(self, changeset) -> None:
+        # codes can change and ids are reused after deletion, so any change to activities invalidates the index
+        if changeset.activities or changeset.deleted_databases:
+            self.clear()
+
+    def load(self) -> None:
+        query = ActivityDataset.select(
+            ActivityDataset.id, ActivityDataset.database, ActivityDataset.code
+        ).tuples()
+        self._keys = {act_id: (db, code) for act_id, db, code in query}
+        self._ids = {key: act_id for act_id, key in self._keys.items()}
+        log.debug(f"Loaded the activity index with {len(self._keys)} activities")
+
+    def _add(self, act_id: int, key: tuple) -> None:
+        self._keys[act_id] = key
+        self._ids[key] = act_id
+
+    def key(self, act_id: int) -> tuple:
+        """Return the key of the activity with the given id."""
+        if self._keys is None:
+            self.load()
+        if act_id not in self._keys:
+            doc = ActivityDataset.get_by_id(act_id)
+            self._add(doc.id, (doc.database, doc.code))
+        return self._keys[act_id]
+
+    def id(self, key: tuple) -> int:
+        """Return the id of the activity with the given key."""
+        key = tuple(key)
+        if self._ids is None:
+            self.load()
+        if key not in self._ids:
+            self._add(bd.get_activity(key).id, key)
+        return self._ids[key]
+
+    def keys(self, act_ids) -> list:
+        """Return the keys for the given ids, items that are keys already are kept as they are."""
+        return [self.key(i) if isinstance(i, int) else i for i in act_ids]
+
+    def ids(self, keys) -> list:
+        """Return the ids for the given keys."""
+        return [self.id(key) for key in keys]
+
+
+AB_activity_index = ActivityIndex()
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+from logging import getLogger
+
+import numpy as np
+
+from activity_browser.mod import bw2data as bd
+from activity_browser.mod.bw2data.backends import ExchangeDataset
+
+log = getLogger(__name__)
+
+
+def _csr(rows: np.ndarray, n_rows: int, *columns: np.ndarray) -> tuple:
+    """Sort the columns by row and return them with the row pointer, like the indptr of a CSR matrix.
+
+    Unlike a sparse matrix, parallel links between the same activities are kept as separate entries.
+    """
+    order = np.argsort(rows, kind="stable")
+    indptr = np.zeros(n_rows + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n_rows), out=indptr[1:])
+    return (indptr, *(column[order] for column in columns))
+
+
+class TechnosphereAdjacency(object):
+    """Index of the technosphere links between the activities in the project.
+
+    Finding the up- or downstream activities through `activity.technosphere()` or `activity.upstream()` takes a query
+    per activity. Here, the technosphere exchanges from and to a database are read in a single query when an activity
+    of that database is first looked up. They are stored in two CSR structures over the activities of the database:
+    one with the inputs of every activity and one with the activities that consume it. Every link holds the exchange
+    id and the index of the activity on the other end.
+
+    The links of a database are dropped when records of it are changed, and read again on the next lookup.
+    """
+
+    def __init__(self):
+        self._keys = []  # index: key, for the activities on the other end of the links
+        self._indices = {}  # key: index
+        self._databases = {}  # name: (rows, upstream, downstream)
+
+        bd.projects.current_changed.connect(self.clear)
+        bd.databases.records_changed.connect(self.records_changed)
+
+    def clear(self) -> None:
+        self._keys = []
+        self._indices = {}
+        self._databases = {}
+
+    def records_changed(self, changeset) -> None:
+        if changeset.deleted_databases:
+            # other databases hold links to the deleted ones
+            self.clear()
+            return
+        for name in changeset.databases:
+            self._databases.pop(name, None)
+
+    def _index(self, keys) -> np.ndarray:
+        for key in keys:
+            if key not in self._indices:
+                self._indices[key] = len(self._keys)
+                self._keys.append(key)
+        return np.fromiter((self._indices[key] for key in keys), dtype=np.int64, count=len(keys))
+
+    def load(self, database: str) -> None:
+        query = (
+            ExchangeDataset.select(
+                ExchangeDataset.id,
+                ExchangeDataset.input_database,
+                ExchangeDataset.input_code,
+                ExchangeDataset.output_database,
+                ExchangeDataset.output_code,
+            )
+            .where(
+                (ExchangeDataset.type == "technosphere")
+                & (
+                    (ExchangeDataset.input_database == database)
+                    | (ExchangeDataset.output_database == database)
+                )
+            )
+            .tuples()
+        )
+        links = list(query)
+        exc_ids = np.fromiter((link[0] for link in links), dtype=np.int64, count=len(links))
+        inputs = [(link[1], link[2]) for link in links]
+        outputs = [(link[3], link[4]) for link in links]
+
+        # rows for the codes of the activities in this database
+        rows = {}
+        for key in inputs + outputs:
+            if key[0] == database:
+                rows.setdefault(key[1], len(rows))
+
+        # links into activities of this database are upstream links, links from them downstream links
+        upstream = np.array([db == database for db, _ in outputs], dtype=bool)
+        downstream = np.array([db == database for db, _ in inputs], dtype=bool)
+        output_rows = np.array([rows[code] for db, code in outputs if db == database], dtype=np.int64)
+        input_rows = np.array([rows[code] for db, code in inputs if db == database], dtype=np.int64)
+        input_indices, output_indices = self._index(inputs), self._index(outputs)
+
+        self._databases[database] = (
+            rows,
+            _csr(output_rows, len(rows), exc_ids[upstream], input_indices[upstream]),
+            _csr(input_rows, len(rows), exc_ids[downstream], output_indices[downstream]),
+        )
+        log.debug(f"Loaded {len(links)} technosphere links of {database}")
+
+    def _links(self, key: tuple, direction: int) -> (np.ndarray, np.ndarray):
+        if key[0] not in self._databases:
+            self.load(key[0])
+        rows, *csr = self._databases[key[0]]
+        if key[1] not in rows:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+        indptr, exc_ids, indices = csr[direction]
+        row = rows[key[1]]
+        return exc_ids[indptr[row]: indptr[row + 1]], indices[indptr[row]: indptr[row + 1]]
+
+    def upstream(self, key: tuple) -> (list, list):
+        """Return the ids of the technosphere exchanges into the activity and the keys of their inputs."""
+        exc_ids, indices = self._links(tuple(key), 0)
+        return exc_ids.tolist(), [self._keys[i] for i in indices]
+
+    def downstream(self, key: tuple) -> (list, list):
+        """Return the ids of the technosphere exchanges from the activity and the keys of the consuming activities."""
+        exc_ids, indices = self._links(tuple(key), 1)
+        return exc_ids.tolist(), [self._keys[i] for i in indices]
+
+    def inner(self, keys) -> list:
+        """Return the ids of all technosphere exchanges between the given activities."""
+        keys = [tuple(key) for key in keys]
+        members = self._index(keys)
+        exc_ids = []
+        for key in keys:
+            ids, indices = self._links(key, 0)
+            exc_ids.append(ids[np.isin(indices, members)])
+        return np.concatenate(exc_ids).tolist() if exc_ids else []
+
+
+AB_adjacency = TechnosphereAdjacency()
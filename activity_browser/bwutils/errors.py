@@ -132,3 +132,9 @@ class WrongFileTypeImportError(ABError):
     For example a database file with the scenario import dialog, or vice versa."""
 
     pass
+
+
+class SpreadsheetTooLargeError(ABError):
+    """Should be raised when a database has more rows than fit in a single Excel worksheet."""
+
+    pass
@@ -1,5 +1,7 @@
+import csv
 import numbers
 from datetime import datetime as dt
+from itertools import islice
 from pathlib import Path
 from typing import Union
 
@@ -8,7 +10,11 @@ from bw2io.export.csv import reformat
 from bw2io.export.excel import CSVFormatter, create_valid_worksheet_name
 
 from activity_browser.mod import bw2data as bd
+from activity_browser.mod.bw2data.backends import (ActivityDataset,
+                                                   ExchangeDataset)
+from activity_browser.mod.bw2data.parameters import ActivityParameter
 
+from .errors import SpreadsheetTooLargeError
 from .importers import ABPackage
 from .pedigree import PedigreeMatrix
 
@@ -20,9 +26,32 @@ from .pedigree import PedigreeMatrix
 #  - Add code to ensure no second 'activity' field is exported, as this
 #  messes with following import.
 
+EXCEL_MAX_ROWS = 1048576
+
 
 class ABCSVFormatter(CSVFormatter):
-    def get_activity_metadata(self, act):
+    """Formats a database for export like the CSVFormatter, but streams the rows.
+
+    The activities are read in chunks of CHUNK_SIZE, and the exchanges, input activities and parameters of every
+    chunk in a single query each, instead of a few queries per activity.
+    """
+
+    CHUNK_SIZE = 500
+    INPUT_FIELDS = (
+        "name",
+        "unit",
+        "location",
+        "categories",
+        "database",
+        "reference product",
+    )
+
+    def __init__(self, database_name, objs=None):
+        super().__init__(database_name, objs)
+        self.given_objs = objs
+        self.inputs = {}  # key: INPUT_FIELDS of the input activities read so far
+
+    def get_activity_metadata(self, act: dict) -> dict:
         excluded = {"database", "name", "activity"}
         return {
             "name": act.get("name"),
@@ -33,32 +62,189 @@ class ABCSVFormatter(CSVFormatter):
                     if k not in excluded and not isinstance(v, (dict, list))
                 ]
             ),
-            "parameters": self.get_activity_parameters(act),
         }
 
-    def exchange_as_dict(self, exc):
+    def exchange_as_dict(self, exc: dict, inp: dict) -> dict:
         """Same as CSVFormatter, but explicitly pull the database from the
         input activity.
 
         This ensures that the database value is always included, even when
-        it is not stored in the exchange _data.
+        it is not stored in the exchange data.
         """
-        inp = exc.input
-        inp_fields = (
-            "name",
-            "unit",
-            "location",
-            "categories",
-            "database",
-            "reference product",
-        )
         skip_fields = ("input", "output")
-        data = {k: v for k, v in exc._data.items() if k not in skip_fields}
+        data = {k: v for k, v in exc.items() if k not in skip_fields}
         if "product" in data and "reference product" not in data:
             data["reference product"] = data.pop("product")
-        data.update(**{k: inp[k] for k in inp_fields if inp.get(k)})
+        data.update(**{k: v for k, v in inp.items() if v})
         return data
 
+    def count_activities(self) -> int:
+        if self.given_objs is None:
+            return len(self.db)
+        try:
+            return len(self.given_objs)
+        except TypeError:
+            return 0
+
+    def iter_activity_chunks(self):
+        """Yield the data of the activities in lists of CHUNK_SIZE, read through a single cursor."""
+        if self.given_objs is None:
+            query = (
+                ActivityDataset.select(ActivityDataset.data)
+                .where(ActivityDataset.database == self.db.name)
+                .order_by(ActivityDataset.name)
+                .tuples()
+            )
+            activities = (data for data, in query.iterator())
+        else:
+            activities = (obj.as_dict() for obj in self.given_objs)
+        while chunk := list(islice(activities, self.CHUNK_SIZE)):
+            yield chunk
+
+    def read_inputs(self, keys) -> None:
+        """Read the INPUT_FIELDS of the activities that weren't read before, in a query per database."""
+        missing = {}
+        for db, code in set(keys).difference(self.inputs):
+            missing.setdefault(db, []).append(code)
+        for db, codes in missing.items():
+            for i in range(0, len(codes), self.CHUNK_SIZE):
+                query = ActivityDataset.select(
+                    ActivityDataset.code, ActivityDataset.data
+                ).where(
+                    (ActivityDataset.database == db)
+                    & (ActivityDataset.code << codes[i: i + self.CHUNK_SIZE])
+                )
+                for code, data in query.tuples():
+                    self.inputs[(db, code)] = {f: data.get(f) for f in self.INPUT_FIELDS}
+
+    def get_exchanges_many(self, codes: list) -> dict:
+        """Return the ordered exchanges of the activities with codes, read in a single query."""
+        query = ExchangeDataset.select(
+            ExchangeDataset.output_code,
+            ExchangeDataset.input_database,
+            ExchangeDataset.input_code,
+            ExchangeDataset.data,
+        ).where(
+            (ExchangeDataset.output_database == self.db.name)
+            & (ExchangeDataset.output_code << codes)
+        ).order_by(ExchangeDataset.id)
+        rows = list(query.tuples())
+        self.read_inputs((row[1], row[2]) for row in rows)
+
+        exchanges = {}
+        for output_code, input_db, input_code, data in rows:
+            inp = self.inputs.get((input_db, input_code), {})
+            exchanges.setdefault(output_code, []).append(self.exchange_as_dict(data, inp))
+        for code, excs in exchanges.items():
+            excs.sort(key=lambda x: (x.get("type"), x.get("name")))
+            exchanges[code] = self.order_dicts(excs)
+        return exchanges
+
+    def get_activity_parameters_many(self, codes: list) -> dict:
+        """Return the parameters of the activities with codes, read in a single query.
+
+        Like `CSVFormatter.get_activity_parameters`, only the parameters of the exported activities are included, not
+        the other parameters of their groups.
+        """
+        query = ActivityParameter.select().where(
+            (ActivityParameter.database == self.db.name)
+            & (ActivityParameter.code << codes)
+        )
+        parameters = {}
+        for param in query:
+            parameters.setdefault(param.code, []).append(param)
+        result = {}
+        for code, params in parameters.items():
+            result[code] = self.order_dicts([p.dict for p in params], "parameter")
+            result[code]["group"] = params[0].group
+        return result
+
+    def count_rows(self) -> int:
+        """Return the least number of rows the export takes: three per activity and one per exchange."""
+        if self.given_objs is not None:
+            return 3 * self.count_activities()
+        exchanges = (
+            ExchangeDataset.select()
+            .where(ExchangeDataset.output_database == self.db.name)
+            .count()
+        )
+        return 3 * self.count_activities() + exchanges
+
+    def get_formatted_data(self, sections=None) -> list:
+        return list(self.iter_formatted_data(sections))
+
+    def iter_formatted_data(self, sections=None, progress=None):
+        """Yield the rows of get_formatted_data one by one.
+
+        Progress is reported after every chunk of activities, by calling
+        progress with the number of activities done and the total.
+        """
+        if sections is None:
+            sections = [
+                "project parameters",
+                "database",
+                "database parameters",
+                "activities",
+                "activity parameters",
+                "exchanges",
+            ]
+
+        db = self.get_database_metadata()
+        if db["project parameters"] and "project parameters" in sections:
+            yield ["Project parameters"]
+            yield db["project parameters"]["columns"]
+            yield from db["project parameters"]["data"]
+            yield []
+
+        if "database" in sections:
+            yield ["Database", db["name"]]
+            yield from db["metadata"]
+            yield []
+
+        if db["parameters"] and "database parameters" in sections:
+            yield ["Database parameters"]
+            yield db["parameters"]["columns"]
+            yield from db["parameters"]["data"]
+            yield []
+
+        if "activities" not in sections:
+            return
+        total = self.count_activities()
+        done = 0
+        for chunk in self.iter_activity_chunks():
+            codes = [act["code"] for act in chunk]
+            parameters = (
+                self.get_activity_parameters_many(codes)
+                if "activity parameters" in sections
+                else {}
+            )
+            exchanges = self.get_exchanges_many(codes) if "exchanges" in sections else {}
+
+            for act in chunk:
+                metadata = self.get_activity_metadata(act)
+                yield ["Activity", metadata["name"]]
+                yield from metadata["metadata"]
+
+                params = parameters.get(act["code"])
+                if params:
+                    yield ["Parameters", params["group"]]
+                    yield params["columns"]
+                    yield from params["data"]
+                    yield []
+
+                if "exchanges" in sections:
+                    yield ["Exchanges"]
+                    excs = exchanges.get(act["code"])
+                    if excs:
+                        yield excs["columns"]
+                        yield from excs["data"]
+
+                yield []
+
+            done += len(chunk)
+            if progress:
+                progress(done, max(total, done))
+
 
 def format_pedigree(data: dict) -> str:
     """Converts pedigree dict to tuple."""
@@ -76,7 +262,16 @@ def frmt_str(data: Union[str, dict]) -> str:
     return format_pedigree(data) if isinstance(data, dict) else str(data)
 
 
-def write_lci_excel(db_name: str, path: str, objs=None, sections=None) -> Path:
+def lci_export_path(db_name: str, path: str, suffix: str) -> Path:
+    path = Path(path)
+    if not path.suffix == suffix:
+        return path / "lci-{}{}".format(bd.utils.safe_filename(db_name, False), suffix)
+    return path
+
+
+def write_lci_excel(
+    db_name: str, path: str, objs=None, sections=None, progress=None
+) -> Path:
     """Export database `database_name` to an Excel spreadsheet.
 
     Not all data can be exported. The following constraints apply:
@@ -84,17 +279,27 @@ def write_lci_excel(db_name: str, path: str, objs=None, sections=None) -> Path:
     * Nested data, e.g. `{'foo': {'bar': 'baz'}}` are excluded. Spreadsheets are not a great format for nested data.
       However, *tuples* are exported, and the characters `::` are used to join elements of the tuple.
     * The only well-supported data types are strings, numbers, and booleans.
+    * A worksheet holds at most 1,048,576 rows, larger databases should be exported with `write_lci_csv`. A
+      SpreadsheetTooLargeError is raised before writing if the database clearly doesn't fit, or as soon as the limit
+      is reached.
+
+    The workbook is written row by row in constant memory. Progress is reported by calling `progress` with the
+    number of activities done and the total.
 
     Returns the filepath of the exported file.
 
     """
-    path = Path(path)
-    if not path.suffix == ".xlsx":
-        out_file = path / "lci-{}.xlsx".format(bd.utils.safe_filename(db_name, False))
-    else:
-        out_file = path
+    out_file = lci_export_path(db_name, path, ".xlsx")
+    formatter = ABCSVFormatter(db_name, objs)
+    too_large = SpreadsheetTooLargeError(
+        f"Database '{db_name}' is too large for a spreadsheet, export it as CSV instead."
+    )
+    if formatter.count_rows() > EXCEL_MAX_ROWS:
+        raise too_large
 
-    workbook = xlsxwriter.Workbook(out_file, {"nan_inf_to_errors": True})
+    workbook = xlsxwriter.Workbook(
+        out_file, {"nan_inf_to_errors": True, "constant_memory": True}
+    )
     bold = workbook.add_format({"bold": True})
     bold.set_font_size(12)
     highlighted = {
@@ -109,9 +314,14 @@ def write_lci_excel(db_name: str, path: str, objs=None, sections=None) -> Path:
 
     sheet = workbook.add_worksheet(create_valid_worksheet_name(db_name))
 
-    data = ABCSVFormatter(db_name, objs).get_formatted_data(sections)
+    data = formatter.iter_formatted_data(sections, progress)
 
     for row_index, row in enumerate(data):
+        # the up front count leaves out the parameters and metadata rows
+        if row_index >= EXCEL_MAX_ROWS:
+            workbook.close()
+            out_file.unlink()
+            raise too_large
         for col_index, value in enumerate(row):
             if value is None:
                 continue
@@ -125,6 +335,36 @@ def write_lci_excel(db_name: str, path: str, objs=None, sections=None) -> Path:
     return out_file
 
 
+def write_lci_csv(
+    db_name: str, path: str, objs=None, sections=None, progress=None
+) -> Path:
+    """Export database `database_name` to a CSV file, with the same layout as `write_lci_excel`.
+
+    Unlike a spreadsheet, the CSV file has no limit on the number of rows. The rows are written as they are read, so
+    the memory use doesn't grow with the size of the database.
+
+    Returns the filepath of the exported file.
+
+    """
+    out_file = lci_export_path(db_name, path, ".csv")
+
+    data = ABCSVFormatter(db_name, objs).iter_formatted_data(sections, progress)
+
+    with open(out_file, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        for row in data:
+            writer.writerow(
+                [
+                    value
+                    if value is None or isinstance(value, numbers.Number)
+                    else frmt_str(value)
+                    for value in row
+                ]
+            )
+
+    return out_file
+
+
 def store_database_as_package(db_name: str, directory: str = None) -> bool:
     """Attempt to use `bw.BW2Package` to save the given database as an
     isolated package that can be shared with others.
@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+from heapq import heappop, heappush
+from logging import getLogger
+from typing import Callable, Optional
+
+import numpy as np
+from scipy.sparse.linalg import splu
+
+from activity_browser.mod import bw2data as bd
+
+from .activity_index import AB_activity_index
+from .results_cache import estimate_size
+
+log = getLogger(__name__)
+
+
+class ABGraphTraversal(object):
+    """Traverse a supply chain, following the paths of greatest impact.
+
+    Like brightway's GraphTraversal, the supply chain is traversed 'importance-first': activities are taken from a heap
+    ordered by their cumulative score, and their inputs are added to the graph as long as their cumulative score is
+    above the cutoff, until the heap is empty or max_calc inputs have been assessed.
+
+    Brightway solves the technosphere for every assessed input. Here the cumulative scores of all activities are
+    calculated up front, with a single solve of the transposed technosphere against the characterized biosphere, so
+    the traversal itself only consists of lookups. The state of the traversal is kept: it can be continued with a
+    lower cutoff, and results for a higher cutoff are filtered from it instead of calculated. The calculations made
+    so far count towards max_calc, so results are only reproducible when max_calc stays the same.
+
+    Results have the format of brightway's GraphTraversal: a dict of nodes by technosphere index, in which the
+    reference flow is -1, a list of edges and the number of assessed inputs.
+    """
+
+    PROGRESS_INTERVAL = 50  # activities expanded between progress calls
+
+    def __init__(self, lca, demand: Optional[dict] = None, skip_coproducts: bool = False):
+        """Prepare the traversal of a calculated LCA, `demand` defaults to the demand of the LCA.
+
+        The matrices are copied, so the LCA object can be reused for other calculations afterwards.
+        """
+        self.score = float(lca.score)
+        if self.score == 0:
+            raise ValueError("Zero total LCA score makes traversal impossible")
+
+        self.technosphere = lca.technosphere_matrix.tocsc(copy=True)
+        self.technosphere.sum_duplicates()
+        self.production = self.technosphere.diagonal()
+        self.supply = np.array(lca.supply_array, copy=True)
+        self.activity_dict = dict(lca.activity_dict)
+        self.skip_coproducts = skip_coproducts
+
+        # score of the direct flows of one unit of every activity
+        self.characterized_biosphere = np.asarray(
+            (lca.characterization_matrix @ lca.biosphere_matrix).sum(axis=0)
+        ).ravel()
+        # cumulative scores of all activities from a single solve, as characterized_biosphere . A^-1 e_i equals
+        # (A^-T characterized_biosphere)_i
+        unit_scores = splu(self.technosphere).solve(self.characterized_biosphere, trans="T")
+        self.cumulative = self.supply * self.production * unit_scores
+
+        self.static = self._static_activities()
+
+        self.cutoff = None
+        self.counter = 0
+        self.heap = []
+        self.pruned = []  # inputs that did not pass the cutoff, as (parent, child, amount)
+        self.nodes = {-1: {"amount": 1, "cum": self.score, "ind": 1e-6 * self.score}}
+        self.edges = []
+        self._initialize(lca.demand if demand is None else demand)
+
+    @property
+    def nbytes(self) -> int:
+        """Estimated memory use of the traversal, for the results cache."""
+        arrays = (
+            self.technosphere.data,
+            self.technosphere.indices,
+            self.technosphere.indptr,
+            self.production,
+            self.supply,
+            self.characterized_biosphere,
+            self.cumulative,
+        )
+        return sum(array.nbytes for array in arrays) + sum(
+            estimate_size(state) for state in (self.activity_dict, self.heap, self.pruned, self.nodes, self.edges)
+        )
+
+    def _index(self, key) -> int:
+        key = getattr(key, "key", key)  # activity proxies
+        try:
+            return self.activity_dict[key]
+        except KeyError:
+            # bw25 compatibility
+            return self.activity_dict[AB_activity_index.id(key)]
+
+    def _static_activities(self) -> set:
+        """Return the indices of activities in static databases, their inputs are not traversed."""
+        static = {name for name in bd.databases if bd.databases[name].get("static")}
+        if not static:
+            return set()
+        keys = AB_activity_index.keys(self.activity_dict.keys())
+        return {
+            index for key, index in zip(keys, self.activity_dict.values()) if key[0] in static
+        }
+
+    def _node(self, index: int) -> dict:
+        return {
+            # supply of this activity, as reported by brightway
+            "amount": float(self.supply[index]),
+            # cumulative score from all flows of this activity
+            "cum": float(self.cumulative[index]),
+            # individual score attributable to the direct flows of this activity
+            "ind": float(self.characterized_biosphere[index] * self.supply[index]),
+        }
+
+    def _initialize(self, demand: dict) -> None:
+        for key, amount in demand.items():
+            index = self._index(key)
+            cumulative = float(self.cumulative[index])
+            heappush(self.heap, (-abs(cumulative), index))
+            self.nodes[index] = self._node(index)
+            self.edges.append(
+                {
+                    "to": -1,
+                    "from": index,
+                    "amount": amount,
+                    "exc_amount": amount,
+                    "impact": cumulative * amount / float(self.supply[index]),
+                }
+            )
+
+    def _assess(self, parent: int, child: int, amount: float, limit: float) -> None:
+        """Add the input of child into parent to the graph if it passes the limit, otherwise keep it for later."""
+        cumulative = self.cumulative[child]
+        if abs(cumulative) < limit:
+            self.pruned.append((parent, child, amount))
+            return
+
+        # flow between child and parent, scaled to the supply of the parent
+        flow = amount * self.production[parent] * self.supply[parent]
+        total_output = self.production[child] * self.supply[child]
+        self.edges.append(
+            {
+                "to": parent,
+                "from": child,
+                "amount": float(flow),
+                "exc_amount": amount,
+                "impact": float(flow / total_output * cumulative),
+            }
+        )
+        # multiple incoming edges are kept, but existing nodes are not added again
+        if child not in self.nodes:
+            self.nodes[child] = self._node(child)
+            heappush(self.heap, (-abs(cumulative), child))
+
+    def traverse(
+        self,
+        cutoff: float = 0.005,
+        max_calc: float = 1e5,
+        progress: Optional[Callable[[int], None]] = None,
+    ) -> dict:
+        """Traverse the supply chain and return the graph for the given cutoff.
+
+        The traversal continues where a previous call stopped. With a lower cutoff than before, the inputs that were
+        cut off are assessed again first. With a higher cutoff, the graph is filtered from the existing traversal.
+        `progress` is called with the number of assessed inputs while traversing.
+        """
+        if self.cutoff is None or cutoff < self.cutoff:
+            self.cutoff = cutoff
+            limit = abs(self.score * cutoff)
+            pruned, self.pruned = self.pruned, []
+            for parent, child, amount in pruned:
+                self._assess(parent, child, amount, limit)
+        limit = abs(self.score * self.cutoff)
+
+        indptr, indices, data = (
+            self.technosphere.indptr,
+            self.technosphere.indices,
+            self.technosphere.data,
+        )
+        expanded = 0
+        while self.heap:
+            if self.counter >= max_calc:
+                log.warning("Stopping traversal due to calculation count.")
+                break
+            _, parent = heappop(self.heap)
+            # skip links from static databases
+            if parent in self.static:
+                continue
+
+            # assume that this activity produces its reference product
+            scale = self.production[parent]
+            if scale == 0:
+                raise ValueError("Can't rescale activities that produce zero reference product")
+
+            for child, value in zip(
+                indices[indptr[parent]: indptr[parent + 1]],
+                data[indptr[parent]: indptr[parent + 1]],
+            ):
+                # skip values on technosphere diagonal
+                if child == parent:
+                    continue
+                # multiply by -1 because technosphere values are negative (consumption of inputs) and rescale
+                amount = float(-value / scale)
+                # skip negative coproducts
+                if self.skip_coproducts and amount <= 0:
+                    continue
+                self.counter += 1
+                self._assess(parent, int(child), amount, limit)
+
+            expanded += 1
+            if progress and expanded % self.PROGRESS_INTERVAL == 0:
+                progress(self.counter)
+
+        return self.result(cutoff)
+
+    def result(self, cutoff: float) -> dict:
+        """Return the nodes and edges of the traversal that pass the given cutoff.
+
+        With a cutoff higher than the one traversed with, only nodes that can still be reached from the reference flow
+        through other nodes that pass the cutoff are kept.
+        """
+        limit = abs(self.score * cutoff)
+        passing = {
+            index for index, node in self.nodes.items() if index == -1 or abs(node["cum"]) >= limit
+        }
+        children = {}
+        for edge in self.edges:
+            if edge["from"] in passing and edge["to"] in passing:
+                children.setdefault(edge["to"], []).append(edge["from"])
+
+        reached, queue = {-1}, [-1]
+        while queue:
+            for child in children.get(queue.pop(), []):
+                if child not in reached:
+                    reached.add(child)
+                    queue.append(child)
+
+        return {
+            "nodes": {index: node for index, node in self.nodes.items() if index in reached},
+            "edges": [
+                edge for edge in self.edges if edge["from"] in reached and edge["to"] in reached
+            ],
+            "counter": self.counter,
+        }
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 from logging import getLogger
+from typing import Iterator
 
 import numpy as np
 import pandas as pd
@@ -7,7 +8,9 @@ from bw2data.errors import UnknownObject
 
 import activity_browser.bwutils.commontasks as bc
 from activity_browser.mod import bw2data as bd
-from activity_browser.mod.bw2data.backends import ActivityDataset
+from activity_browser.mod.bw2data.backends import Activity, ActivityDataset
+
+from .searchengine import MetaDataSearchEngine
 
 # todo: extend store over several projects
 
@@ -36,6 +39,7 @@ class MetaDataStore(object):
     Properties
     ----------
     index
+    version
 
     """
     # Options for reading classification systems from ecoinvent databases are
@@ -50,6 +54,8 @@ class MetaDataStore(object):
     def __init__(self):
         self.dataframe = pd.DataFrame()
         self.databases = set()
+        self.version = 0
+        self.search_engine = MetaDataSearchEngine(self)
 
         bd.projects.current_changed.connect(self.reset_metadata)
         bd.databases.metadata_changed.connect(self.check_databases)
@@ -107,6 +113,7 @@ class MetaDataStore(object):
         self.dataframe.replace(
             np.nan, "", regex=True, inplace=True
         )  # replace 'nan' values with emtpy string
+        self.version += 1
         # print('Dimensions of the Metadata:', self.dataframe.shape)
 
     def update_metadata(self, key: tuple) -> None:
@@ -131,6 +138,7 @@ class MetaDataStore(object):
             # Situation 1: activity has been deleted (metadata needs to be deleted)
             log.debug(f"Deleting activity from metadata: {key}")
             self.dataframe.drop(key, inplace=True, errors="ignore")
+            self.version += 1
             # print('Dimensions of the Metadata:', self.dataframe.shape)
             return
 
@@ -153,6 +161,7 @@ class MetaDataStore(object):
                     else:
                         self.dataframe.at[key, col] = act.get(col, '')
                 self.dataframe.at[key, 'key'] = act.key
+                self.version += 1
 
             else:  # Situation 3: Activity has been added to database (metadata needs to be generated)
                 log.debug(f'Adding activity to metadata: {key}')
@@ -164,20 +173,70 @@ class MetaDataStore(object):
                 self.dataframe.replace(
                     np.nan, "", regex=True, inplace=True
                 )  # replace 'nan' values with emtpy string
+                self.version += 1
             # print('Dimensions of the Metadata:', self.dataframe.shape)
 
+    def update_metadata_many(self, keys: set) -> None:
+        """Update metadata for many changed activities at once, e.g. after a batch of changes.
+
+        Instead of a lookup and a concat per activity like `update_metadata`, the affected activities are read with one
+        query per database. Their old rows are dropped and the new rows are concatenated in one go.
+
+        Parameters
+        ----------
+        keys : set
+            The activities to update in the MetaDataStore, deleted activities are removed
+        """
+        keys = {tuple(key) for key in keys}
+        new_dbs = {db for db, _ in keys if db not in self.databases and db in bd.databases}
+        keys = {key for key in keys if key[0] in self.databases}
+
+        data = []
+        for db in {db for db, _ in keys}:
+            codes = [code for key_db, code in keys if key_db == db]
+            # chunked to stay below the SQLite variable limit
+            for i in range(0, len(codes), 500):
+                query = ActivityDataset.select().where(
+                    (ActivityDataset.database == db)
+                    & (ActivityDataset.code << codes[i : i + 500])
+                )
+                data.extend(Activity(doc).as_dict() for doc in query)
+
+        if keys:
+            # drops deleted activities and the old version of modified ones
+            self.dataframe = self.dataframe.drop(list(keys), errors="ignore")
+
+        if data:
+            df = pd.DataFrame(data)
+            df["key"] = list(zip(df["database"], df["code"]))
+            df.index = pd.MultiIndex.from_tuples(df["key"])
+            if "classifications" in df.columns:
+                df = self.unpack_classifications(df, self.CLASSIFICATION_SYSTEMS)
+            if "categories" in df.columns:
+                df["categories"] = df.loc[:, "categories"].apply(list_to_tuple)
+            self.dataframe = pd.concat([self.dataframe, df], sort=False)
+            self.dataframe.replace(np.nan, "", regex=True, inplace=True)
+
+        if keys:
+            self.version += 1
+        if new_dbs:
+            self.add_metadata(new_dbs)
+
     def reset_metadata(self) -> None:
         """Deletes metadata when the project is changed."""
         # todo: metadata could be collected across projects...
         log.debug("Reset metadata.")
         self.dataframe = pd.DataFrame()
         self.databases = set()
+        self.version += 1
 
     def check_databases(self):
         removed_dbs = [db for db in self.databases if db not in bd.databases]
         for db in removed_dbs:
             self.dataframe.drop(self.dataframe[self.dataframe.database == db].index, inplace=True)
             self.databases.remove(db)
+        if removed_dbs:
+            self.version += 1
 
     def get_existing_fields(self, field_list: list) -> list:
         """Return a list of fieldnames that exist in the current dataframe."""
@@ -193,6 +252,17 @@ class MetaDataStore(object):
         df = self.dataframe.loc[pd.IndexSlice[keys], :]
         return df.reindex(columns, axis="columns")
 
+    def get_group_codes(self, keys: list, fields) -> (np.ndarray, pd.Index):
+        """Group the given keys on the values of one or more metadata fields.
+
+        Returns a group code for every key, pointing into the (sorted) index of group values like
+        `DataFrame.groupby().ngroup()` does. Keys without a value for the fields get a code of -1.
+        """
+        columns = fields if isinstance(fields, list) else [fields]
+        grouped = self.get_metadata(keys, columns).groupby(fields)
+        codes = grouped.ngroup().fillna(-1).astype(int).to_numpy()
+        return codes, grouped.size().index
+
     def get_database_metadata(self, db_name: str) -> pd.DataFrame:
         """Return a slice of the dataframe matching the database.
 
@@ -215,6 +285,53 @@ class MetaDataStore(object):
             self.add_metadata([db_name])
         return self.dataframe.loc[self.dataframe["database"] == db_name].copy(deep=True)
 
+    def search(
+        self, query: str, databases: list = None, limit: int = None
+    ) -> pd.DataFrame:
+        """Search all databases of the project at once, best matches first.
+
+        Databases that are not yet in the MetaDataStore are added first (empty
+        databases are skipped), after that the search runs on the shared index
+        of the search engine.
+
+        Parameters
+        ----------
+        query : str
+            Search terms separated by whitespace, all terms need to match
+        databases : list, optional
+            Limit the search to these databases, defaults to all databases
+        limit : int, optional
+            Only return this many of the best matches
+
+        Returns
+        -------
+        pd.DataFrame
+            Slice of the metadata with an added 'score' column
+
+        """
+        self._add_searched_databases(databases)
+        return self.search_engine.search(query, databases, limit)
+
+    def iter_search(
+        self, query: str, databases: list = None, limit: int = None, chunk_size: int = 250
+    ) -> Iterator[pd.DataFrame]:
+        """Same as `search`, but the results are yielded in chunks of chunk_size rows.
+
+        The ranking is done at once, so tables can show the best matches while the rest is being added.
+        """
+        self._add_searched_databases(databases)
+        return self.search_engine.iter_search(query, databases, limit, chunk_size)
+
+    def _add_searched_databases(self, databases: list = None) -> None:
+        """Add the databases that are searched to the MetaDataStore, skipping empty ones."""
+        self.add_metadata(
+            [
+                db
+                for db in (databases or bd.databases)
+                if db in self.databases or bc.count_database_records(db) > 0
+            ]
+        )
+
     @property
     def index(self):
         """Returns the (multi-) index of the MetaDataStore.
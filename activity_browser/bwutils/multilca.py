@@ -1,22 +1,21 @@
-from collections import OrderedDict
-from copy import deepcopy
 from typing import Iterable, Optional, Union
 from logging import getLogger
 
 import bw2calc as bc
 import numpy as np
 import pandas as pd
+from scipy import sparse
 from PySide2.QtWidgets import QApplication, QMessageBox
 
 from activity_browser.mod import bw2data as bd
-from activity_browser.mod.bw2analyzer import ABContributionAnalysis
 
+from .activity_index import AB_activity_index
 from .commontasks import wrap_text
 from .errors import ReferenceFlowValueError
 from .metadata import AB_metadata
+from .results_cache import AB_results_cache
 
 log = getLogger(__name__)
-ca = ABContributionAnalysis()
 
 
 class MLCA(object):
@@ -217,7 +216,7 @@ class MLCA(object):
             except:
                 # bw25 compatibility
                 key = list(func_unit.keys())[0]
-                self.lca.redo_lci({bd.get_activity(key).id: func_unit[key]})
+                self.lca.redo_lci({AB_activity_index.id(key): func_unit[key]})
 
             # Now update the:
             # - Scaling factors
@@ -256,6 +255,95 @@ class MLCA(object):
     def calculate(self):
         self._perform_calculations()
 
+    def solve_many(self, demands: np.ndarray) -> np.ndarray:
+        """Solve the technosphere for every column of `demands` at once, using the factorized technosphere matrix.
+
+        The factorization is only (re)built when it is missing, e.g. after the matrices were updated for a scenario.
+        """
+        if not hasattr(self.lca, "solver"):
+            self.lca.decompose_technosphere()
+        try:
+            supply = self.lca.solver(demands)
+            if supply.shape == demands.shape:
+                return supply
+        except (ValueError, TypeError):
+            # some solvers (e.g. UMFPACK) only take a single right-hand side
+            pass
+        return np.column_stack(
+            [self.lca.solver(demands[:, i]) for i in range(demands.shape[1])]
+        )
+
+    def first_tier_contributions(self, demand_index: int) -> (list, np.ndarray):
+        """Calculate the cumulative scores of all direct technosphere inputs of a reference flow, for all methods.
+
+        Only the inputs of technosphere exchanges count, co-products and substitution are part of the direct
+        contribution. Their amounts are read from the demand column of the technosphere matrix and scaled to the
+        reference flow amount.
+        All inputs are solved as one multi-RHS system and characterized for all methods in a single product, instead
+        of doing one LCA per input and method.
+
+        Returns the keys of the inputs and an array of shape (inputs, methods) with their scores.
+        """
+        key, amount = next(iter(self.func_units[demand_index].items()))
+        try:
+            col, row = self.lca.activity_dict[key], self.lca.product_dict[key]
+        except KeyError:
+            # bw25 compatibility
+            act_id = AB_activity_index.id(key)
+            col, row = self.lca.activity_dict[act_id], self.lca.product_dict[act_id]
+        technosphere_rows = [
+            self._product_row(exc.input.key)
+            for exc in bd.get_activity(key).technosphere()
+            if exc.input.key != key
+        ]
+
+        technosphere = self.lca.technosphere_matrix.tocsc()
+        column = technosphere.getcol(col)
+        column.sum_duplicates()
+        scale = amount / technosphere[row, col]
+
+        # the direct inputs are the non-zero rows of the technosphere exchanges, inputs are negative in the matrix
+        inputs = np.isin(column.indices, technosphere_rows) & (column.data != 0)
+        rows = column.indices[inputs]
+        if len(rows) == 0:
+            return [], np.zeros((0, len(self.method_matrices)))
+
+        demands = np.zeros((technosphere.shape[0], len(rows)))
+        demands[rows, np.arange(len(rows))] = -column.data[inputs] * scale
+
+        inventory = self.lca.biosphere_matrix @ self.solve_many(demands)
+        characterization = np.vstack(
+            [np.asarray(cf_matrix.sum(axis=0)).ravel() for cf_matrix in self.method_matrices]
+        )
+        scores = (characterization @ inventory).T
+
+        keys = ids_to_keys([self.rev_product_dict[i] for i in rows])
+        return keys, scores
+
+    def _product_row(self, key: tuple) -> int:
+        try:
+            return self.lca.product_dict[key]
+        except KeyError:
+            # bw25 compatibility
+            return self.lca.product_dict[AB_activity_index.id(key)]
+
+    def _supply_array(self, demand_index: int, scenario_index: Optional[int] = None) -> np.ndarray:
+        return self.scaling_factors[str(self.func_units[demand_index])]
+
+    def update_lca_calculation_for_sankey(
+        self, scenario_index: Optional[int], demand_index: int, method_index: int
+    ) -> None:
+        """Prepare the LCA object for the graph traversal of the Sankey.
+
+        Instead of building and solving a new LCA, the supply array that was calculated for the reference flow is reused
+        together with the characterization matrix of the method. The traversal factorizes the technosphere itself.
+        """
+        supply = self._supply_array(demand_index, scenario_index)
+        self.lca.supply_array = supply
+        self.lca.inventory = self.lca.biosphere_matrix @ sparse.diags(supply)
+        self.lca.characterization_matrix = self.method_matrices[method_index]
+        self.lca.lcia_calculation()
+
     @property
     def func_units_dict(self) -> dict:
         """Return a dictionary of reference flow (key, demand)."""
@@ -393,6 +481,13 @@ class Contributions(object):
                 self.act_fields,
             ),
         }
+        # resolved row keys by inventory type, see inventory_keys
+        self.inventory_key_cache = {}
+        # namespace in AB_results_cache to keep the top-contribution tables under, see top_contributions
+        self.cache_namespace = None
+        # item order and group boundaries by inventory and aggregation parameters, see _aggregation_groups
+        self.aggregation_cache = {}
+        self.aggregation_version = AB_metadata.version
 
     def normalize(self, contribution_array: np.ndarray, total_range:bool=True) -> np.ndarray:
         """Normalize the contribution array based on range or score
@@ -413,65 +508,91 @@ class Contributions(object):
             total = abs(contribution_array.sum(axis=1, keepdims=True))
         return contribution_array / total
 
-    def _build_dict(
+    def _build_array(
         self,
         contributions: np.ndarray,
-        FU_M_index: dict,
-        rev_dict: dict,
         limit: int,
         limit_type: str,
         total_range: bool,
-    ) -> dict:
-        """Sort the given contribution array on method or reference flow column.
+    ) -> (np.ndarray, np.ndarray):
+        """Select the top-contributing items for all methods or reference flows at once.
+
+        The selection follows ContributionAnalysis.sort_array, but works on every row of the contribution array
+        together instead of sorting each of them separately.
 
         Parameters
         ----------
         contributions: A 2-dimensional contribution array
-        FU_M_index : Dictionary which maps the reference flows or methods to their matching columns
-        rev_dict : 'reverse' dictionary used to map correct activity/method to its value
         limit : Number of top-contributing items to include
         limit_type : Either "number" or "percent", ContributionAnalysis.sort_array for complete explanation
+        total_range : Whether to consider the total for contributions the range (True) or the score (False)
 
         Returns
         -------
-        Top-contributing flows per method or activity
+        A 2-dimensional array with the score, the positive and the negative rest on the first three rows, followed by
+        the top-contributing items, with a column per method or reference flow. Items that are only top-contributing
+        for some of the columns are 0 for the other ones.
+        The indexes of the top-contributing items in the contribution array.
 
         """
-        topcontribution_dict = dict()
-        for fu_or_method, col in FU_M_index.items():
-            contribution_col = contributions[col, :]
-            if total_range:  # total is based on the range
-                normalize_to = np.abs(contribution_col).sum()
-            else:  # total is based on the score
-                normalize_to = contribution_col.sum()
-            score = contribution_col.sum()
-
-            top_contribution = ca.sort_array(
-                contribution_col, limit=limit, limit_type=limit_type, total=normalize_to
-            )
-
-            # split and calculate remaining rest sections for positive and negative part
-            pos_rest = (
-                np.sum(contribution_col[contribution_col > 0])
-                - np.sum(top_contribution[top_contribution[:, 0] > 0][:, 0])
+        if limit_type not in ("number", "percent", "cum_percent"):
+            raise ValueError(
+                f"limit_type must be either 'number', 'percent' or 'cum_percent' not '{limit_type}'."
             )
-            neg_rest = (
-                    np.sum(contribution_col[contribution_col < 0])
-                    - np.sum(top_contribution[top_contribution[:, 0] < 0][:, 0])
+        if limit_type == "number":
+            if not int(limit) == limit:
+                raise ValueError("Number limit must a whole number.")
+            if not 0 < limit:
+                raise ValueError("Number limit must be > 0.")
+        elif not 0 < limit <= 1:
+            raise ValueError("Percentage limits > 0 and <= 1.")
+
+        contributions = np.atleast_2d(contributions)
+        absolute = np.abs(contributions)
+        score = contributions.sum(axis=1)
+        # like sort_array, normalize to the range if there is no total to normalize to
+        total = absolute.sum(axis=1) if total_range else score
+        total = np.abs(np.where(total == 0, absolute.sum(axis=1), total))
+
+        items = contributions.shape[1]
+        if limit_type == "number":
+            limit = int(limit)
+            if limit >= items:
+                selected = np.ones(contributions.shape, dtype=bool)
+            else:
+                # only partition, the order of the top items is taken care of in the labelled dataframe
+                top = np.argpartition(-absolute, limit - 1, axis=1)[:, :limit]
+                selected = np.zeros(contributions.shape, dtype=bool)
+                np.put_along_axis(selected, top, True, axis=1)
+        elif limit_type == "percent":
+            selected = absolute >= (total * limit)[:, np.newaxis]
+        else:
+            if (total == 0).any():
+                raise ValueError(
+                    "Cumulative percentage cannot be calculated to a total of 0, use a different limit type or total"
+                )
+            # sort low to high and keep the items on or over the limit
+            order = np.argsort(absolute, axis=1)
+            cumsum = np.cumsum(np.take_along_axis(absolute, order, axis=1), axis=1)
+            selected = np.zeros(contributions.shape, dtype=bool)
+            np.put_along_axis(
+                selected, order, cumsum / total[:, np.newaxis] >= (1 - limit), axis=1
             )
 
-            cont_per = OrderedDict()
-            cont_per.update(
-                {
-                    ("Score", ""): score,
-                    ("Rest (+)", ""): pos_rest,
-                    ("Rest (-)", ""): neg_rest,
-                }
-            )
-            for value, index in top_contribution:
-                cont_per.update({rev_dict[index]: value})
-            topcontribution_dict.update({fu_or_method: cont_per})
-        return topcontribution_dict
+        top = np.where(selected, contributions, 0)
+
+        # split and calculate remaining rest sections for positive and negative part
+        pos_rest = (
+            np.where(contributions > 0, contributions, 0).sum(axis=1)
+            - np.where(top > 0, top, 0).sum(axis=1)
+        )
+        neg_rest = (
+            np.where(contributions < 0, contributions, 0).sum(axis=1)
+            - np.where(top < 0, top, 0).sum(axis=1)
+        )
+
+        rows = np.flatnonzero(selected.any(axis=0))
+        return np.vstack([score, pos_rest, neg_rest, top[:, rows].T]), rows
 
     @staticmethod
     def get_labels(
@@ -578,51 +699,65 @@ class Contributions(object):
         joined.index = cls.get_labels(joined.index, fields=x_fields)
         return joined
 
-    def get_labelled_contribution_dict(
+    def get_labelled_contribution_array(
         self,
-        cont_dict: dict,
+        top_contributions: np.ndarray,
+        rows: np.ndarray,
+        FU_M_index: dict,
+        rev_dict: dict,
         x_fields: list = None,
         y_fields: list = None,
         mask: list = None,
     ) -> pd.DataFrame:
-        """Annotate the contribution dict with metadata.
+        """Annotate the top contributions from `_build_array` with metadata.
 
         Parameters
         ----------
-        cont_dict : Holds the contribution data connected to the functions of methods
+        top_contributions : Score, rest and top contributions with a column for every function or method
+        rows : The indexes of the top-contributing items in the contribution array
+        FU_M_index : Dictionary which maps the reference flows or methods to their matching columns
+        rev_dict : 'reverse' dictionary used to map correct activity/method to its value
         x_fields : X-axis fieldnames, these are usually the indexes/keys of specific processes
         y_fields : Column names specific to the cont_dict to be labelled
         mask : Used in case of aggregation or special cases where the usual way of using the metadata cannot be used
 
         Returns
         -------
-        Annotated contribution dict inside a pandas dataframe
+        Annotated contributions inside a pandas dataframe
 
         """
-        dfs = (
-            pd.DataFrame(v.values(), index=list(v.keys()), columns=[k])
-            for k, v in cont_dict.items()
+        special_keys = [("Score", ""), ("Rest (+)", ""), ("Rest (-)", "")]
+        # take the columns in the order of the FU_M_index and replace all 0 values with NaN
+        values = top_contributions[:, list(FU_M_index.values())]
+        values = np.where(values == 0, np.nan, values)
+
+        # sort on mean square of a row, dropping rows with only NaNs
+        bottom = values[3:]
+        filled = np.flatnonzero(~np.isnan(bottom).all(axis=1))
+        mean_square = np.nanmean(np.square(bottom[filled]), axis=1)
+        order = np.concatenate([
+            np.flatnonzero(~np.isnan(values[:3]).all(axis=1)),
+            filled[np.argsort(-mean_square, kind="stable")] + 3,
+        ])
+
+        index = special_keys + [rev_dict[i] for i in rows]
+        df = pd.DataFrame(
+            values[order], index=[index[i] for i in order], columns=list(FU_M_index.keys())
         )
-        df = pd.concat(dfs, sort=False, axis=1)
-        # If the cont_dict has tuples for keys, coerce df.columns into MultiIndex
-        if all(isinstance(k, tuple) for k in cont_dict.keys()):
+        # If the FU_M_index has tuples for keys, coerce df.columns into MultiIndex
+        if all(isinstance(k, tuple) for k in FU_M_index.keys()):
             df.columns = pd.MultiIndex.from_tuples(df.columns)
 
-        special_keys = [("Score", ""), ("Rest (+)", ""), ("Rest (-)", "")]
-        # replace all 0 values with NaN and drop all rows with only NaNs
-        df = df.replace(0, np.nan)
-
-        # sort on mean square of a row
-        df_bot = deepcopy(df.iloc[3:, :])
-        func = lambda row: np.nanmean(np.square(row))
-        if len(df_bot) > 1:  # but only sort if there is something to sort
-            df_bot["_sort_me_"] = (df_bot.select_dtypes(include=np.number)).apply(func, axis=1)
-            df_bot.sort_values(by="_sort_me_", ascending=False, inplace=True)
-            del df_bot["_sort_me_"]
-
-        df = pd.concat([df.iloc[:3, :], df_bot], axis=0)
-        df.dropna(how="all", inplace=True)
+        return self._label_contributions(df, x_fields, y_fields, mask)
 
+    def _label_contributions(
+        self,
+        df: pd.DataFrame,
+        x_fields: list = None,
+        y_fields: list = None,
+        mask: list = None,
+    ) -> pd.DataFrame:
+        special_keys = [("Score", ""), ("Rest (+)", ""), ("Rest (-)", "")]
         if not mask:
             joined = self.join_df_with_metadata(
                 df, x_fields=x_fields, y_fields=y_fields, special_keys=special_keys
@@ -651,20 +786,34 @@ class Contributions(object):
 
     @staticmethod
     def _build_inventory(
-        inventory: dict, indices: dict, columns: list, fields: list
+        inventory: dict, keys: list, columns: list, fields: list, remove_zeros: bool = False
     ) -> pd.DataFrame:
-        df = pd.DataFrame(inventory)
-        df.index = pd.MultiIndex.from_tuples(ids_to_keys(indices.values()))
-        df.columns = Contributions.get_labels(columns, max_length=30)
-        metadata = AB_metadata.get_metadata(list(ids_to_keys(indices.values())), fields)
-        joined = metadata.join(df)
-        joined.reset_index(inplace=True, drop=True)
-        return joined
+        data = np.column_stack(list(inventory.values()))
+        if remove_zeros:
+            # only keep the rows with flows, before any metadata is collected for them
+            rows = np.flatnonzero(data.sum(axis=1) != 0)
+            data, keys = data[rows], [keys[i] for i in rows]
+        metadata = AB_metadata.get_metadata(keys, fields).reset_index(drop=True)
+        df = pd.DataFrame(data, columns=Contributions.get_labels(columns, max_length=30))
+        return pd.concat([metadata, df], axis=1)
+
+    def inventory_keys(self, inventory_type: str) -> list:
+        """Return the keys of the rows of the inventory of the given type, these are resolved only once."""
+        if inventory_type not in self.inventory_key_cache:
+            indices = self.inventory_data[inventory_type][1]
+            self.inventory_key_cache[inventory_type] = ids_to_keys(indices.values())
+        return self.inventory_key_cache[inventory_type]
 
     def inventory_df(
-        self, inventory_type: str, columns: set = {"name", "database", "code"}
+        self,
+        inventory_type: str,
+        columns: set = {"name", "database", "code"},
+        remove_zeros: bool = False,
     ) -> pd.DataFrame:
-        """Return an inventory dataframe with metadata of the given type."""
+        """Return an inventory dataframe with metadata of the given type.
+
+        With `remove_zeros`, only the rows that have a flow for any of the reference flows are included.
+        """
         try:
             data = self.inventory_data[inventory_type]
             appending = columns.difference(set(data[3]))
@@ -675,7 +824,10 @@ class Contributions(object):
                 "Type must be either 'biosphere' or 'technosphere', "
                 "'{}' given.".format(inventory_type)
             )
-        return self._build_inventory(*data)
+        inventory, _, fu_keys, fields = data
+        return self._build_inventory(
+            inventory, self.inventory_keys(inventory_type), fu_keys, fields, remove_zeros
+        )
 
     def _build_lca_scores_df(self, scores: np.ndarray) -> pd.DataFrame:
         df = pd.DataFrame(
@@ -763,22 +915,44 @@ class Contributions(object):
             An optional list or dictview of the mask_index values
 
         """
-        rev_index, keys, fields = self.aggregate_data[inventory]
+        rev_index = self.aggregate_data[inventory][0]
         if not parameters:
             return contributions, rev_index, None
 
-        df = pd.DataFrame(contributions).T
-        columns = list(range(contributions.shape[0]))
-        df.index = pd.MultiIndex.from_tuples(rev_index.values())
-        metadata = AB_metadata.get_metadata(list(keys), fields)
+        order, starts, mask_index = self._aggregation_groups(inventory, parameters)
+        if not mask_index:
+            return np.zeros((contributions.shape[0], 0)), mask_index, mask_index.values()
 
-        joined = metadata.join(df)
-        joined.reset_index(inplace=True, drop=True)
-        grouped = joined.groupby(parameters)
-        aggregated = grouped[columns].sum()
-        mask_index = {i: m for i, m in enumerate(aggregated.index)}
+        # the items are sorted by group, so every group is a consecutive slice of columns to sum
+        aggregated = np.add.reduceat(contributions[:, order], starts, axis=1)
 
-        return aggregated.T.values, mask_index, mask_index.values()
+        return aggregated, mask_index, mask_index.values()
+
+    def _aggregation_groups(
+        self, inventory: str, parameters: Union[str, list]
+    ) -> (np.ndarray, np.ndarray, dict):
+        """Return the item order and group boundaries to aggregate the inventory with, cached per parameters.
+
+        The cache is cleared whenever the metadata changes, as the groups are based on it.
+        """
+        if self.aggregation_version != AB_metadata.version:
+            self.aggregation_cache = {}
+            self.aggregation_version = AB_metadata.version
+
+        cache_key = (inventory, tuple(parameters) if isinstance(parameters, list) else parameters)
+        if cache_key not in self.aggregation_cache:
+            rev_index = self.aggregate_data[inventory][0]
+            codes, groups = AB_metadata.get_group_codes(
+                ids_to_keys(rev_index.values()), parameters
+            )
+            # items without a value for the parameters are left out, like with DataFrame.groupby
+            items = np.flatnonzero(codes >= 0)
+            order = items[np.argsort(codes[items], kind="stable")]
+            starts = np.searchsorted(codes[order], np.arange(len(groups)))
+            self.aggregation_cache[cache_key] = (
+                order, starts, {i: m for i, m in enumerate(groups)}
+            )
+        return self.aggregation_cache[cache_key]
 
     def _contribution_rows(self, contribution: str, aggregator=None):
         if aggregator is None:
@@ -810,6 +984,39 @@ class Contributions(object):
             return self.mlca.fu_index, self.act_fields
         return self._correct_method_index(self.mlca.methods), None
 
+    @staticmethod
+    def _cache_key(contribution: str, **kwargs) -> tuple:
+        return (contribution,) + tuple(
+            (k, tuple(v) if isinstance(v, list) else v) for k, v in sorted(kwargs.items())
+        )
+
+    def top_contributions(self, contribution: str, **kwargs) -> pd.DataFrame:
+        """Return the top contributions of the given type, from the results cache if they were calculated before.
+
+        The tables are only cached when a `cache_namespace` is set. They are labelled with the metadata, so the
+        metadata version is part of the key.
+
+        Parameters
+        ----------
+        contribution : Either 'process' or 'elementary_flow'
+        kwargs : Passed on to `top_process_contributions` or `top_elementary_flow_contributions`
+
+        Returns
+        -------
+        Annotated top-contribution dataframe
+
+        """
+        key = (self.cache_namespace, AB_metadata.version) + self._cache_key(contribution, **kwargs)
+        df = AB_results_cache.get(key) if self.cache_namespace is not None else None
+        if df is None:
+            if contribution == self.ACT:
+                df = self.top_process_contributions(**kwargs)
+            else:
+                df = self.top_elementary_flow_contributions(**kwargs)
+            if self.cache_namespace is not None:
+                AB_results_cache.put(key, df)
+        return df.copy()
+
     def top_elementary_flow_contributions(
         self,
         functional_unit: Optional[tuple] = None,
@@ -858,11 +1065,11 @@ class Contributions(object):
         if normalize:
             contributions = self.normalize(contributions, total_range)
 
-        top_cont_dict = self._build_dict(
-            contributions, index, rev_index, limit, limit_type, total_range
+        top_contributions, rows = self._build_array(
+            contributions, limit, limit_type, total_range
         )
-        labelled_df = self.get_labelled_contribution_dict(
-            top_cont_dict, x_fields=x_fields, y_fields=y_fields, mask=mask
+        labelled_df = self.get_labelled_contribution_array(
+            top_contributions, rows, index, rev_index, x_fields=x_fields, y_fields=y_fields, mask=mask
         )
         self.adjust_table_unit(labelled_df, method)
         return labelled_df
@@ -914,15 +1121,15 @@ class Contributions(object):
         if normalize:
             contributions = self.normalize(contributions, total_range)
 
-        top_cont_dict = self._build_dict(
-            contributions, index, rev_index, limit, limit_type, total_range
+        top_contributions, rows = self._build_array(
+            contributions, limit, limit_type, total_range
         )
-        labelled_df = self.get_labelled_contribution_dict(
-            top_cont_dict, x_fields=x_fields, y_fields=y_fields, mask=mask
+        labelled_df = self.get_labelled_contribution_array(
+            top_contributions, rows, index, rev_index, x_fields=x_fields, y_fields=y_fields, mask=mask
         )
         self.adjust_table_unit(labelled_df, method)
         return labelled_df
 
 
 def ids_to_keys(index_list):
-    return [bd.get_activity(i).key if isinstance(i, int) else i for i in index_list]
+    return AB_activity_index.keys(index_list)
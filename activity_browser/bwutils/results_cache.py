@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+import sys
+from collections import OrderedDict
+from itertools import count
+from logging import getLogger
+
+import pandas as pd
+
+from activity_browser.mod import bw2data as bd
+
+log = getLogger(__name__)
+
+
+def estimate_size(obj) -> int:
+    """Estimate the memory use of a calculation result in bytes.
+
+    Dataframes report their memory use, arrays and objects that account for their own memory through an `nbytes`
+    attribute use that and containers are estimated from their contents. Anything else counts with its own size only.
+    """
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(deep=True))
+    if hasattr(obj, "nbytes"):
+        return int(obj.nbytes)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(estimate_size(k) + estimate_size(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(estimate_size(item) for item in obj)
+    return sys.getsizeof(obj)
+
+
+class ResultsCache(object):
+    """Cache of calculation results that is bounded by the memory its entries use.
+
+    Entries are evicted least recently used first once the total estimated size exceeds `max_size` bytes. The
+    results of a calculation are stored under keys that start with a namespace, so everything that belongs to a
+    calculation can be invalidated at once, e.g. when its results tab is closed or its calculation setup changes.
+
+    Hits, misses and evictions are counted, and the statistics are logged on every eviction and invalidation.
+    """
+
+    def __init__(self, name: str, max_size: int = 512 * 2 ** 20):
+        self.name = name
+        self.max_size = max_size
+        self._entries = OrderedDict()  # key: (value, size), least recently used first
+        self._namespaces = count()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        bd.projects.current_changed.connect(self.clear)
+
+    def __contains__(self, key) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def stats(self) -> str:
+        return (
+            f"{self.name} cache: {len(self)} entries, {self.size / 2 ** 20:.1f} of {self.max_size / 2 ** 20:.0f} MiB, "
+            f"{self.hits} hits, {self.misses} misses, {self.evictions} evictions"
+        )
+
+    def namespace(self, label: str) -> tuple:
+        """Return a new namespace to store the results of a calculation under."""
+        return label, next(self._namespaces)
+
+    def get(self, key, default=None):
+        """Return the cached value for key and mark it as recently used, or default if it isn't cached."""
+        if key not in self._entries:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return self._entries[key][0]
+
+    def put(self, key, value, size: int = None) -> None:
+        """Store value under key and evict the least recently used entries that don't fit anymore.
+
+        The size of the value is estimated when it isn't given. Values that are changed after they were stored, should
+        be stored again to update their size.
+        """
+        size = estimate_size(value) if size is None else size
+        if key in self._entries:
+            self.size -= self._entries.pop(key)[1]
+        self._entries[key] = (value, size)
+        self.size += size
+
+        # the new entry is kept, even if it doesn't fit by itself
+        while self.size > self.max_size and len(self._entries) > 1:
+            old_key, (_, old_size) = self._entries.popitem(last=False)
+            self.size -= old_size
+            self.evictions += 1
+            log.debug(f"Evicted {old_key} ({old_size / 2 ** 20:.1f} MiB), {self.stats}")
+
+    def invalidate(self, namespace: tuple) -> None:
+        """Drop all entries stored under the given namespace."""
+        keys = [key for key in self._entries if key[0] == namespace]
+        for key in keys:
+            self.size -= self._entries.pop(key)[1]
+        if keys:
+            log.debug(f"Invalidated {len(keys)} entries of {namespace}, {self.stats}")
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.size = 0
+
+
+AB_results_cache = ResultsCache("Results")
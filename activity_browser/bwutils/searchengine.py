@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+import functools
+import re
+from logging import getLogger
+from time import perf_counter
+from typing import Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+log = getLogger(__name__)
+
+
+class MetaDataSearchEngine(object):
+    """Ranked search over all activities and flows held by a MetaDataStore.
+
+    The engine keeps an index of lower-cased copies of the searchable metadata
+    columns, shared by all databases in the store. The index is only rebuilt
+    when the store reports that its data has changed.
+
+    A query is split on whitespace and every term must be found in at least one
+    of the search fields. Each matching term is scored on the quality of the
+    best match (exact > starts with > start of a word > contains), weighted by
+    the importance of the field it was found in. Results are ordered on the
+    summed score, with shorter names first on a tie.
+
+    Parameters
+    ----------
+    store : MetaDataStore
+        The store to search, needs a `dataframe` and a `version` attribute
+    """
+
+    # searchable field: weight of a match in that field
+    SEARCH_FIELDS = {
+        "name": 10,
+        "reference product": 8,
+        "categories": 4,
+        "location": 3,
+        "unit": 1,
+        "database": 1,
+    }
+
+    # quality of a match
+    EXACT = 4
+    STARTS_WITH = 3
+    WORD_START = 2
+    CONTAINS = 1
+
+    SEPARATOR = "\x1f"  # field separator, cannot be typed by a user so never matches a query
+    ROW_SEPARATOR = "\x1e"
+
+    def __init__(self, store):
+        self.store = store
+        self._version = None
+        self._fields = {}
+        self._haystack = pd.Series([], dtype=object)
+        self._corpus = ""
+        self._offsets = np.array([], dtype=np.int64)
+        self._database = np.array([], dtype=object)
+        self._name_length = np.array([], dtype=int)
+
+    @staticmethod
+    def _as_text(value) -> str:
+        if isinstance(value, (tuple, list)):
+            return ", ".join(str(v) for v in value)
+        return str(value)
+
+    def _build_index(self) -> None:
+        """(Re)build the lower-cased search columns from the store."""
+        start = perf_counter()
+        df = self.store.dataframe
+        fields = [f for f in self.SEARCH_FIELDS if f in df.columns]
+
+        self._fields = {
+            field: df[field].map(self._as_text).str.lower().reset_index(drop=True)
+            for field in fields
+        }
+        if self._fields:
+            self._haystack = functools.reduce(
+                lambda a, b: a + self.SEPARATOR + b, self._fields.values()
+            )
+        else:
+            self._haystack = pd.Series([""] * len(df), dtype=object)
+
+        # all rows glued together in a single string, so the first term of a query can be found with one scan
+        self._corpus = self.ROW_SEPARATOR.join(self._haystack.tolist())
+        lengths = self._haystack.str.len().to_numpy(dtype=np.int64) + len(self.ROW_SEPARATOR)
+        self._offsets = np.concatenate(([0], np.cumsum(lengths)[:-1])).astype(np.int64)
+
+        if "database" in df.columns:
+            self._database = df["database"].to_numpy(dtype=object)
+        else:
+            self._database = np.full(len(df), "", dtype=object)
+        if "name" in self._fields:
+            self._name_length = self._fields["name"].str.len().to_numpy()
+        else:
+            self._name_length = np.zeros(len(df), dtype=int)
+
+        self._version = self.store.version
+        log.debug(
+            f"Built search index of {len(df)} rows in {(perf_counter() - start) * 1000:.1f} ms"
+        )
+
+    def _ensure_index(self) -> None:
+        if self._version != self.store.version:
+            self._build_index()
+
+    def _corpus_rows(self, term: str) -> np.ndarray:
+        """Return the sorted, unique row positions that contain term anywhere."""
+        positions = np.fromiter(
+            (m.start() for m in re.finditer(re.escape(term), self._corpus)),
+            dtype=np.int64,
+        )
+        return np.unique(np.searchsorted(self._offsets, positions, side="right") - 1)
+
+    def _term_quality(self, column: pd.Series, term: str) -> np.ndarray:
+        """Return the quality of the match of term with every value of column."""
+        quality = np.zeros(len(column), dtype=np.int8)
+        contains = column.str.contains(term, regex=False).to_numpy(dtype=bool)
+        if not contains.any():
+            return quality
+        quality[contains] = self.CONTAINS
+
+        # the more expensive tests are only run on values that contain the term
+        found = column[contains]
+        word = found.str.contains(r"\b" + re.escape(term), regex=True).to_numpy(dtype=bool)
+        starts = found.str.startswith(term).to_numpy(dtype=bool)
+        exact = (found == term).to_numpy(dtype=bool)
+
+        sub = quality[contains]
+        sub[word] = self.WORD_START
+        sub[starts] = self.STARTS_WITH
+        sub[exact] = self.EXACT
+        quality[contains] = sub
+        return quality
+
+    def rank(
+        self, query: str, databases: Optional[list] = None, limit: Optional[int] = None
+    ) -> (np.ndarray, np.ndarray):
+        """Return the row positions in the store dataframe matching the query and
+        their scores, ordered from best to worst match.
+        """
+        self._ensure_index()
+        terms = query.lower().split()
+        if not terms or len(self._haystack) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+
+        # first narrow down on the concatenated fields, every term has to be found somewhere
+        candidates = self._corpus_rows(terms[0])
+        if databases:
+            candidates = candidates[np.isin(self._database[candidates], list(databases))]
+        for term in terms[1:]:
+            if len(candidates) == 0:
+                break
+            hits = (
+                self._haystack.iloc[candidates]
+                .str.contains(term, regex=False)
+                .to_numpy(dtype=bool)
+            )
+            candidates = candidates[hits]
+
+        if len(candidates) == 0:
+            return candidates, np.zeros(0)
+
+        # score the remaining rows on the best field match per term
+        scores = np.zeros(len(candidates))
+        for term in terms:
+            term_score = np.zeros(len(candidates))
+            for field, column in self._fields.items():
+                quality = self._term_quality(column.iloc[candidates], term)
+                np.maximum(
+                    term_score, quality * self.SEARCH_FIELDS[field], out=term_score
+                )
+            scores += term_score
+
+        if limit is not None and limit < len(candidates):
+            top = np.argpartition(-scores, limit - 1)[:limit]
+            candidates, scores = candidates[top], scores[top]
+
+        order = np.lexsort((self._name_length[candidates], -scores))
+        return candidates[order], scores[order]
+
+    def search(
+        self, query: str, databases: Optional[list] = None, limit: Optional[int] = None
+    ) -> pd.DataFrame:
+        """Return the metadata of all rows matching the query, best matches first.
+
+        Parameters
+        ----------
+        query : Search terms separated by whitespace, all of them must match
+        databases : Optional, only search in these databases
+        limit : Optional, only return this many of the best matches
+
+        Returns
+        -------
+        Slice of the metadata with an added 'score' column
+        """
+        start = perf_counter()
+        rows, scores = self.rank(query, databases, limit)
+        df = self.store.dataframe.iloc[rows].copy()
+        df["score"] = scores
+        log.debug(
+            f"Search for '{query}' returned {len(df)} results in {(perf_counter() - start) * 1000:.1f} ms"
+        )
+        return df
+
+    def iter_search(
+        self,
+        query: str,
+        databases: Optional[list] = None,
+        limit: Optional[int] = None,
+        chunk_size: int = 250,
+    ) -> Iterator[pd.DataFrame]:
+        """Yield the results of `search` in chunks of chunk_size rows, best matches first.
+
+        The chunks are taken from the dataframe that was ranked, even if the store changes while iterating.
+        """
+        rows, scores = self.rank(query, databases, limit)
+        dataframe = self.store.dataframe
+        for i in range(0, len(rows), chunk_size):
+            df = dataframe.iloc[rows[i: i + chunk_size]].copy()
+            df["score"] = scores[i: i + chunk_size]
+            yield df
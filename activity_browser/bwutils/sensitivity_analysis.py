@@ -18,16 +18,9 @@ from SALib.analyze import delta
 from activity_browser.mod import bw2data as bd
 
 from ..settings import ab_settings
+from .graph_traversal import ABGraphTraversal
 from .montecarlo import MonteCarloLCA, perform_MonteCarlo_LCA
 
-try:
-    # attempt bw25 import
-    from bw2calc.graph_traversal import \
-        AssumedDiagonalGraphTraversal as GraphTraversal
-except ImportError:
-    # standard import on failure
-    from bw2calc import GraphTraversal
-
 log = getLogger(__name__)
 
 
@@ -46,11 +39,11 @@ def get_lca(fu, method):
     return lca
 
 
-def filter_technosphere_exchanges(fu, method, cutoff=0.05, max_calc=1e4):
-    """Use brightway's GraphTraversal to identify the relevant
+def filter_technosphere_exchanges(lca, cutoff=0.05, max_calc=1e4):
+    """Use the graph traversal to identify the relevant
     technosphere exchanges in a non-stochastic LCA."""
     start = time()
-    res = GraphTraversal().calculate(fu, method, cutoff=cutoff, max_calc=max_calc)
+    res = ABGraphTraversal(lca).traverse(cutoff=cutoff, max_calc=max_calc)
 
     # get all edges
     technosphere_exchange_indices = []
@@ -59,9 +52,9 @@ def filter_technosphere_exchanges(fu, method, cutoff=0.05, max_calc=1e4):
             technosphere_exchange_indices.append((e["from"], e["to"]))
     log.info(
         "TECHNOSPHERE {} filtering resulted in {} of {} exchanges and took {} iterations in {} seconds.".format(
-            res["lca"].technosphere_matrix.shape,
+            lca.technosphere_matrix.shape,
             len(technosphere_exchange_indices),
-            res["lca"].technosphere_matrix.getnnz(),
+            lca.technosphere_matrix.getnnz(),
             res["counter"],
             np.round(time() - start, 2),
         )
@@ -348,7 +341,7 @@ class GlobalSensitivityAnalysis(object):
         # technosphere
         if self.mc.include_technosphere:
             self.t_indices = filter_technosphere_exchanges(
-                self.fu, self.method, cutoff=cutoff_technosphere, max_calc=1e4
+                self.lca, cutoff=cutoff_technosphere, max_calc=1e4
             )
             self.t_exchanges, self.t_indices = get_exchanges(self.lca, self.t_indices)
             self.dft = get_exchanges_dataframe(self.t_exchanges, self.t_indices)
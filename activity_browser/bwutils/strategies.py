@@ -10,7 +10,9 @@ from bw2io.utils import DEFAULT_FIELDS, activity_hash
 
 from activity_browser.mod import bw2data as bd
 from activity_browser.mod.bw2data.backends import (ActivityDataset,
+                                                   ExchangeDataset,
                                                    sqlite3_lci_db)
+from activity_browser.signals import qdatabase_list, qdatabases
 
 from ..bwutils.errors import ExchangeErrorValues
 from .commontasks import clean_activity_name
@@ -120,36 +122,106 @@ def rename_db_bw2package(data: dict, old: str, new: str) -> dict:
     return new_data
 
 
-def relink_exchanges(exchanges: list, candidates: dict, duplicates: dict) -> tuple:
+def hash_database(name: str) -> dict:
+    """Hash the activities of a database on the DEFAULT_FIELDS, reading them in a single query.
+
+    Returns the hashes with the data of all activities that share them.
+    """
+    query = ActivityDataset.select(ActivityDataset.data).where(
+        ActivityDataset.database == name
+    )
+    hashes = {}
+    for (ds,) in query.tuples():
+        hashes.setdefault(activity_hash(ds, DEFAULT_FIELDS), []).append(ds)
+    return hashes
+
+
+def relink_candidates(other: bd.Database) -> (dict, dict):
+    """Return the keys of the activities in other by their hash, and the hashes that are shared by several of them."""
+    candidates, duplicates = {}, {}
+    for key, datasets in hash_database(other.name).items():
+        candidates[key] = (other.name, datasets[0]["code"])
+        if len(datasets) > 1:
+            duplicates[key] = datasets[1:]
+    return candidates, duplicates
+
+
+def relink_exchanges(
+    db_name: str, old: str, candidates: dict, duplicates: dict, output_codes: list = None
+) -> tuple:
+    """Relink the biosphere and technosphere exchanges in db_name from the activities in old to the candidates.
+
+    The exchanges and the activities of old are read in one query each, the mapping from the old inputs to the new
+    ones is built from their hashes and all changed exchanges are written with a single executemany statement.
+    Relinking is only done for the exchanges of the activities with output_codes, if given.
+    """
+    query = ExchangeDataset.select(
+        ExchangeDataset.id,
+        ExchangeDataset.input_code,
+        ExchangeDataset.output_code,
+        ExchangeDataset.data,
+    ).where(
+        (ExchangeDataset.output_database == db_name)
+        & (ExchangeDataset.input_database == old)
+        & (ExchangeDataset.type << ["biosphere", "technosphere"])
+    )
+    if output_codes is not None:
+        query = query.where(ExchangeDataset.output_code << list(output_codes))
+    exchanges = list(query.tuples())
+    inputs = dict(
+        ActivityDataset.select(ActivityDataset.code, ActivityDataset.data)
+        .where(ActivityDataset.database == old)
+        .tuples()
+    )
+
     altered = 0
     remainder = 0
     unlinked_exchanges = {}
-    with sqlite3_lci_db.transaction() as transaction:
-        try:
-            # Only do relinking on external biosphere/technosphere exchanges.
-            for i, exc in exchanges:
-                # Use the input activity to generate the hash.
-                key = activity_hash(exc.input, DEFAULT_FIELDS)
-                if key in duplicates:
-                    raise StrategyError(
-                        format_nonunique_key_error(
-                            exc.input, DEFAULT_FIELDS, duplicates[key]
-                        )
-                    )
-                elif key in candidates:
-                    exc["input"] = candidates[key]
-                    altered += 1
-                else:
-                    remainder += 1
-                    if len(unlinked_exchanges) <= 5:
-                        unlinked_exchanges[exc.input] = key
-                exc.save()
-                if i % 10000 == 0:
-                    # Commit changes every 10k exchanges.
-                    transaction.commit()
-        except (StrategyError, bd.errors.ValidityError) as e:
-            log.error(e)
-            transaction.rollback()
+    relinked = {}  # old input code: new key
+    unlinked = set()  # old input codes without a candidate
+    try:
+        for code in set(exc[1] for exc in exchanges):
+            ds = inputs.get(code)
+            key = activity_hash(ds, DEFAULT_FIELDS) if ds else None
+            if key in duplicates:
+                raise StrategyError(
+                    format_nonunique_key_error(ds, DEFAULT_FIELDS, duplicates[key])
+                )
+            elif key in candidates:
+                relinked[code] = candidates[key]
+            else:
+                unlinked.add(code)
+                if ds and len(unlinked_exchanges) <= 5:
+                    unlinked_exchanges[bd.get_activity((old, code))] = key
+    except StrategyError as e:
+        log.error(e)
+        return (len(exchanges), altered, unlinked_exchanges)
+
+    rows = []
+    changed = []
+    for exc_id, input_code, output_code, data in exchanges:
+        if input_code not in relinked:
+            remainder += 1
+            continue
+        new_key = relinked[input_code]
+        data["input"] = new_key
+        rows.append((ExchangeDataset.data.db_value(data), *new_key, exc_id))
+        # record the old input as well, so the widgets showing it learn the exchange is gone
+        changed.append((exc_id, (old, input_code), (db_name, output_code)))
+        changed.append((exc_id, new_key, (db_name, output_code)))
+    altered = len(rows)
+
+    # batch all changes so they are signalled as a single ChangeSet
+    with bd.databases.batch(), sqlite3_lci_db.transaction():
+        ExchangeDataset._meta.database.cursor().executemany(
+            'UPDATE "{}" SET "data" = ?, "input_database" = ?, "input_code" = ? WHERE "id" = ?'.format(
+                ExchangeDataset._meta.table_name
+            ),
+            rows,
+        )
+        qdatabases.record(exchanges=changed)
+    if changed and (qdb := qdatabase_list.get(db_name)):
+        qdb.emitLater("changed", bd.Database(db_name))
     return (remainder, altered, unlinked_exchanges)
 
 
@@ -158,7 +230,7 @@ def relink_exchanges_existing_db(
 ) -> tuple:
     """Relink exchanges after the database has been created/written.
 
-    This means possibly doing a lot of sqlite update calls.
+    The changed exchanges are written in a single bulk update.
     """
     if old == other.name:
         log.info("No point relinking to same database.")
@@ -166,29 +238,12 @@ def relink_exchanges_existing_db(
     assert db.backend == "sqlite", "Relinking only allowed for SQLITE backends"
     assert other.backend == "sqlite", "Relinking only allowed for SQLITE backends"
 
-    duplicates, candidates = {}, {}
-
-    for ds in other:
-        key = activity_hash(ds, DEFAULT_FIELDS)
-        if key in candidates:
-            duplicates.setdefault(key, []).append(ds)
-        else:
-            candidates[key] = ds.key
-
-    exchanges = [
-        (i, exc)
-        for i, exc in enumerate(
-            exc
-            for act in db
-            for exc in act.exchanges()
-            if exc.get("type") in {"biosphere", "technosphere"} and exc.input[0] == old
-        )
-    ]
+    candidates, duplicates = relink_candidates(other)
 
     # Process the database after the transaction is complete.
     #  this updates the 'depends' in metadata
     (remainder, altered, unlinked_exchanges) = relink_exchanges(
-        exchanges, candidates, duplicates
+        db.name, old, candidates, duplicates
     )
     db.process()
     log.info(
@@ -207,25 +262,10 @@ def relink_activity_exchanges(act, old: str, other: bd.Database) -> tuple:
     assert db.backend == "sqlite", "Relinking only allowed for SQLITE backends"
     assert other.backend == "sqlite", "Relinking only allowed for SQLITE backends"
 
-    duplicates, candidates = {}, {}
-
-    for ds in other:
-        key = activity_hash(ds, DEFAULT_FIELDS)
-        if key in candidates:
-            duplicates.setdefault(key, []).append(ds)
-        else:
-            candidates[key] = ds.key
-    exchanges = [
-        (i, e)
-        for i, e in enumerate(
-            exc
-            for exc in act.exchanges()
-            if exc.get("type") in {"technosphere", "biosphere"} and exc.input[0] == old
-        )
-    ]
+    candidates, duplicates = relink_candidates(other)
 
     (remainder, altered, unlinked_exchanges) = relink_exchanges(
-        exchanges, candidates, duplicates
+        db.name, old, candidates, duplicates, output_codes=[act.key[1]]
     )
     db.process()
     log.info(
@@ -4,6 +4,8 @@ import pandas as pd
 from activity_browser.mod import bw2data as bd
 from activity_browser.mod.bw2data.backends import ActivityDataset
 
+from .utils import SUPERSTRUCTURE
+
 FROM_ACT = pd.Index(
     ["from activity name", "from reference product", "from location", "from database"]
 )
@@ -98,6 +100,76 @@ def data_from_index(index: tuple) -> dict:
     }
 
 
+def activity_data_from_keys(keys) -> pd.DataFrame:
+    """Read the superstructure data of the activities with the given keys, with a query per database.
+
+    Returns a dataframe with the key and the data built by `construct_ad_data` for every activity.
+    """
+    codes_per_db = {}
+    for db, code in keys:
+        codes_per_db.setdefault(db, []).append(code)
+
+    rows = []
+    for db, codes in codes_per_db.items():
+        for i in range(0, len(codes), 500):
+            query = (
+                ActivityDataset.select(
+                    ActivityDataset.database,
+                    ActivityDataset.code,
+                    ActivityDataset.name,
+                    ActivityDataset.product,
+                    ActivityDataset.location,
+                    ActivityDataset.type,
+                    ActivityDataset.data,
+                )
+                .where(
+                    (ActivityDataset.database == db)
+                    & (ActivityDataset.code.in_(codes[i : i + 500]))
+                )
+                .namedtuples()
+            )
+            for key, data in map(construct_ad_data, query.iterator()):
+                rows.append((key, *data))
+    columns = [
+        "key",
+        "activity name",
+        "reference product",
+        "location",
+        "categories",
+        "database",
+    ]
+    return pd.DataFrame(rows, columns=columns)
+
+
+def data_from_indices(indices) -> pd.DataFrame:
+    """Take the given 'Index' tuples and build the complete SUPERSTRUCTURE
+    rows for all of them at once.
+
+    Same as `data_from_index`, but all activities are read in a single query
+    per database and merged onto the indices.
+    """
+    from_keys = [tuple(index[0]) for index in indices]
+    to_keys = [tuple(index[1]) for index in indices]
+    activities = activity_data_from_keys(set(from_keys).union(to_keys))
+
+    missing = set(from_keys).union(to_keys).difference(activities["key"])
+    if missing:
+        raise ActivityDataset.DoesNotExist(
+            "Activities not found: {}".format(sorted(missing)[:5])
+        )
+
+    parts = []
+    for side, keys in (("from", from_keys), ("to", to_keys)):
+        part = pd.DataFrame({"key": pd.Series(keys, dtype=object)}).merge(
+            activities, on="key", how="left"
+        )
+        part.columns = ["{} {}".format(side, col) for col in part.columns]
+        parts.append(part)
+    df = pd.concat(parts, axis=1)
+    df["flow type"] = [index[2] if len(index) > 2 else np.NaN for index in indices]
+    return df.loc[:, SUPERSTRUCTURE]
+
+
 def get_relevant_activities(df: pd.DataFrame, part: str = "from") -> dict:
     """Build a dictionary of (name, product, location) -> (database, key) pairs."""
     select = FROM_ACT if part == "from" else TO_ACT
@@ -11,7 +11,7 @@ from PySide2.QtWidgets import QApplication, QPushButton
 from ..errors import ScenarioDatabaseNotFoundError
 from ..metadata import AB_metadata
 from ..utils import Index
-from .activities import data_from_index
+from .activities import data_from_indices
 from .file_dialogs import ABPopup
 from .utils import SUPERSTRUCTURE
 
@@ -34,7 +34,7 @@ def superstructure_from_arrays(
         names = pd.Index(["scenario{}".format(i + 1) for i in range(samples.shape[1])])
 
     # Construct superstructure from indices
-    superstructure = pd.DataFrame(map(data_from_index, indices), columns=SUPERSTRUCTURE)
+    superstructure = data_from_indices(indices)
     # Construct scenarios from samples
     scenarios = pd.DataFrame(samples, columns=names)
 
@@ -1,5 +1,5 @@
 # -*- coding: utf-8 -*-
-from ast import literal_eval
+from importlib.util import find_spec
 from pathlib import Path
 from typing import List, Union
 from logging import getLogger
@@ -7,16 +7,14 @@ from logging import getLogger
 import openpyxl
 import pandas as pd
 
+from .file_imports import (CATEGORY_COLUMNS, TEXT_COLUMNS, ABFileImporter,
+                           parse_tuples)
 from .utils import SUPERSTRUCTURE
 
 log = getLogger(__name__)
 
-
-def convert_tuple_str(x):
-    try:
-        return literal_eval(x)
-    except (ValueError, SyntaxError) as e:
-        return x
+# calamine reads large workbooks many times faster than openpyxl, but is optional
+EXCEL_ENGINE = "calamine" if find_spec("python_calamine") else "openpyxl"
 
 
 def get_sheet_names(document_path: Union[str, Path]) -> List[str]:
@@ -83,7 +81,8 @@ def import_from_excel(
             comment="*",
             na_values="",
             keep_default_na=False,
-            engine="openpyxl",
+            dtype=dict.fromkeys(TEXT_COLUMNS, str),
+            engine=EXCEL_ENGINE,
         )
         diff = SUPERSTRUCTURE.difference(data.columns)
         if not diff.empty:
@@ -94,8 +93,9 @@ def import_from_excel(
             )
 
         # Convert specific columns that may have tuples as strings
-        columns = ["from categories", "from key", "to categories", "to key"]
-        data.loc[:, columns] = data[columns].map(convert_tuple_str)
+        for col in CATEGORY_COLUMNS:
+            data[col] = parse_tuples(data[col])
+        data = ABFileImporter.apply_schema(data)
     except:
         # skip the error checks here, these now occur in the calling layout.tabs.LCA_setup module
         pass
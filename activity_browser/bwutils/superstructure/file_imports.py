@@ -7,9 +7,102 @@ from logging import getLogger
 import pandas as pd
 
 from ..errors import *
+from .utils import MIN_SUPERSTRUCTURE_COLUMNS, SUPERSTRUCTURE
+
+try:
+    import pyarrow
+except ModuleNotFoundError:
+    # pyarrow is only required for the feather and parquet formats
+    pyarrow = None
 
 log = getLogger(__name__)
 
+# A key as written by pandas, e.g. "('database', 'code')"
+KEY_PATTERN = r"""^\s*\(\s*(['"])(.*?)\1\s*,\s*(['"])(.*?)\3\s*\)\s*$"""
+# A quoted element of a tuple, e.g. "'air'" in "('air', 'urban')"
+TUPLE_ITEM_PATTERN = r"""'([^'\\]*)'|"([^"\\]*)\""""
+
+KEY_COLUMNS = ["from key", "to key"]
+CATEGORY_COLUMNS = ["from categories", "to categories"]
+TEXT_COLUMNS = SUPERSTRUCTURE.difference(KEY_COLUMNS + CATEGORY_COLUMNS).tolist()
+
+
+def convert_tuple_str(x):
+    try:
+        return ast.literal_eval(x)
+    except (ValueError, SyntaxError):
+        return x
+
+
+def parse_keys(series: pd.Series) -> pd.Series:
+    """Parse keys written as strings, e.g. "('database', 'code')", into tuples.
+
+    The keys are split with a vectorized regular expression. Strings that contain escaped characters or don't match
+    it are evaluated one by one, other values are returned as they are.
+    """
+    result = series.astype(object)
+    text = series[series.map(type).eq(str)]
+    if text.empty:
+        return result
+    parts = text.str.extract(KEY_PATTERN)
+    matched = parts[1].notna() & ~text.str.contains("\\", regex=False)
+    result[matched.index[matched]] = pd.Series(
+        list(zip(parts.loc[matched, 1], parts.loc[matched, 3])),
+        index=matched.index[matched],
+        dtype=object,
+    )
+    other = matched.index[~matched]
+    result[other] = text[other].map(convert_tuple_str)
+    return result
+
+
+def parse_tuples(series: pd.Series) -> pd.Series:
+    """Parse tuples of strings written as strings, e.g. "('air', 'urban')", into tuples.
+
+    The elements are found with a vectorized regular expression. Strings that contain escaped characters are
+    evaluated one by one, other values are returned as they are.
+    """
+    result = series.astype(object)
+    text = series[series.map(type).eq(str)]
+    if text.empty:
+        return result
+    is_tuple = text.str.match(r"^\s*\(")
+    escaped = is_tuple & text.str.contains("\\", regex=False)
+    simple = text[is_tuple & ~escaped]
+    result[simple.index] = simple.str.findall(TUPLE_ITEM_PATTERN).map(
+        lambda found: tuple(a or b for a, b in found)
+    )
+    result[escaped.index[escaped]] = text[escaped].map(convert_tuple_str)
+    return result
+
+
+def table_to_frame(table) -> pd.DataFrame:
+    """Convert a pyarrow table of a scenario difference file to a dataframe.
+
+    Keys and categories stored as lists become tuples, sliced from the flat list of all their elements.
+    """
+    lists = [
+        name
+        for name in table.column_names
+        if name in KEY_COLUMNS + CATEGORY_COLUMNS
+        and pyarrow.types.is_list(table.schema.field(name).type)
+    ]
+    df = table.select([name for name in table.column_names if name not in lists]).to_pandas()
+    for name in lists:
+        array = table.column(name).combine_chunks()
+        items = array.values.to_numpy(zero_copy_only=False).tolist()
+        offsets = array.offsets.to_numpy().tolist()
+        valid = array.is_valid().to_numpy(zero_copy_only=False).tolist()
+        df[name] = pd.Series(
+            [
+                tuple(items[start:end]) if is_valid else None
+                for start, end, is_valid in zip(offsets, offsets[1:], valid)
+            ],
+            index=df.index,
+            dtype=object,
+        )
+    return df[table.column_names]
+
 
 class ABFileImporter(ABC):
     """
@@ -57,26 +150,20 @@ class ABFileImporter(ABC):
         The source and destination keys are provided for the first exchange where
         this error occurs.
         """
-        try:
-            for ds in zip(
-                data["from database"],
-                data["from key"],
-                data["to database"],
-                data["to key"],
-                data["from activity name"],
-                data["to activity name"],
-            ):
-                if (
-                    ds[0] != ds[1].split(",")[0][2:-1]
-                    or ds[2] != ds[3].split(",")[0][2:-1]
-                ):
-                    msg = "Error in importing file with activity {} and {}".format(
-                        ds[4], ds[5]
-                    )
-                    raise IncompatibleDatabaseNamingError()
-        except IncompatibleDatabaseNamingError as e:
-            log.error(msg)
-            raise e
+        failed = pd.Series(False, index=data.index)
+        for side in ("from", "to"):
+            keys = data[f"{side} key"]
+            if keys.map(type).eq(str).any():
+                keys = parse_keys(keys)
+            failed |= data[f"{side} database"].ne(keys.str[0])
+        if failed.any():
+            ds = data.loc[failed].iloc[0]
+            log.error(
+                "Error in importing file with activity {} and {}".format(
+                    ds["from activity name"], ds["to activity name"]
+                )
+            )
+            raise IncompatibleDatabaseNamingError()
 
     @staticmethod
     def production_process_check(data: pd.DataFrame, scenario_names: list) -> None:
@@ -85,26 +172,17 @@ class ABFileImporter(ABC):
         ActivityProductionValueError is thrown with the source and destination activity names of the
         exchanges being provided
         """
-        failed = pd.DataFrame({})
-        try:
-            for scenario in scenario_names:
-                failed = pd.concat(
-                    [
-                        data.loc[
-                            (data.loc[:, "flow type"] == "production")
-                            & (data.loc[:, scenario] == 0.0)
-                        ],
-                        failed,
-                    ]
-                )
-            if not failed.empty:
-                msg = "Error with the production value in the exchange between activity {} and {}".format(
+        failed = data.loc[
+            data["flow type"].eq("production")
+            & data[scenario_names].eq(0.0).any(axis=1)
+        ]
+        if not failed.empty:
+            log.error(
+                "Error with the production value in the exchange between activity {} and {}".format(
                     failed["from activity name"], failed["to activity name"]
                 )
-                raise ActivityProductionValueError()
-        except ActivityProductionValueError as e:
-            log.error(msg)
-            raise e
+            )
+            raise ActivityProductionValueError()
 
     @staticmethod
     def na_value_check(data: pd.DataFrame, fields: list) -> None:
@@ -114,20 +192,14 @@ class ABFileImporter(ABC):
         The first contains the list of the source activity names, the second the destination activity names
         of the exchange
         """
-        hasNA = pd.DataFrame({})
-        try:
-            for field in fields:
-                hasNA = pd.concat([data.loc[data[field].isna()], hasNA])
-            if not hasNA.empty:
-                msg = (
-                    "Error with NA's in the exchange between activity {} and {}".format(
-                        hasNA["from activity name"], hasNA["to activity name"]
-                    )
+        hasNA = data.loc[data[list(fields)].isna().any(axis=1)]
+        if not hasNA.empty:
+            log.error(
+                "Error with NA's in the exchange between activity {} and {}".format(
+                    hasNA["from activity name"], hasNA["to activity name"]
                 )
-                raise InvalidSDFEntryValue()
-        except InvalidSDFEntryValue as e:
-            log.error(msg)
-            raise e
+            )
+            raise InvalidSDFEntryValue()
 
     @staticmethod
     def check_for_calculation_errors(data: pd.DataFrame) -> None:
@@ -135,18 +207,13 @@ class ABFileImporter(ABC):
         Will check for calculation errors in the scenario exchanges columns indicate the first elements in the
         scenario difference file that contain an ERROR value (only deals with divide by zero and NaN manipulations).
         """
-        scen_cols = set(data.columns).difference(
-            ABFileImporter.ABStandardProcessColumns.union(
-                ABFileImporter.ABStandardBiosphereColumns
+        scen_cols = ABFileImporter.scenario_names(data)
+        error = data.loc[data[scen_cols].isin(["#DIV/0!", "#VALUE!"]).any(axis=1)]
+        if not error.empty:
+            msg = "Error with values for the exchanges between {} and {}".format(
+                error["from activity name"].iloc[0], error["to activity name"].iloc[0]
             )
-        )
-        for scen in scen_cols:
-            error = data.loc[(data[scen] == "#DIV/0!") | (data[scen] == "#VALUE!")]
-            if not error.empty:
-                msg = "Error with values for the exchanges between {} and {}".format(
-                    data.loc[0, "from activity name"], data.loc[0, "to activity name"]
-                )
-                raise ExchangeErrorValues(msg)
+            raise ExchangeErrorValues(msg)
 
     @staticmethod
     def fill_nas(data: pd.DataFrame) -> pd.DataFrame:
@@ -196,6 +263,27 @@ class ABFileImporter(ABC):
             )
         )
 
+    @staticmethod
+    def apply_schema(data: pd.DataFrame) -> pd.DataFrame:
+        """Give the columns of a scenario difference file their types.
+
+        The keys become tuples and the scenario columns floats, if all their values are numeric. Scenario columns
+        with other values are kept as they are, so they can be reported when the scenarios are checked.
+        """
+        if not len(data.columns.intersection(SUPERSTRUCTURE)) >= MIN_SUPERSTRUCTURE_COLUMNS:
+            # not a scenario difference file, e.g. a parameter scenario file
+            return data
+        for col in data.columns.intersection(KEY_COLUMNS):
+            data[col] = parse_keys(data[col])
+        for col in ABFileImporter.scenario_names(data):
+            if pd.api.types.is_numeric_dtype(data[col]):
+                data[col] = data[col].astype(float)
+                continue
+            values = pd.to_numeric(data[col], errors="coerce")
+            if values.notna().sum() == data[col].notna().sum():
+                data[col] = values
+        return data
+
 
 class ABFeatherImporter(ABFileImporter):
     def __init__(self):
@@ -203,11 +291,63 @@ class ABFeatherImporter(ABFileImporter):
 
     @staticmethod
     def read_file(path: Optional[Union[str, Path]], **kwargs):
-        df = pd.read_feather(path)
-        # ... execute code
-        df.loc[:, "from key"] = df.loc[:, "from key"].apply(tuple)
-        df.loc[:, "to key"] = df.loc[:, "to key"].apply(tuple)
-        return df
+        import pyarrow.feather
+
+        df = table_to_frame(pyarrow.feather.read_table(str(path)))
+        return ABFileImporter.apply_schema(df)
+
+    @staticmethod
+    def read_chunks(path: Optional[Union[str, Path]], **kwargs):
+        """Read the file one record batch at a time."""
+        import pyarrow.ipc
+
+        with pyarrow.ipc.open_file(str(path)) as reader:
+            for i in range(reader.num_record_batches):
+                table = pyarrow.Table.from_batches([reader.get_batch(i)])
+                yield ABFileImporter.apply_schema(table_to_frame(table))
+
+
+class ABParquetImporter(ABFileImporter):
+    def __init__(self):
+        super(ABParquetImporter, self).__init__(self)
+
+    @staticmethod
+    def read_file(path: Optional[Union[str, Path]], **kwargs):
+        import pyarrow.parquet
+
+        df = table_to_frame(pyarrow.parquet.read_table(str(path)))
+        return ABFileImporter.apply_schema(df)
+
+    @staticmethod
+    def read_chunks(path: Optional[Union[str, Path]], chunksize: int = 65536, **kwargs):
+        """Read the file in batches of chunksize rows."""
+        import pyarrow.parquet
+
+        for batch in pyarrow.parquet.ParquetFile(str(path)).iter_batches(chunksize):
+            table = pyarrow.Table.from_batches([batch])
+            yield ABFileImporter.apply_schema(table_to_frame(table))
+
+    @staticmethod
+    def is_available() -> bool:
+        """Parquet files can only be read and written when pyarrow is installed."""
+        return pyarrow is not None
+
+    @staticmethod
+    def write_file(data: pd.DataFrame, path: Union[str, Path]) -> None:
+        """Write a scenario difference file as parquet.
+
+        The keys and categories are stored as lists of strings, the scenario columns as floats, so the file is read
+        back without any parsing.
+        """
+        data = data.copy()
+        for col in data.columns.intersection(KEY_COLUMNS + CATEGORY_COLUMNS):
+            values = parse_tuples(data[col])
+            data[col] = [list(x) if isinstance(x, tuple) else None for x in values]
+        for col in data.columns.intersection(TEXT_COLUMNS):
+            data[col] = data[col].where(data[col].isna(), data[col].astype(str))
+        for col in ABFileImporter.scenario_names(data):
+            data[col] = data[col].astype(float)
+        data.to_parquet(path, index=False)
 
 
 class ABCSVImporter(ABFileImporter):
@@ -216,16 +356,37 @@ class ABCSVImporter(ABFileImporter):
 
     @staticmethod
     def read_file(path: Optional[Union[str, Path]], **kwargs):
-        if "separator" in kwargs:
-            separator = kwargs["separator"]
-        else:
-            separator = ";"
-        df = pd.read_csv(
+        separator = kwargs.get("separator", ";")
+        if "chunksize" in kwargs:
+            return pd.concat(ABCSVImporter.read_chunks(path, **kwargs))
+        options = {
+            "compression": "infer",
+            "sep": separator,
+            "dtype": dict.fromkeys(TEXT_COLUMNS + KEY_COLUMNS, str),
+        }
+        df = None
+        if pyarrow:
+            # the multithreaded pyarrow parser never uses a column as index, but it rejects rows with more fields
+            # than the header, e.g. rows that end with a delimiter
+            try:
+                df = pd.read_csv(path, engine="pyarrow", **options)
+            except pd.errors.ParserError:
+                log.debug("Reading the csv file with the pandas parser")
+        if df is None:
+            # index_col=False drops the empty field after a trailing delimiter instead of using the first column as index
+            df = pd.read_csv(path, index_col=False, **options)
+        return ABFileImporter.apply_schema(df)
+
+    @staticmethod
+    def read_chunks(path: Optional[Union[str, Path]], chunksize: int = 65536, **kwargs):
+        """Read the file in chunks of chunksize rows."""
+        with pd.read_csv(
             path,
             compression="infer",
-            sep=separator,
+            sep=kwargs.get("separator", ";"),
             index_col=False,
-            converters={"from key": ast.literal_eval, "to key": ast.literal_eval},
-        )
-        # ... execute code
-        return df
+            dtype=dict.fromkeys(TEXT_COLUMNS + KEY_COLUMNS, str),
+            chunksize=chunksize,
+        ) as reader:
+            for df in reader:
+                yield ABFileImporter.apply_schema(df)
@@ -5,8 +5,7 @@ import numpy as np
 import pandas as pd
 from PySide2.QtWidgets import QPushButton
 
-from activity_browser.mod import bw2data as bd
-
+from ..activity_index import AB_activity_index
 from ..commontasks import format_activity_label
 from ..errors import ScenarioExchangeNotFoundError
 from ..multilca import MLCA, Contributions
@@ -140,8 +139,8 @@ class SuperstructureMLCA(MLCA):
             except:
                 # bw25 compatibility
                 return (
-                    in_dict.get(bd.get_activity(idx.input).id),
-                    self.lca.activity_dict.get(bd.get_activity(idx.output).id),
+                    in_dict.get(AB_activity_index.id(idx.input)),
+                    self.lca.activity_dict.get(AB_activity_index.id(idx.output)),
                     idx.exchange_type,
                 )
 
@@ -219,7 +218,7 @@ class SuperstructureMLCA(MLCA):
                 except:
                     # bw25 compatibility requires activity id instead of activity key
                     key = list(func_unit.keys())[0]
-                    self.lca.redo_lci({bd.get_activity(key).id: func_unit[key]})
+                    self.lca.redo_lci({AB_activity_index.id(key): func_unit[key]})
 
                 self.scaling_factors.update(
                     {(str(func_unit), ps_col): self.lca.supply_array}
@@ -255,28 +254,23 @@ class SuperstructureMLCA(MLCA):
                         self.lca.characterized_inventory.sum(axis=0)
                     )
 
+    def _supply_array(self, demand_index: int, scenario_index: Optional[int] = None) -> np.ndarray:
+        return self.scaling_factors[(str(self.func_units[demand_index]), scenario_index)]
+
     def update_lca_calculation_for_sankey(
-        self, scenario_index: int, func_unit: str, method_index: int
-    ):
+        self, scenario_index: int, demand_index: int, method_index: int
+    ) -> None:
         """
         Reuses the LCA object to prepare the LCA object for necessary calculations to be made before performing the
         Graph Traversal calculations
 
         @param scenario_index: Index of the Scenario for which the calculation must be performed
-        @param func_unit: The functional unit for which the calculation must be performed
+        @param demand_index: Index of the reference flow for which the calculation must be performed
         @param method_index: Index of the method for which the calculation must be performed
         """
         self.current = scenario_index
         self.update_matrices()
-        try:
-            self.lca.redo_lci(func_unit)
-        except:
-            # brightway25 compatibility
-            key = list(func_unit.keys())[0]
-            self.lca.redo_lci({bd.get_activity(key).id: func_unit[key]})
-        self.lca.characterization_matrix = self.method_matrices[method_index]
-        self.lca.lcia_calculation()
-        self.lca.decompose_technosphere()
+        super().update_lca_calculation_for_sankey(scenario_index, demand_index, method_index)
 
     def get_results_for_method(self, index: int = 0) -> pd.DataFrame:
         """Overrides the parent and returns a dataframe with the scenarios
@@ -334,10 +328,10 @@ class SuperstructureContributions(Contributions):
         super().__init__(mlca)
 
     def _build_inventory(
-        self, inventory: dict, indices: dict, columns: list, fields: list
+        self, inventory: dict, keys: list, columns: list, fields: list, remove_zeros: bool = False
     ) -> pd.DataFrame:
         inventory = {k[0]: v for k, v in inventory.items() if k[1] == self.mlca.current}
-        return super()._build_inventory(inventory, indices, columns, fields)
+        return super()._build_inventory(inventory, keys, columns, fields, remove_zeros)
 
     def lca_scores_df(self, normalized: bool = False) -> pd.DataFrame:
         """Returns a metadata-annotated DataFrame of the LCA scores."""
@@ -381,8 +375,11 @@ class SuperstructureContributions(Contributions):
                 self.mlca.func_key_dict[functional_unit],
                 self.mlca.method_index[method],
             )
-        self.mlca.current = scenario
-        return super().get_contributions(contribution, functional_unit, method)
+        # slice the scenario directly instead of moving mlca.current, which the other tabs rely on
+        data = dataset[contribution][:, :, scenario]
+        if method:
+            return data.take(self.mlca.method_index[method], axis=1)
+        return data.take(self.mlca.func_key_dict[functional_unit], axis=0)
 
     def _contribution_index_cols(self, **kwargs) -> (dict, Optional[Iterable]):
         # If both functional_unit and method are given, return scenario index.
@@ -28,6 +28,8 @@ SUPERSTRUCTURE = pd.Index(
         "flow type",
     ]
 )
+# a file that has all but one of the SUPERSTRUCTURE columns is still read as a scenario difference file
+MIN_SUPERSTRUCTURE_COLUMNS = len(SUPERSTRUCTURE) - 1
 
 
 def edit_superstructure_for_string(
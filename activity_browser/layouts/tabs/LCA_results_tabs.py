@@ -29,8 +29,9 @@ from activity_browser import signals, project_settings
 from activity_browser.mod.bw2data import calculation_setups
 from activity_browser.mod.bw2analyzer import ABContributionAnalysis
 
-from ...bwutils import (MLCA, Contributions, GlobalSensitivityAnalysis,
-                        MonteCarloLCA, SuperstructureMLCA, calculations)
+from ...bwutils import (MLCA, AB_results_cache, Contributions,
+                        GlobalSensitivityAnalysis, MonteCarloLCA,
+                        SuperstructureMLCA, calculations)
 from ...bwutils import commontasks as bc
 from ...ui.figures import (ContributionPlot, CorrelationPlot,
                            LCAResultsBarChart, LCAResultsPlot, MonteCarloPlot)
@@ -131,8 +132,18 @@ class LCAResultsSubTab(QTabWidget):
         self.setVisible(False)
         self.visible = False
 
+        # results of this calculation are stored under their own namespace in the shared results cache, the entries
+        # are dropped when the calculation can't be used anymore
+        self.cache_namespace = namespace = AB_results_cache.namespace(self.cs_name)
+        self.destroyed.connect(lambda: AB_results_cache.invalidate(namespace))
+        signals.calculation_setup_changed.connect(self.invalidate_cache)
+        if self.has_scenarios:
+            signals.parameter_scenario_sync.connect(self.invalidate_cache)
+            signals.parameter_superstructure_built.connect(self.invalidate_cache)
+
         QApplication.setOverrideCursor(QtCore.Qt.WaitCursor)
         self.mlca, self.contributions, self.mc = calculations.do_LCA_calculations(data)
+        self.contributions.cache_namespace = namespace
         self.method_dict = bc.get_LCIA_method_name_dict(self.mlca.methods)
         self.single_func_unit = True if len(self.mlca.func_units) == 1 else False
         self.single_method = True if len(self.mlca.methods) == 1 else False
@@ -180,6 +191,12 @@ class LCAResultsSubTab(QTabWidget):
                 tab.update_tab()
         self.tabs.sankey.update_calculation_setup(cs_name=self.cs_name)
 
+    @QtCore.Slot(name="invalidateResultsCache")
+    def invalidate_cache(self) -> None:
+        """Drop the cached results, as the tabs read the reference flows, impact categories and scenarios from the
+        (changed) calculation setup and scenario data while the calculation itself stays the same."""
+        AB_results_cache.invalidate(self.cache_namespace)
+
     @QtCore.Slot(int, name="updateUnderlyingMatrices")
     def update_scenario_data(self, index: int) -> None:
         """Will calculate which scenario array to use and update all child tabs."""
@@ -586,6 +603,8 @@ class InventoryTab(NewAnalysisTab):
     def remove_zeros_checked(self, toggled: bool):
         """Update table according to remove-zero selected."""
         self.remove_zero_state = toggled
+        # the zeros are removed when the inventories are built, so both need to be rebuilt
+        self.clear_tables()
         self.update_table()
         self.last_remove_zero_state = self.remove_zero_state
 
@@ -645,7 +664,9 @@ class InventoryTab(NewAnalysisTab):
             setattr(
                 self,
                 attr_name,
-                self.parent.contributions.inventory_df(inventory_type=inventory),
+                self.parent.contributions.inventory_df(
+                    inventory_type=inventory, remove_zeros=self.remove_zero_state
+                ),
             )
 
         # filter the biosphere flows for the relevance to the CFs
@@ -657,16 +678,6 @@ class InventoryTab(NewAnalysisTab):
                 self.categorisation_filter_with_flows, self.df_biosphere
             )
 
-        # filter the flows to remove those that have relevant exchanges
-        def filter_zeroes(df):
-            filter_on = [x for x in df.columns.tolist() if "|" in x]
-            return df[df[filter_on].sum(axis=1) != 0].reset_index(drop=True)
-
-        if self.remove_zero_state and getattr(self, "df_biosphere") is not None:
-            self.df_biosphere = filter_zeroes(self.df_biosphere)
-        if self.remove_zero_state and getattr(self, "df_technosphere") is not None:
-            self.df_technosphere = filter_zeroes(self.df_technosphere)
-
         self._update_table(getattr(self, attr_name))
 
     def clear_tables(self) -> None:
@@ -979,6 +990,13 @@ class ContributionTab(NewAnalysisTab):
         self.plot = ContributionPlot(self)
         self.table = ContributionTable(self)
         self.contribution_fn = None
+        self.contribution = None  # Contributions.EF or Contributions.ACT for tabs served by the contributions cache
+        # combinations that are still to be precomputed while the tab is visible, one per turn of the event loop
+        self.precompute_pending = []
+        self.precompute_timer = QtCore.QTimer(self)
+        self.precompute_timer.setSingleShot(True)
+        self.precompute_timer.setInterval(0)
+        self.precompute_timer.timeout.connect(self.precompute_next)
         self.has_method, self.has_func = False, False
         self.unit = None
 
@@ -1125,6 +1143,101 @@ class ContributionTab(NewAnalysisTab):
         self.combobox_menu.agg.currentIndexChanged.connect(self.update_tab)
         self.combobox_menu.scenario.currentIndexChanged.connect(self.update_tab)
 
+        # any change in settings, comparison or selection changes the combinations to precompute
+        self.cutoff_menu.slider_change.connect(self.precompute)
+        self.switches.currentIndexChanged.connect(self.precompute)
+        self.combobox_menu.method.currentIndexChanged.connect(self.precompute)
+        self.combobox_menu.func.currentIndexChanged.connect(self.precompute)
+        self.combobox_menu.agg.currentIndexChanged.connect(self.precompute)
+        self.combobox_menu.scenario.currentIndexChanged.connect(self.precompute)
+        self.relativity.relative.toggled.connect(self.precompute)
+        self.total_menu.range.toggled.connect(self.precompute)
+
+    def contribution_settings(self) -> dict:
+        """Return the cut-off and normalization arguments for the contribution calculations."""
+        return {
+            "limit": self.cutoff_menu.cutoff_value,
+            "limit_type": self.cutoff_menu.limit_type,
+            "normalize": self.relative,
+            "total_range": self.total_range,
+        }
+
+    def combinations(self) -> List[dict]:
+        """Return the update_dataframe arguments for the combinations one combobox change away from the current one.
+
+        These are the tables the user is most likely to look at next, precomputing all combinations would fill the
+        results cache with tables that are never shown.
+        """
+        aggregator = self.combobox_menu.agg.currentText()
+        current = {
+            "method": self.parent.method_dict.get(self.combobox_menu.method.currentText()),
+            "functional_unit": self.combobox_menu.func.currentText(),
+            "scenario": max(self.combobox_menu.scenario.currentIndex(), 0),
+        }
+        options = {
+            "method": list(self.parent.method_dict.values()),
+            "functional_unit": list(self.parent.mlca.func_unit_translation_dict.keys()),
+            "scenario": list(range(max(self.combobox_menu.scenario.count(), 1))),
+        }
+
+        if self.switches.currentIndex() == self.switches.indexes.func:
+            free = ["method", "scenario"]
+        elif self.switches.currentIndex() == self.switches.indexes.method:
+            free = ["functional_unit", "scenario"]
+        elif self.switches.currentIndex() == self.switches.indexes.scenario:
+            free = ["method", "functional_unit"]
+        else:
+            free = []
+
+        settings = {
+            "aggregator": None if aggregator == "none" else aggregator,
+            **self.contribution_settings(),
+        }
+        fields = []
+        for changed in free:
+            for option in options[changed]:
+                if option != current[changed]:
+                    fields.append({**{field: current[field] for field in free}, changed: option})
+        return [{**field, **settings} for field in fields]
+
+    @QtCore.Slot(name="precomputeContributions")
+    def precompute(self):
+        """(Re)start calculating the tables one combobox change away from the shown one.
+
+        The tables are calculated on the main thread, which shares the MLCA with the other tabs, one combination per
+        turn of the event loop so the interface stays responsive in between, and only while the tab is visible. The
+        results end up in the results cache, so switching to them doesn't have to calculate anything.
+        """
+        self.precompute_pending = []
+        self.precompute_timer.stop()
+        if self.contribution is None or not self.isVisible():
+            return
+        self.precompute_pending = self.combinations()
+        self.precompute_timer.start()
+
+    @QtCore.Slot(name="precomputeNext")
+    def precompute_next(self):
+        if not self.precompute_pending or not self.isVisible():
+            return
+        kwargs = self.precompute_pending.pop(0)
+        try:
+            self.parent.contributions.top_contributions(self.contribution, **kwargs)
+        except Exception as e:
+            # the table is calculated (and the error shown) again when it is selected
+            log.debug(f"Precomputing contributions failed for {kwargs}: {e}")
+            self.precompute_pending = []
+            return
+        self.precompute_timer.start()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.precompute()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.precompute_pending = []
+        self.precompute_timer.stop()
+
     def update_tab(self):
         """Update the tab."""
         QApplication.setOverrideCursor(QtCore.Qt.WaitCursor)
@@ -1191,6 +1304,7 @@ class ElementaryFlowContributionTab(ContributionTab):
         self.layout.addLayout(self.build_export(True, True))
 
         self.contribution_fn = "EF contributions"
+        self.contribution = self.parent.contributions.EF
         self.switches.configure(self.has_func, self.has_method)
         self.connect_signals()
         self.toggle_comparisons(self.switches.indexes.func)
@@ -1203,12 +1317,8 @@ class ElementaryFlowContributionTab(ContributionTab):
 
     def update_dataframe(self, *args, **kwargs):
         """Retrieve the top elementary flow contributions."""
-        return self.parent.contributions.top_elementary_flow_contributions(
-            **kwargs,
-            limit=self.cutoff_menu.cutoff_value,
-            limit_type=self.cutoff_menu.limit_type,
-            normalize=self.relative,
-            total_range=self.total_range,
+        return self.parent.contributions.top_contributions(
+            self.contribution, **kwargs, **self.contribution_settings()
         )
 
 
@@ -1245,6 +1355,7 @@ class ProcessContributionsTab(ContributionTab):
         self.layout.addLayout(self.build_export(True, True))
 
         self.contribution_fn = "Process contributions"
+        self.contribution = self.parent.contributions.ACT
         self.switches.configure(self.has_func, self.has_method)
         self.connect_signals()
         self.toggle_comparisons(self.switches.indexes.func)
@@ -1259,12 +1370,8 @@ class ProcessContributionsTab(ContributionTab):
 
     def update_dataframe(self, *args, **kwargs):
         """Retrieve the top process contributions"""
-        return self.parent.contributions.top_process_contributions(
-            **kwargs,
-            limit=self.cutoff_menu.cutoff_value,
-            limit_type=self.cutoff_menu.limit_type,
-            normalize=self.relative,
-            total_range=self.total_range,
+        return self.parent.contributions.top_contributions(
+            self.contribution, **kwargs, **self.contribution_settings()
         )
 
 
@@ -1295,11 +1402,11 @@ class FirstTierContributionsTab(ContributionTab):
     def __init__(self, cs_name, parent=None):
         super().__init__(parent)
 
-        self.cache = {"scores": {}, "ranges": {}}  # We cache the calculated data, as it can take some time to generate.
-        # We cache the individual calculation results, as they are re-used in multiple views
-        # e.g. FU1 x method1 x scenario1
+        # We cache the individual calculation results in the shared results cache, as they are re-used in multiple
+        # views, e.g. FU1 x method1 x scenario1
         # may be seen in both 'Reference Flows' and 'Impact Categories', just with different axes.
         # we also cache scores/ranges, not for calculation speed, but to be able to easily convert for relative results
+        self.cache = {"scores": {}, "ranges": {}}
         self.caching = True  # set to False to disable caching for debug
 
         header = get_header_layout_w_help("First Tier Contributions", self.help_button)
@@ -1341,18 +1448,21 @@ class FirstTierContributionsTab(ContributionTab):
         return super().build_combobox(has_method, has_func)
 
     def get_data(self, compare) -> List[list]:
-        """Get the data for analysis, either from self.cache or from calculation."""
+        """Get the data for analysis, either from the results cache or from calculation."""
         def try_cache():
             """Get data from cache if exists, otherwise return none."""
             if self.caching:
-                return self.cache.get(cache_key, None)
+                return AB_results_cache.get(cache_key)
 
         def calculate():
-            """Shorthand for getting calculation results."""
-            return self.calculate_contributions(demand, demand_key, demand_index,
-                                                method=method, method_index=method_index,
-                                                scenario_lca=self.has_scenarios, scenario_index=scenario_index,
-                                                )
+            """Shorthand for getting calculation results.
+
+            The contributions are calculated for all methods at once, so cache them all."""
+            results = self.calculate_contributions(demand_key, demand_index, scenario_index=scenario_index)
+            if self.caching:
+                for i, result in enumerate(results):
+                    AB_results_cache.put((self.parent.cache_namespace, "ft", demand_index, i, scenario_index), result)
+            return results[method_index]
 
         # get the right data
         if self.has_scenarios:
@@ -1371,20 +1481,18 @@ class FirstTierContributionsTab(ContributionTab):
             # run the analysis for every reference flow
             for demand_index, demand in enumerate(self.func_units):
                 demand_key = self.func_keys[demand_index]
-                cache_key = (demand_index, method_index, scenario_index)
+                cache_key = (self.parent.cache_namespace, "ft", demand_index, method_index, scenario_index)
                 # get data from cache if exists, otherwise calculate
                 if data := try_cache():
                     all_data.append([demand_key, data])
                     continue
 
                 data = calculate()
-                if self.caching:
-                    self.cache[cache_key] = data
                 all_data.append([demand_key, data])
         elif compare == "Impact Categories":
             # run the analysis for every method
             for method_index, method in enumerate(self.methods):
-                cache_key = (demand_index, method_index, scenario_index)
+                cache_key = (self.parent.cache_namespace, "ft", demand_index, method_index, scenario_index)
 
                 # get data from cache if exists, otherwise calculate
                 if data := try_cache():
@@ -1392,14 +1500,12 @@ class FirstTierContributionsTab(ContributionTab):
                     continue
 
                 data = calculate()
-                if self.caching:
-                    self.cache[cache_key] = data
                 all_data.append([method, data])
         elif compare == "Scenarios":
             # run the analysis for every scenario
             for scenario_index in range(self.combobox_menu.scenario.count()):
                 scenario = self.combobox_menu.scenario.itemText(scenario_index)
-                cache_key = (demand_index, method_index, scenario_index)
+                cache_key = (self.parent.cache_namespace, "ft", demand_index, method_index, scenario_index)
 
                 # get data from cache if exists, otherwise calculate
                 if data := try_cache():
@@ -1407,113 +1513,47 @@ class FirstTierContributionsTab(ContributionTab):
                     continue
 
                 data = calculate()
-                if self.caching:
-                    self.cache[cache_key] = data
                 all_data.append([scenario, data])
 
         return all_data
 
-    def calculate_contributions(self, demand, demand_key, demand_index,
-                                method, method_index: int = None,
-                                scenario_lca: bool = False, scenario_index: int = None) -> dict:
-        """Retrieve relevant activity data and calculate first tier contributions."""
-
-        def get_default_demands() -> dict:
-            """Get the inputs to calculate contributions from the activity"""
-            # get exchange keys leading to this activity
-            technosphere = bd.get_activity(demand_key).technosphere()
-
-            keys = [exch.input.key for exch in technosphere if
-                    exch.input.key != exch.output.key]
-            # find scale from production amount and demand amount
-            scale = demand[demand_key] / [p for p in bd.get_activity(demand_key).production()][0].amount
-
-            amounts = [exch.amount * scale for exch in technosphere if
-                       exch.input.key != exch.output.key]
-            demands = {}
-            for key, amount in zip(keys, amounts):
-                demands[key] = demands.get(key, 0) + amount
-            return demands
-
-        def get_scenario_demands() -> dict:
-            """Get the inputs to calculate contributions from the scenario matrix"""
-            # get exchange keys leading to this activity
-            technosphere = bd.get_activity(demand_key).technosphere()
-            demand_idx = _lca.product_dict[demand_key]
-
-            keys = [exch.input.key for exch in technosphere if
-                    exch.input.key != exch.output.key]
-            # find scale from production amount and demand amount
-            scale = demand[demand_key] / _lca.technosphere_matrix[_lca.activity_dict[demand_key], demand_idx] * -1
-
-            amounts = []
-
-            for exch in technosphere:
-                exch_idx = _lca.activity_dict[exch.input.key]
-                if exch.input.key != exch.output.key:
-                    amounts.append(_lca.technosphere_matrix[exch_idx, demand_idx] * scale)
-
-            # write al non-zero exchanges to demand dict
-            demands = {}
-            for key, amount in zip(keys, amounts):
-                if amount != 0:
-                    demands[key] = demands.get(key, 0) + amount
-            return demands
-
-        # reuse LCA object from original calculation to skip 1 LCA
-        if scenario_lca:
-            # get score from the already calculated result
-            score = self.parent.mlca.lca_scores[demand_index, method_index, scenario_index]
-
-            # get lca object from mlca class
-            self.parent.mlca.current = scenario_index
-            self.parent.mlca.update_matrices()
-            _lca = self.parent.mlca.lca
-            _lca.redo_lci(demand)
-
-        else:
-            # get score from the already calculated result
-            score = self.parent.mlca.lca_scores[demand_index, method_index]
+    def calculate_contributions(self, demand_key, demand_index, scenario_index: int = None) -> List[dict]:
+        """Calculate the first tier contributions of a reference flow for all methods.
 
-            # get lca object to calculate new results
-            _lca = self.parent.mlca.lca
-
-        # set the correct method
-        _lca.switch_method(method)
-        _lca.lcia_calculation()
-
-        if score == 0:
-            # no need to calculate contributions to '0' score
-            # technically it could be that positive and negative score of same amount negate to 0, but highly unlikely.
-            return {"Score": 0, "Range": 0, demand_key: 0}
-
-        data = {"Score": score}
-        _range = []
-        remainder = score  # contribution of demand_key
-
-        if not scenario_lca:
-            new_demands = get_default_demands()
+        The direct inputs are taken from the technosphere matrix and solved together, see
+        `MLCA.first_tier_contributions`. Returns a data dict per method, in the order of the methods.
+        """
+        mlca = self.parent.mlca
+        if self.has_scenarios:
+            # set the matrices of the scenario, the scores are already calculated
+            mlca.current = scenario_index
+            mlca.update_matrices()
+            scores = mlca.lca_scores[demand_index, :, scenario_index]
         else:
-            new_demands = get_scenario_demands()
+            scores = mlca.lca_scores[demand_index, :]
 
-        # iterate over all activities demand_key is connected to
-        for key, amt in new_demands.items():
+        keys, contributions = mlca.first_tier_contributions(demand_index)
 
-            # recalculate for this demand
-            _lca.redo_lci({key: amt})
-            _lca.redo_lcia()
+        all_data = []
+        for method_index, score in enumerate(scores):
+            if score == 0:
+                # no need to calculate contributions to '0' score
+                # technically it could be that positive and negative score of same amount negate to 0, but highly unlikely.
+                all_data.append({"Score": 0, "Range": 0, demand_key: 0})
+                continue
 
-            score = _lca.score
-            if score != 0:
+            data = {"Score": score}
+            column = contributions[:, method_index]
+            for key, contribution in zip(keys, column):
                 # only store non-zero results
-                data[key] = score
-                _range.append(abs(score))
-                remainder -= score  # subtract this from remainder
-
-        data[demand_key] = remainder
-        _range.append(abs(remainder))
-        data["Range"] = sum(_range)
-        return data
+                if contribution != 0:
+                    data[key] = data.get(key, 0) + contribution
+
+            remainder = score - column.sum()  # contribution of demand_key
+            data[demand_key] = remainder
+            data["Range"] = np.abs(column).sum() + abs(remainder)
+            all_data.append(data)
+        return all_data
 
     def key_to_metadata(self, key: tuple) -> list:
         """Convert the key information to list with metadata.
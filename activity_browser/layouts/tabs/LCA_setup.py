@@ -9,8 +9,10 @@ from activity_browser import actions, signals
 from activity_browser.mod import bw2data as bd
 
 from ...bwutils.errors import *
-from ...bwutils.superstructure import (SUPERSTRUCTURE, ABCSVImporter,
-                                       ABFeatherImporter, ABPopup,
+from ...bwutils.superstructure import (MIN_SUPERSTRUCTURE_COLUMNS,
+                                       SUPERSTRUCTURE, ABCSVImporter,
+                                       ABFeatherImporter, ABParquetImporter,
+                                       ABPopup,
                                        SuperstructureManager, _time_it_,
                                        edit_superstructure_for_string,
                                        import_from_excel,
@@ -508,15 +510,18 @@ class ScenarioImportPanel(BaseRightTab):
 
     @Slot(int, name="SaveScenarioDataframe")
     def save_action(self) -> None:
-        """Creates and saves to file (.xlsx, or .csv) the scenario dataframe after the loaded scenarios have been
-        merged. Will not contain duplicates. Will not contain self-referential technosphere flows.
+        """Creates and saves to file (.xlsx, .csv or .parquet) the scenario dataframe after the loaded scenarios have
+        been merged. Will not contain duplicates. Will not contain self-referential technosphere flows.
 
         Triggered by a signal from ScenarioImportPanel save button, uses a dummy input argument.
         """
+        file_filter = "Excel (*.xlsx *.xls);; CSV (*.csv)"
+        if ABParquetImporter.is_available():
+            file_filter += ";; Parquet (*.parquet)"
         filepath, _ = QtWidgets.QFileDialog.getSaveFileName(
             parent=self,
             caption="Choose location to save the scenario file",
-            filter="Excel (*.xlsx *.xls);; CSV (*.csv)",
+            filter=file_filter,
         )
         print("Saving scenario dataframe to file: ", filepath)
         scenarios = self._scenario_dataframe.columns.difference(
@@ -537,6 +542,9 @@ class ScenarioImportPanel(BaseRightTab):
         if filepath.endswith(".xlsx") or filepath.endswith(".xls"):
             savedf.to_excel(filepath, index=False)
             return
+        elif filepath.endswith(".parquet") and ABParquetImporter.is_available():
+            ABParquetImporter.write_file(savedf, filepath)
+            return
         elif not filepath.endswith(".csv"):
             filepath += ".csv"
         savedf.to_csv(filepath, index=False, sep=";")
@@ -599,12 +607,14 @@ class ScenarioImportWidget(QtWidgets.QWidget):
                 # Choose a different routine for reading the file dependent on file type
                 if file_type_suffix == ".feather":
                     df = ABFeatherImporter.read_file(path)
+                elif file_type_suffix == ".parquet":
+                    df = ABParquetImporter.read_file(path)
                 elif file_type_suffix.startswith(".xls"):
                     df = import_from_excel(path, idx)
                 else:
                     df = ABCSVImporter.read_file(path, separator=separator)
                 # Read in the file as a scenario flow table if the file is arranged as one
-                if len(df.columns.intersection(SUPERSTRUCTURE)) >= 12:
+                if len(df.columns.intersection(SUPERSTRUCTURE)) >= MIN_SUPERSTRUCTURE_COLUMNS:
                     if df is None:
                         QtWidgets.QApplication.restoreOverrideCursor()
                         return
@@ -263,15 +263,24 @@ class ActivityBiosphereWidget(QtWidgets.QWidget):
         self.reset_search_button.clicked.connect(self.table.reset_search)
         self.reset_search_button.clicked.connect(self.search_box.clear)
 
+        # search all databases of the project
+        self.search_all_box = QtWidgets.QCheckBox("All databases")
+        self.search_all_box.setToolTip("Search the activities and flows of all databases, best matches first")
+        self.search_all_box.toggled.connect(self.set_search_term)
+
         bd.projects.current_changed.connect(self.search_box.clear)
         self.header_layout.addWidget(self.search_box)
         self.header_layout.addWidget(self.search_button)
         self.header_layout.addWidget(self.reset_search_button)
+        self.header_layout.addWidget(self.search_all_box)
 
     def set_search_term(self):
         search_term = self.search_box.text().strip()
         self.search_active = search_term
-        self.table.search(search_term)
+        if search_term and self.search_all_box.isChecked():
+            self.table.search_project(search_term)
+        else:
+            self.table.search(search_term)
         if isinstance(self.tree, ActivitiesBiosphereTree):
             self.tree.search(search_term)
 
@@ -293,6 +302,7 @@ class ActivityBiosphereWidget(QtWidgets.QWidget):
         ):  # only update if the database changed is the one shown by this widget
             return
 
+        project_search = self.table.model.project_search
         self.table.model.sync(self.database.name, query=self.table.model.query)
 
         if (
@@ -326,3 +336,7 @@ class ActivityBiosphereWidget(QtWidgets.QWidget):
             self.mode_radio_list.hide()
             self.mode_radio_tree.hide()
             self.table.show()
+
+        if project_search:
+            # show the results of the project search again, now including the changes
+            self.table.search_project(self.table.model.query)
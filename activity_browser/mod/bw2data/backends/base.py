@@ -6,7 +6,7 @@ except ModuleNotFoundError:
 
 from activity_browser.mod.patching import patch_superclass, patched
 from activity_browser.signals import (qactivity_list, qdatabase_list,
-                                      qexchange_list)
+                                      qdatabases, qexchange_list)
 
 from .proxies import Activity, ActivityDataset, Exchange, ExchangeDataset
 
@@ -34,31 +34,24 @@ class SQLiteBackend(SQLiteBackend):
         # get all affected activities and exchanges that have QUpdater counterparts (i.e. have signals attached to them)
         acts = [
             (Activity(ActivityDataset.get_by_id(qact["id"])), qact)
-            for qact in qactivity_list
-            if qact["database"] == self.name
+            for qact in qactivity_list.in_database(self.name)
         ]
 
         excs = [
             (Exchange(ExchangeDataset.get_by_id(qexc["id"])), qexc)
-            for qexc in qexchange_list
-            if qexc["input_database"] == self.name
-            or qexc["output_database"] == self.name
+            for qexc in qexchange_list.in_database(self.name)
         ]
 
         # execute the patched function for standard functionality
         patched[SQLiteBackend]["delete"](self, *args, **kwargs)
 
+        # a single ChangeSet entry covers every record of the deleted database
+        qdatabases.record(deleted_databases=[self.name])
+
         # emit the deleted db, affected activities, and affected exchanges
-        [
+        if qdb := qdatabase_list.get(self.name):
             qdb.emitLater("changed", self)
-            for qdb in qdatabase_list
-            if qdb["name"] == self.name
-        ]
-        [
             qdb.emitLater("deleted", self)
-            for qdb in qdatabase_list
-            if qdb["name"] == self.name
-        ]
 
         for act, qact in acts:
             qact.emitLater("changed", act)
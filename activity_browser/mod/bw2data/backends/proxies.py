@@ -8,7 +8,7 @@ from bw2data import Database
 
 from activity_browser.mod.patching import patch_superclass, patched
 from activity_browser.signals import (qactivity_list, qdatabase_list,
-                                      qexchange_list)
+                                      qdatabases, qexchange_list)
 
 
 @patch_superclass
@@ -16,19 +16,19 @@ class Exchanges(Exchanges):
 
     def delete(self):
         # find only the exchanges that have qexchange counterparts within ourselves
-        exc_query = ExchangeDataset.id << [qexc["id"] for qexc in qexchange_list]
+        exc_query = ExchangeDataset.id << list(qexchange_list.registry)
         exc_args = self._args + [exc_query]
         excs = [Exchange(doc) for doc in ExchangeDataset.select().where(*exc_args)]
 
         # find only the input or output activities that have qactivity counterparts
 
-        # get all qactivity keys
-        act_keys = [(qact["database"], qact["code"]) for qact in qactivity_list]
+        # get all qactivity keys, as a set so membership checks below don't scan
+        act_keys = set(qactivity_list.keys)
 
         # gather affected output activities
 
         # construct a preliminary query using only the output code (this should get us very far)
-        act_query = ExchangeDataset.output_code << [key[1] for key in act_keys]
+        act_query = ExchangeDataset.output_code << list({key[1] for key in act_keys})
 
         # combine with the existing query
         act_args = self._args + [act_query]
@@ -43,7 +43,7 @@ class Exchanges(Exchanges):
         # gather affected input activities
 
         # same process as above but for input_code and input_database
-        act_query = ExchangeDataset.input_code << [key[1] for key in act_keys]
+        act_query = ExchangeDataset.input_code << list({key[1] for key in act_keys})
         act_args = self._args + [act_query]
         acts.update(
             {
@@ -56,37 +56,40 @@ class Exchanges(Exchanges):
         # use the activities set to create a database set as well
         dbs = set([act["database"] for act in acts])
 
+        # collect all exchanges that will be deleted for the ChangeSet, not only the ones with QUpdaters
+        deleted = [
+            (exc_id, (in_db, in_code), (out_db, out_code))
+            for exc_id, in_db, in_code, out_db, out_code in ExchangeDataset.select(
+                ExchangeDataset.id,
+                ExchangeDataset.input_database,
+                ExchangeDataset.input_code,
+                ExchangeDataset.output_database,
+                ExchangeDataset.output_code,
+            )
+            .where(*self._args)
+            .tuples()
+        ]
+
         # execute the patched function for standard functionality
         patched[Exchanges]["delete"](self)
 
+        qdatabases.record(exchanges=deleted)
+
         # emitting change through any existing exchange QUpdaters
         for exc in excs:
-            [
+            if qexc := qexchange_list.get(exc._document.id):
                 qexc.emitLater("changed", exc)
-                for qexc in qexchange_list
-                if qexc["id"] == exc._document.id
-            ]
-            [
                 qexc.emitLater("deleted", exc)
-                for qexc in qexchange_list
-                if qexc["id"] == exc._document.id
-            ]
 
         # emitting change through any existing activity QUpdaters
         for act in acts:
-            [
+            if qact := qactivity_list.get(act._document.id):
                 qact.emitLater("changed", act)
-                for qact in qactivity_list
-                if qact["id"] == act._document.id
-            ]
 
         # emitting change through any existing database QUpdaters
         for db_name in dbs:
-            [
+            if qdb := qdatabase_list.get(db_name):
                 qdb.emitLater("changed", Database(db_name))
-                for qdb in qdatabase_list
-                if qdb["name"] == db_name
-            ]
 
 
 @patch_superclass
@@ -117,25 +120,23 @@ class Activity(Activity):
         # this is called already within the patched function, but needs to be recalled now the data is actually updated
         databases.set_modified(self["database"])
 
-        # should eventually be replaced
-        AB_metadata.update_metadata(self.key)
+        # should eventually be replaced, within a batch the metadata is updated once when the batch closes
+        if qdatabases.batch_depth:
+            qdatabases.deferred_metadata.add(self.key)
+        else:
+            AB_metadata.update_metadata(self.key)
+
+        qdatabases.record(activities=[self.key])
 
         # exchanges cannot be changed through the activity proxy save function
 
         # emitting change through any existing qactivities (should be 1 or None)
-        [
+        if qact := qactivity_list.get(self._document.id):
             qact.emitLater("changed", self)
-            for qact in qactivity_list
-            if qact["id"] == self._document.id
-        ]
 
         # emitting change through an existing qdatabases (should be 1 or None)
-        db = Database(self["database"])
-        [
-            qdb.emitLater("changed", db)
-            for qdb in qdatabase_list
-            if qdb["name"] == self["database"]
-        ]
+        if qdb := qdatabase_list.get(self["database"]):
+            qdb.emitLater("changed", Database(self["database"]))
 
     def delete(self) -> None:
         from activity_browser.bwutils.metadata import AB_metadata
@@ -145,30 +146,24 @@ class Activity(Activity):
 
         databases.set_modified(self["database"])
 
-        # this is leading to a lot of calls and should eventually be dealt with
-        AB_metadata.update_metadata(self.key)
+        # this is leading to a lot of calls, so within a batch the metadata is updated once when the batch closes
+        if qdatabases.batch_depth:
+            qdatabases.deferred_metadata.add(self.key)
+        else:
+            AB_metadata.update_metadata(self.key)
+
+        qdatabases.record(activities=[self.key])
 
         # exchange deletions will emit for themselves
 
         # emitting change through any existing qactivities (should be 1 or None)
-        [
+        if qact := qactivity_list.get(self._document.id):
             qact.emitLater("changed", self)
-            for qact in qactivity_list
-            if qact["id"] == self._document.id
-        ]
-        [
             qact.emitLater("deleted", self)
-            for qact in qactivity_list
-            if qact["id"] == self._document.id
-        ]
 
         # emitting change through an existing qdatabases (should be 1 or None)
-        db = Database(self["database"])
-        [
-            qdb.emitLater("changed", db)
-            for qdb in qdatabase_list
-            if qdb["name"] == self["database"]
-        ]
+        if qdb := qdatabase_list.get(self["database"]):
+            qdb.emitLater("changed", Database(self["database"]))
 
 
 @patch_superclass
@@ -202,12 +197,13 @@ class Exchange(Exchange):
         # execute the patched function for standard functionality
         patched[Exchange]["save"](self)
 
+        qdatabases.record(
+            exchanges=[(self._document.id, tuple(self["input"]), tuple(self["output"]))]
+        )
+
         # emitting change through any existing qexchanges (should be 1 or None)
-        [
+        if qexc := qexchange_list.get(self._document.id):
             qexc.emitLater("changed", self)
-            for qexc in qexchange_list
-            if qexc["id"] == self._document.id
-        ]
 
         # collecting unique activities and databases that have changed
         acts = set()
@@ -220,20 +216,13 @@ class Exchange(Exchange):
         # emitting change through any existing qactivities
         for activity in acts:
             dbs.add(activity["database"])
-            [
+            if qact := qactivity_list.get(activity._document.id):
                 qact.emitLater("changed", activity)
-                for qact in qactivity_list
-                if qact["id"] == activity._document.id
-            ]
 
         # emitting change through any existing qdatabases
         for db_name in dbs:
-            db = Database(db_name)
-            [
-                qdb.emitLater("changed", db)
-                for qdb in qdatabase_list
-                if qdb["name"] == db_name
-            ]
+            if qdb := qdatabase_list.get(db_name):
+                qdb.emitLater("changed", Database(db_name))
 
         self.moved_IO.clear()
 
@@ -241,41 +230,23 @@ class Exchange(Exchange):
         # execute the patched function for standard functionality
         patched[Exchange]["delete"](self)
 
+        qdatabases.record(
+            exchanges=[(self._document.id, tuple(self["input"]), tuple(self["output"]))]
+        )
+
         # emitting change and deletion through any existing qexchanges (should be 1 or None)
-        [
+        if qexc := qexchange_list.get(self._document.id):
             qexc.emitLater("changed", self)
-            for qexc in qexchange_list
-            if qexc["id"] == self._document.id
-        ]
-        [
             qexc.emitLater("deleted", self)
-            for qexc in qexchange_list
-            if qexc["id"] == self._document.id
-        ]
 
         # emitting change for any existing qactivities (should be 1 or None)
-        [
+        if qact := qactivity_list.get(self.input._document.id):
             qact.emitLater("changed", self.input)
-            for qact in qactivity_list
-            if qact["id"] == self.input._document.id
-        ]
-        [
+        if qact := qactivity_list.get(self.output._document.id):
             qact.emitLater("changed", self.output)
-            for qact in qactivity_list
-            if qact["id"] == self.output._document.id
-        ]
 
         # emitting change for related databases
-        in_db = Database(self.input["database"])
-        [
-            qdb.emitLater("changed", in_db)
-            for qdb in qdatabase_list
-            if qdb["name"] == in_db.name
-        ]
-
-        out_db = Database(self.output["database"])
-        [
-            qdb.emitLater("changed", out_db)
-            for qdb in qdatabase_list
-            if qdb["name"] == out_db.name
-        ]
+        if qdb := qdatabase_list.get(self.input["database"]):
+            qdb.emitLater("changed", Database(self.input["database"]))
+        if qdb := qdatabase_list.get(self.output["database"]):
+            qdb.emitLater("changed", Database(self.output["database"]))
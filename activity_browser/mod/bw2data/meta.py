@@ -1,3 +1,5 @@
+from contextlib import contextmanager
+
 from bw2data.meta import *
 
 from activity_browser.signals import qcalculation_setups, qdatabases, qmethods
@@ -21,6 +23,38 @@ class Databases(Databases):
         """
         return qdatabases.metadata_changed
 
+    @property
+    def records_changed(self):
+        """
+        Shorthand for connecting to the ChangeSet signal of the qdatabases QUpdater. Emits a single ChangeSet with all
+        activities, exchanges and databases affected since the event loop last woke.
+        """
+        return qdatabases.records_changed
+
+    @property
+    def in_batch(self) -> bool:
+        return qdatabases.batch_depth > 0
+
+    @contextmanager
+    def batch(self):
+        """
+        Group a bulk mutation, like relinking or deleting many activities. Within the batch, the metadata store is not
+        updated for every saved or deleted activity, but once for all of them when the outermost batch closes.
+
+        Batches belong to the thread that opens them, saves in other threads are not deferred.
+        """
+        qdatabases.batch_depth += 1
+        try:
+            yield qdatabases.changeset
+        finally:
+            qdatabases.batch_depth -= 1
+            if qdatabases.batch_depth == 0 and qdatabases.deferred_metadata:
+                from activity_browser.bwutils.metadata import AB_metadata
+
+                keys = qdatabases.deferred_metadata
+                qdatabases.deferred_metadata = set()
+                AB_metadata.update_metadata_many(keys)
+
     def flush(self):
         """
         Emit that the databases have changed when it's data is flushed to disk a.k.a. saved.
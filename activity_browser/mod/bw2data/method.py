@@ -28,27 +28,17 @@ class Method(Method):
         patched[Method]["write"](self, data, process)
 
         # emit for any corresponding qmethod that exists in qmethod_list (each method that has widgets connected to it)
-        [
+        if qmthd := qmethod_list.get(self.name):
             qmthd.emitLater("changed", self)
-            for qmthd in qmethod_list
-            if qmthd["name"] == self.name
-        ]
 
     def deregister(self):
         # execute the patched function for standard functionality
         patched[Method]["deregister"](self)
 
         # emit for any corresponding qmethod that exists in qmethod_list (each method that has widgets connected to it)
-        [
+        if qmthd := qmethod_list.get(self.name):
             qmthd.emitLater("deleted", self)
-            for qmthd in qmethod_list
-            if qmthd["name"] == self.name
-        ]
-        [
             qmthd.emitLater("changed", self)
-            for qmthd in qmethod_list
-            if qmthd["name"] == self.name
-        ]
 
     # extending Brightway Functionality
     def load_dict(self) -> dict:
@@ -61,16 +61,9 @@ class PatchedParameterBase(ParameterBase):
             # call the database with the where *args supplied by the user
             for param in cls.select().where(*args):
                 # emit that any connected params will be changed and deleted
-                [
+                if qprm := qparameter_list.get(param.key):
                     qprm.emitLater("changed", param)
-                    for qprm in qparameter_list
-                    if qprm["key"] == param.key
-                ]
-                [
                     qprm.emitLater("deleted", param)
-                    for qprm in qparameter_list
-                    if qprm["key"] == param.key
-                ]
 
             # also emit the overall qparameters
             qparameters.emitLater("parameters_changed")
@@ -83,16 +76,9 @@ class PatchedParameterBase(ParameterBase):
             # collect al params from the database
             for param in cls.select():
                 # emit that any connected params will be changed and deleted
-                [
+                if qprm := qparameter_list.get(param.key):
                     qprm.emitLater("changed", param)
-                    for qprm in qparameter_list
-                    if qprm["key"] == param.key
-                ]
-                [
                     qprm.emitLater("deleted", param)
-                    for qprm in qparameter_list
-                    if qprm["key"] == param.key
-                ]
 
             # also emit the overall qparameters
             qparameters.emitLater("parameters_changed")
@@ -117,16 +103,9 @@ class PatchedParameterBase(ParameterBase):
             # call the database with the where *args supplied by the user
             for param in cls.select().where(*where_args):
                 # emit that any connected params will be changed
-                [
+                if qprm := qparameter_list.get(param.key):
                     qprm.emitLater("changed", param)
-                    for qprm in qparameter_list
-                    if qprm["key"] == param.key
-                ]
-                [
                     qprm.emitLater("deleted", param)
-                    for qprm in qparameter_list
-                    if qprm["key"] == param.key
-                ]
 
             # also emit the overall qparameters
             qparameters.emitLater("parameters_changed")
@@ -141,16 +120,9 @@ class PatchedParameterBase(ParameterBase):
         def execute():
             for param in cls.select():
                 # emit that any connected params will be changed
-                [
+                if qprm := qparameter_list.get(param.key):
                     qprm.emitLater("changed", param)
-                    for qprm in qparameter_list
-                    if qprm["key"] == param.key
-                ]
-                [
                     qprm.emitLater("deleted", param)
-                    for qprm in qparameter_list
-                    if qprm["key"] == param.key
-                ]
 
             # also emit the overall qparameters
             qparameters.emitLater("parameters_changed")
@@ -179,11 +151,8 @@ class PatchedParameterBase(ParameterBase):
         patched[ParameterBase]["save"](self, **kwargs)
 
         # signal the changed parameter if it has signals connected to it
-        [
+        if qprm := qparameter_list.get(self.key):
             qprm.emitLater("changed", self)
-            for qprm in qparameter_list
-            if qprm["key"] == self.key
-        ]
 
         # always signal through the qparameters if a parameter has changed
         qparameters.emitLater("parameters_changed")
@@ -1,4 +1,7 @@
 # -*- coding: utf-8 -*-
+import threading
+from typing import Optional
+
 from bw2data import Method, get_activity
 from bw2data.parameters import ParameterBase
 from PySide2.QtCore import QObject, Qt, QThread, Signal, SignalInstance
@@ -236,20 +239,22 @@ class QUpdater(QObject):
         Emit all currently cached signals and clear the cache. If triggered by an eventdispatcher or thread, this slot
         will try to disconnect to avoid unnecessary calls when the cache is empty.
         """
-        # emit all signals in the cache
-        for key, value in self.cache.items():
+        # take the cache so the signals are only emitted once, signals cached while emitting are emitted next time
+        for key, value in self.take_cache().items():
             signal = getattr(self, key)
             signal.emit(*value)
 
-        # clear the cache so they are only emitted once
-        self.cache.clear()
-
         # cleaning up the connections
         if self.sender() == application.thread().eventDispatcher():
             self.sender().awake.disconnect(self.emit_cache)
         elif isinstance(self.sender(), QThread):
             self.sender().finished.disconnect(self.emit_cache)
 
+    def take_cache(self) -> dict:
+        """Return the cached signals and start a new cache."""
+        cache, self.cache = self.cache, {}
+        return cache
+
 
 class QDatastore(QUpdater):
     """
@@ -263,7 +268,7 @@ class QDatastore(QUpdater):
     instantiate a QDatastore and connect or connect to an already existing QDatastore.
 
     QDatastore objects are children of the persistent list-QObjects, which are described below, and can be used to
-    iterate over the existing QDatastores. QDatastores are initialized using keyword-arguments that can later be used to
+    iterate over the existing QDatastores or to look one up by its key. QDatastores are initialized using keyword-arguments that can later be used to
     match them to their corresponding Brightway counterpart. The QDatastore for an Activity will for example be
     initialized using the Activity Model Fields like "id", "database" and "code".
     """
@@ -274,6 +279,7 @@ class QDatastore(QUpdater):
     def __init__(self, parent=None, **kwargs):
         super().__init__(parent)
         self.fields = kwargs
+        self.lookup = None  # key under which the list-QObject registered us
         self.connected = 0
         self.cache = {}
 
@@ -298,117 +304,153 @@ class QDatastore(QUpdater):
             self.connected -= 1
 
         if self.connected == 0:
+            if isinstance(self.parent(), QDatastoreList):
+                self.parent().unregister(self)
             self.setParent(None)
             self.deleteLater()
 
 
-class QDatabaseList(QObject):
+class QDatastoreList(QObject):
     """
-    A QObject that has Database QUpdaters as its children. Iterate and match using the database name.
+    Base for the persistent list-QObjects below. QDatastores are registered under a lookup key when they are created
+    and unregistered when they delete themselves, so finding the QDatastore for a Brightway object is a dictionary
+    lookup instead of an iteration over all children.
+
+    Subclasses can maintain secondary indexes (e.g. all activity QDatastores per database) by extending register and
+    unregister.
     """
 
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.registry = {}
+
     def __iter__(self):
-        for child in self.findChildren(QDatastore):
+        # iterate over a copy, as QDatastores may unregister themselves while we're iterating
+        for child in list(self.registry.values()):
             yield child
 
-    def get_or_create(self, database):
-        db_name = database if isinstance(database, str) else database.name
+    def __len__(self):
+        return len(self.registry)
 
-        qdatabase = [
-            qdatabase for qdatabase in self.children() if qdatabase["name"] == db_name
-        ]
+    def __contains__(self, lookup):
+        return lookup in self.registry
 
-        if qdatabase:
-            return qdatabase[0]
-        else:
-            return QDatastore(self, name=db_name)
+    def get(self, lookup) -> Optional[QDatastore]:
+        """Return the QDatastore registered under lookup, or None if there is no such QDatastore."""
+        return self.registry.get(lookup)
+
+    def create(self, lookup, **kwargs) -> QDatastore:
+        qdatastore = QDatastore(self, **kwargs)
+        qdatastore.lookup = lookup
+        self.register(qdatastore)
+        return qdatastore
+
+    def register(self, qdatastore: QDatastore) -> None:
+        self.registry[qdatastore.lookup] = qdatastore
 
+    def unregister(self, qdatastore: QDatastore) -> None:
+        if self.registry.get(qdatastore.lookup) is qdatastore:
+            del self.registry[qdatastore.lookup]
 
-class QActivityList(QObject):
+
+class QDatabaseList(QDatastoreList):
     """
-    A QObject that has Activity QUpdaters as its children. Iterate and match using Activity model fields.
+    A QObject that has Database QUpdaters as its children. Registered by the database name.
     """
 
-    def __iter__(self):
-        for child in self.findChildren(QDatastore):
-            yield child
+    def get_or_create(self, database):
+        db_name = database if isinstance(database, str) else database.name
+        return self.get(db_name) or self.create(db_name, name=db_name)
+
+
+class QActivityList(QDatastoreList):
+    """
+    A QObject that has Activity QUpdaters as its children. Registered by the Activity id, also indexed by Activity key
+    and by database name.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.keys = {}
+        self.databases = {}
 
     def get_or_create(self, activity):
         activity = (
             activity if isinstance(activity, Activity) else get_activity(activity)
         )
         doc = activity._document
+        return self.get(doc.id) or self.create(doc.id, **doc.__data__)
 
-        qactivity = [
-            qactivity for qactivity in self.children() if qactivity["id"] == doc.id
-        ]
+    def get_by_key(self, key: tuple) -> Optional[QDatastore]:
+        return self.keys.get(tuple(key))
 
-        if qactivity:
-            return qactivity[0]
-        else:
-            return QDatastore(self, **doc.__data__)
+    def in_database(self, db_name: str) -> list:
+        """Return all activity QDatastores of the given database."""
+        return list(self.databases.get(db_name, {}).values())
+
+    def register(self, qdatastore: QDatastore) -> None:
+        super().register(qdatastore)
+        self.keys[(qdatastore["database"], qdatastore["code"])] = qdatastore
+        self.databases.setdefault(qdatastore["database"], {})[qdatastore.lookup] = qdatastore
 
+    def unregister(self, qdatastore: QDatastore) -> None:
+        super().unregister(qdatastore)
+        key = (qdatastore["database"], qdatastore["code"])
+        if self.keys.get(key) is qdatastore:
+            del self.keys[key]
+        in_db = self.databases.get(qdatastore["database"], {})
+        if in_db.get(qdatastore.lookup) is qdatastore:
+            del in_db[qdatastore.lookup]
 
-class QExchangeList(QObject):
+
+class QExchangeList(QDatastoreList):
     """
-    A QObject that has Exchange QUpdaters as its children. Iterate and match using Exchange model fields.
+    A QObject that has Exchange QUpdaters as its children. Registered by the Exchange id, also indexed by the databases
+    of the input and output.
     """
 
-    def __iter__(self):
-        for child in self.findChildren(QDatastore):
-            yield child
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.databases = {}
 
     def get_or_create(self, exchange: Exchange):
         doc = exchange._document
-        qexchange = [
-            qexchange for qexchange in self.children() if qexchange["id"] == doc.id
-        ]
+        return self.get(doc.id) or self.create(doc.id, **doc.__data__)
 
-        if qexchange:
-            return qexchange[0]
-        else:
-            return QDatastore(self, **doc.__data__)
+    def in_database(self, db_name: str) -> list:
+        """Return all exchange QDatastores of which the input or output is in the given database."""
+        return list(self.databases.get(db_name, {}).values())
+
+    def register(self, qdatastore: QDatastore) -> None:
+        super().register(qdatastore)
+        for db_name in {qdatastore["input_database"], qdatastore["output_database"]}:
+            self.databases.setdefault(db_name, {})[qdatastore.lookup] = qdatastore
 
+    def unregister(self, qdatastore: QDatastore) -> None:
+        super().unregister(qdatastore)
+        for db_name in {qdatastore["input_database"], qdatastore["output_database"]}:
+            in_db = self.databases.get(db_name, {})
+            if in_db.get(qdatastore.lookup) is qdatastore:
+                del in_db[qdatastore.lookup]
 
-class QMethodList(QObject):
+
+class QMethodList(QDatastoreList):
     """
-    A QObject that has Method QUpdaters as its children. Iterate and match using the Method name tuple.
+    A QObject that has Method QUpdaters as its children. Registered by the Method name tuple.
     """
 
-    def __iter__(self):
-        for child in self.findChildren(QDatastore):
-            yield child
-
     def get_or_create(self, method: Method):
-        qmethod = [
-            qmethod for qmethod in self.children() if qmethod["name"] == method.name
-        ]
-
-        if qmethod:
-            return qmethod[0]
-        else:
-            return QDatastore(self, name=method.name)
+        return self.get(method.name) or self.create(method.name, name=method.name)
 
 
-class QParameterList(QObject):
+class QParameterList(QDatastoreList):
     """
-    A QObject that has Parameter QUpdaters as its children. Iterate and match using the Parameter key:
+    A QObject that has Parameter QUpdaters as its children. Registered by the Parameter key:
     Tuple(group, param_name).
     """
 
-    def __iter__(self):
-        for child in self.findChildren(QDatastore):
-            yield child
-
     def get_or_create(self, parameter: ParameterBase):
-        qparam = [
-            qparam for qparam in self.children() if qparam["key"] == parameter.key
-        ]
-
-        if qparam:
-            return qparam[0]
-        else:
-            return QDatastore(self, key=parameter.key)
+        return self.get(parameter.key) or self.create(parameter.key, key=parameter.key)
 
 
 class QProjects(QUpdater):
@@ -416,8 +458,93 @@ class QProjects(QUpdater):
     list_changed: SignalInstance = Signal()
 
 
+class ChangeSet:
+    """
+    Collects the records affected by a batch of Brightway mutations: the keys of the activities, the ids of the
+    exchanges and the names of the databases that changed. A single ChangeSet is emitted through
+    qdatabases.records_changed per batch, so widgets can update only what was affected instead of re-syncing for every
+    changed object.
+    """
+
+    def __init__(self):
+        self.activities = set()  # keys of changed or deleted activities
+        self.exchanges = set()  # ids of changed or deleted exchanges
+        self.databases = set()  # names of databases of which records changed
+        self.deleted_databases = set()  # names of deleted databases
+
+    def __bool__(self):
+        return bool(
+            self.activities or self.exchanges or self.databases or self.deleted_databases
+        )
+
+    def add_activity(self, key: tuple) -> None:
+        self.activities.add(tuple(key))
+        self.databases.add(key[0])
+
+    def add_exchange(self, exc_id: int, input_key: tuple, output_key: tuple) -> None:
+        self.exchanges.add(exc_id)
+        self.databases.update((input_key[0], output_key[0]))
+
+    def affects(self, key: tuple) -> bool:
+        """Whether the activity with this key was changed or deleted within this ChangeSet."""
+        return key in self.activities or key[0] in self.deleted_databases
+
+
 class QDatabases(QUpdater):
     metadata_changed: SignalInstance = Signal()
+    records_changed: SignalInstance = Signal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.changeset = ChangeSet()
+        # worker threads record changes while the main thread emits them, see record and take_cache
+        self._changeset_lock = threading.RLock()
+        # batches are opened per thread, see bw2data.databases.batch
+        self._batch_state = threading.local()
+
+    @property
+    def batch_depth(self) -> int:
+        """Number of batches open in the current thread."""
+        return getattr(self._batch_state, "depth", 0)
+
+    @batch_depth.setter
+    def batch_depth(self, depth: int) -> None:
+        self._batch_state.depth = depth
+
+    @property
+    def deferred_metadata(self) -> set:
+        """Keys of the activities saved or deleted within the batches of the current thread."""
+        if not hasattr(self._batch_state, "deferred"):
+            self._batch_state.deferred = set()
+        return self._batch_state.deferred
+
+    @deferred_metadata.setter
+    def deferred_metadata(self, keys: set) -> None:
+        self._batch_state.deferred = keys
+
+    def record(self, activities=(), exchanges=(), deleted_databases=()) -> None:
+        """
+        Record affected activity keys, (id, input_key, output_key) exchange tuples and deleted database names in the
+        current ChangeSet, and emit it through records_changed later.
+        """
+        with self._changeset_lock:
+            for key in activities:
+                self.changeset.add_activity(key)
+            for exc_id, input_key, output_key in exchanges:
+                self.changeset.add_exchange(exc_id, input_key, output_key)
+            self.changeset.deleted_databases.update(deleted_databases)
+            self.emitLater("records_changed", self.changeset)
+
+    def emitLater(self, signal_name: str, *args):
+        with self._changeset_lock:
+            super().emitLater(signal_name, *args)
+
+    def take_cache(self) -> dict:
+        # start a new ChangeSet, the cached one is emitted and handed over to the connected widgets
+        with self._changeset_lock:
+            if "records_changed" in self.cache:
+                self.changeset = ChangeSet()
+            return super().take_cache()
 
 
 class QCalculationSetups(QUpdater):
@@ -522,6 +522,26 @@ const cartographer = function() {
         data.edges.forEach(buildGraphEdge);
         console.log("Edges successfully loaded...")
 
+        drawGraph();
+    };
+
+    // Allow update of the current graph by parsing a JSON document with only the removed, added or changed nodes and edges.
+    cartographer.update_graph_changes = function (json_changes) {
+        console.log("Updating Graph changes");
+        let changes = JSON.parse(json_changes);
+        max_impact = changes["max_impact"];
+        heading.innerHTML = changes.title;
+
+        changes.removed_edges.forEach(function (e) { graph.removeEdge(e[0], e[1]); });
+        changes.removed_nodes.forEach(function (n) { graph.removeNode(n); });
+        changes.nodes.forEach(buildGraphNode);
+        changes.edges.forEach(buildGraphEdge);
+        console.log("Changes successfully loaded: " + changes.nodes.length + " nodes, " + changes.edges.length + " edges");
+
+        drawGraph();
+    };
+
+    const drawGraph = function () {
         //re-renders canvas with updated dimensions of the screen
         canvas.render();
         //draws graph into canvas
@@ -775,6 +795,7 @@ function formatEdgeText(product) {
 new QWebChannel(qt.webChannelTransport, function (channel) {
     window.bridge = channel.objects.bridge;
     window.bridge.graph_ready.connect(cartographer.update_graph);
+    window.bridge.graph_changed.connect(cartographer.update_graph_changes);
     window.bridge.style.connect(cartographer.update_svg_style);
 });
 
@@ -129,7 +129,8 @@ class MethodsTree(ABDictTreeView):
 
         NOTE: self.expandAll() is terribly slow with large trees, so you are advised not to use this without
          something like search [as implemented below through the query check].
-         Could perhaps be fixed with canFetchMore and fetchMore, see also links below:
+         The models are populated lazily through canFetchMore and fetchMore, but expanding everything still
+         builds every branch, see also links below:
          https://interest.qt-project.narkive.com/ObOvIpWF/qtreeview-expand-expandall-performance
          https://www.qtcentre.org/threads/31642-Speed-Up-TreeView
         """
@@ -148,9 +149,9 @@ class MethodsTree(ABDictTreeView):
         while iterator != None:
             item = self.build_path(iterator)
             if item in expands:
-                self.setExpanded(
-                    self.model.createIndex(iterator.row(), 0, iterator), True
-                )
+                index = self.model.createIndex(iterator.row(), 0, iterator)
+                self.model.fetchMore(index)  # build the children so the iterator can reach them
+                self.setExpanded(index, True)
             iterator = self.model.iterator(iterator)
 
     @Slot(QModelIndex, name="methodSelection")
@@ -208,6 +208,7 @@ class ActivitiesBiosphereTable(ABFilterableDataFrameView):
         self.model.updated.connect(self.update_proxy_model)
         self.model.updated.connect(self.set_context_menu_policy)
         self.model.updated.connect(self.update_filter_settings)
+        self.model.searched.connect(self.apply_filters)
 
     def get_key(self, proxy: QtCore.QModelIndex) -> tuple:
         return self.model.get_key(proxy)
@@ -232,7 +233,8 @@ class ActivitiesBiosphereTable(ABFilterableDataFrameView):
 
     @Slot(name="updateMenuContext")
     def set_context_menu_policy(self) -> None:
-        if self.model.technosphere:
+        # the actions work on the open database, the results of a project search can come from any database
+        if self.model.technosphere and not self.model.project_search:
             self.setContextMenuPolicy(QtCore.Qt.DefaultContextMenu)
             self.db_read_only = project_settings.db_is_readonly(self.current_database())
             self.update_activity_table_read_only(
@@ -242,8 +244,11 @@ class ActivitiesBiosphereTable(ABFilterableDataFrameView):
             self.setContextMenuPolicy(QtCore.Qt.NoContextMenu)
 
     def search(self, pattern: str = None) -> None:
+        # the filters are applied again once the model has searched, see connect_signals
         self.model.search(pattern)
-        self.apply_filters()
+
+    def search_project(self, pattern: str) -> None:
+        self.model.search_project(pattern)
 
     @Slot(name="resetSearch")
     def reset_search(self) -> None:
@@ -462,7 +467,9 @@ class ActivitiesBiosphereTree(ABDictTreeView):
         while iter != None:
             item = self.build_path(iter)
             if item in expands:
-                self.setExpanded(self.model.createIndex(iter.row(), 0, iter), True)
+                index = self.model.createIndex(iter.row(), 0, iter)
+                self.model.fetchMore(index)  # build the children so the iterator can reach them
+                self.setExpanded(index, True)
             iter = self.model.iterator(iter)
 
     @Slot(name="optionalExpandAll")
@@ -471,7 +478,8 @@ class ActivitiesBiosphereTree(ABDictTreeView):
 
         NOTE: self.expandAll() is terribly slow with large trees, so you are advised not to use this without
          something like search [as implemented below through the query check].
-         Could perhaps be fixed with canFetchMore and fetchMore, see also links below:
+         The models are populated lazily through canFetchMore and fetchMore, but expanding everything still
+         builds every branch, see also links below:
          https://interest.qt-project.narkive.com/ObOvIpWF/qtreeview-expand-expandall-performance
          https://www.qtcentre.org/threads/31642-Speed-Up-TreeView
         """
@@ -529,7 +537,9 @@ class ActivitiesBiosphereTree(ABDictTreeView):
         it = self.model.iterator(None)
         while it != None:
             if self.build_path(it) in self.expand_state:
-                self.setExpanded(self.model.createIndex(it.row(), 0, it), True)
+                index = self.model.createIndex(it.row(), 0, it)
+                self.model.fetchMore(index)  # build the children so the iterator can reach them
+                self.setExpanded(index, True)
             it = self.model.iterator(it)
 
     def build_path(self, iter):
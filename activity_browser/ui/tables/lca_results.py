@@ -18,6 +18,10 @@ class InventoryTable(ABFilterableDataFrameView):
         self.model = InventoryModel(parent=self)
         self.model.updated.connect(self.update_proxy_model)
         self.model.updated.connect(self.update_filter_data)
+        # rows are loaded in batches, load them all before sorting so the order is right
+        self.horizontalHeader().sortIndicatorChanged.connect(
+            lambda *_: self.model.fetch_all()
+        )
         # below variables are required for switching between technosphere and biosphere tables
         self.showing = None
         self.filters_tec = None
@@ -35,6 +39,16 @@ class InventoryTable(ABFilterableDataFrameView):
         # apply the existing filters
         self.apply_filters()
 
+    def apply_filters(self) -> None:
+        # rows are loaded in batches, load them all so the filters are applied to all of them
+        if self.filters:
+            self.model.fetch_all()
+        super().apply_filters()
+
+    def to_clipboard(self):
+        self.model.fetch_all()
+        super().to_clipboard()
+
     def write_filters(self, filters: dict) -> None:
         if self.showing == "technosphere":
             self.filters_tec = filters
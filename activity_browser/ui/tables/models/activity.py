@@ -15,6 +15,8 @@ from PySide2.QtCore import QModelIndex, Qt, Slot
 from activity_browser import actions, signals
 from activity_browser.bwutils import PedigreeMatrix
 from activity_browser.bwutils import commontasks as bc
+from activity_browser.mod.bw2data import databases
+from activity_browser.mod.bw2data.backends import Exchange, ExchangeDataset
 
 from .base import EditablePandasModel
 
@@ -42,6 +44,8 @@ class BaseExchangeModel(EditablePandasModel):
         self.exchanges = []
         self.exchange_column = 0
 
+        databases.records_changed.connect(self.apply_changeset)
+
     def load(self, exchanges: Iterable):
         self.exchanges = exchanges
         self.sync()
@@ -55,6 +59,63 @@ class BaseExchangeModel(EditablePandasModel):
         self.exchange_column = self._dataframe.columns.get_loc("exchange")
         self.updated.emit()
 
+    def clear_cache(self, *args) -> None:
+        super().clear_cache(*args)
+        self._exchange_index = None
+
+    def exchange_index(self) -> pd.DataFrame:
+        """Return the id, input key and output key of the exchange in every row, built once per dataframe."""
+        if self._exchange_index is None:
+            docs = [exchange._document for exchange in self._dataframe["exchange"]]
+            self._exchange_index = pd.DataFrame(
+                {
+                    "id": [doc.id for doc in docs],
+                    "input": [(doc.input_database, doc.input_code) for doc in docs],
+                    "output": [(doc.output_database, doc.output_code) for doc in docs],
+                },
+                columns=["id", "input", "output"],
+            )
+        return self._exchange_index
+
+    def apply_changeset(self, changeset) -> None:
+        """Update only the rows of exchanges that are affected by the ChangeSet, instead of re-syncing the table."""
+        if self._dataframe.empty:
+            return
+
+        index = self.exchange_index()
+        affected = index["id"].isin(changeset.exchanges)
+        for side in ("input", "output"):
+            affected |= index[side].isin(changeset.activities)
+            affected |= index[side].str[0].isin(changeset.deleted_databases)
+        rows = np.flatnonzero(affected.to_numpy()).tolist()
+
+        if not rows:
+            return
+        if len(rows) > len(self._dataframe) // 2:
+            # cheaper to just rebuild the table
+            self.sync()
+            return
+
+        dropped = []
+        for i in rows:
+            exchange = self._dataframe.iat[i, self.exchange_column]
+            try:
+                row = self.create_row(
+                    Exchange(ExchangeDataset.get_by_id(exchange._document.id))
+                )
+            except DoesNotExist:
+                row = None
+            if not row:
+                dropped.append(i)
+                continue
+            self._dataframe.iloc[i] = pd.Series(row).reindex(self.columns)
+
+        if dropped:
+            self._dataframe = self._dataframe.drop(
+                self._dataframe.index[dropped]
+            ).reset_index(drop=True)
+        self.updated.emit()
+
     @property
     def columns(self) -> list:
         return self.COLUMNS + ["exchange"]
@@ -78,10 +139,7 @@ class BaseExchangeModel(EditablePandasModel):
                 "exchange": exchange,
             }
 
-            # sync when the exchange input or output changes
-            exchange.input.changed.connect(self.sync, Qt.UniqueConnection)
-            exchange.output.changed.connect(self.sync, Qt.UniqueConnection)
-
+            # changes to the exchange or its input and output are handled through apply_changeset
             return row
         except DoesNotExist as e:
             # The input activity does not exist. remove the exchange.
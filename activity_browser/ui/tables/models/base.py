@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 import datetime
+import functools
+from importlib.util import find_spec
 from typing import Optional
 from logging import getLogger
 
@@ -13,13 +15,76 @@ from PySide2.QtGui import QBrush
 from activity_browser.bwutils import commontasks as bc
 from activity_browser.ui.style import style_item
 
+# strings backed by pyarrow are matched without a python loop, look it up without importing it at startup
+STRING_DTYPE = "string[pyarrow]" if find_spec("pyarrow") else object
+
 log = getLogger(__name__)
 
 
+def display_value(value):
+    """Convert a dataframe value into the python object shown in the table."""
+    if isinstance(value, np.float64):
+        return float(value)
+    elif isinstance(value, (np.bool_, np.int64)):
+        return value.item()
+    elif isinstance(value, tuple):
+        return str(value)
+    return value
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float, np.number)) and not isinstance(value, str)
+
+
+def sort_ranks(values: np.ndarray) -> Optional[np.ndarray]:
+    """Rank the values of a column the way `ABSortProxyModel.lessThan` orders them.
+
+    Empty values rank as 0 in a column of numbers and as "" in a column of strings, equal values share their rank.
+    Returns None for columns that mix other types, these are compared cell by cell.
+    """
+    filled = np.fromiter((bool(v) for v in values), dtype=bool, count=len(values))
+    content = values[filled]
+    if all(_is_number(v) for v in content):
+        keys = np.zeros(len(values), dtype=np.float64)
+        keys[filled] = content.astype(np.float64)
+    elif all(isinstance(v, str) for v in content):
+        keys = np.full(len(values), "", dtype=object)
+        keys[filled] = content
+    else:
+        return None
+    try:
+        return np.unique(keys, return_inverse=True)[1].reshape(-1)
+    except TypeError:
+        return None
+
+
+def search_text(df: pd.DataFrame, columns) -> pd.Series:
+    """Join the lower-cased text of the columns per row, so a row can be searched with a single match.
+
+    The texts are separated by newlines, which a search pattern can't contain, so a match never spans two columns.
+    """
+    columns = list(columns)
+    if df.empty or not columns:
+        return pd.Series([], index=df.index[:0], dtype=STRING_DTYPE)
+    text = functools.reduce(
+        lambda a, b: a + "\n" + b, (df[col].astype(str).str.lower() for col in columns)
+    )
+    return text.astype(STRING_DTYPE)
+
+
+def contains(text: pd.Series, pattern: str) -> np.ndarray:
+    """Return a boolean array that is True where the search text contains the pattern, ignoring case."""
+    return np.asarray(text.str.contains(pattern.lower(), regex=False), dtype=bool)
+
+
 class PandasModel(QAbstractTableModel):
     """Abstract pandas table model adapted from
     https://stackoverflow.com/a/42955764.
 
+    The display values and sort ranks of a column are built once, on the first paint or sort after the dataframe is
+    set, so `data` only indexes an array. They are dropped whenever the dataframe is replaced or the model signals
+    that its data changed.
+
     TODO: Further improve the model by implementing insertRows and removeRows
      methods, this will allow us to stop recreating the proxy model on every
      add/delete call. See https://doc.qt.io/qt-5/qabstracttablemodel.html
@@ -34,6 +99,51 @@ class PandasModel(QAbstractTableModel):
         self.filterable_columns = None
         self.different_column_types = {}
 
+        # dataframes edited in place announce it through these signals
+        self.updated.connect(self.clear_cache)
+        self.dataChanged.connect(self.clear_cache)
+        self.modelReset.connect(self.clear_cache)
+        self.layoutChanged.connect(self.clear_cache)
+
+    @property
+    def _dataframe(self) -> Optional[pd.DataFrame]:
+        return self._df
+
+    @_dataframe.setter
+    def _dataframe(self, df: Optional[pd.DataFrame]) -> None:
+        self._df = df
+        self.clear_cache()
+
+    def clear_cache(self, *args) -> None:
+        self._display = {}  # column: array of display values
+        self._ranks = {}  # column: array of sort ranks, or None
+        self._filter_columns = {}  # (column name, case sensitive): column as strings
+
+    def display_column(self, column: int) -> np.ndarray:
+        """Return the display values of the column, built on first use."""
+        if column not in self._display:
+            values = self._dataframe.iloc[:, column].to_numpy(dtype=object)
+            self._display[column] = np.fromiter(
+                (display_value(v) for v in values), dtype=object, count=len(values)
+            )
+        return self._display[column]
+
+    def sort_ranks(self, column: int) -> Optional[np.ndarray]:
+        """Return the rank of every row when sorting on the column, or None if the column can't be ranked."""
+        if column not in self._ranks:
+            self._ranks[column] = sort_ranks(self.display_column(column))
+        return self._ranks[column]
+
+    def filter_column(self, col_name: str, case_sensitive: bool) -> pd.Series:
+        """Return the column as strings to filter on, upper-cased if not case sensitive, built on first use."""
+        key = (col_name, case_sensitive)
+        if key not in self._filter_columns:
+            col_data = self._dataframe[col_name].astype(str)
+            if not case_sensitive:
+                col_data = col_data.str.upper()
+            self._filter_columns[key] = col_data.astype(STRING_DTYPE)
+        return self._filter_columns[key]
+
     def rowCount(self, parent=None, *args, **kwargs):
         return 0 if self._dataframe is None else self._dataframe.shape[0]
 
@@ -53,18 +163,9 @@ class PandasModel(QAbstractTableModel):
         value = None
         tt_date_flag = False  # flag to indicate if value is datetime object and role is ToolTipRole
         if role == Qt.DisplayRole or role == Qt.ToolTipRole or role == "sorting":
-            value = self._dataframe.iat[index.row(), index.column()]
-            if isinstance(value, np.float64):
-                value = float(value)
-            elif isinstance(value, bool):
-                value = value.item()
-            elif isinstance(value, np.int64):
-                value = value.item()
-            elif isinstance(value, tuple):
-                value = str(value)
-            elif isinstance(value, datetime.datetime) and (
-                Qt.DisplayRole or Qt.ToolTipRole
-            ):
+            value = self.display_column(index.column())[index.row()]
+            # dates are shown relative to now and can't be cached
+            if isinstance(value, datetime.datetime):
                 tz = datetime.datetime.now(datetime.timezone.utc).astimezone()
                 time_shift = -tz.utcoffset().total_seconds()
                 if role == Qt.ToolTipRole:
@@ -212,15 +313,15 @@ class PandasModel(QAbstractTableModel):
                 else:
                     # this is a 'str' column
                     filt_type, query, case_sensitive = col_filt
-                    if case_sensitive:
-                        col_data_ = col_data.astype(str)
-                    else:
-                        col_data_ = col_data.astype(str).str.upper()
+                    col_data_ = self.filter_column(col_name, case_sensitive)
+                    if not case_sensitive:
                         query = query.upper()
 
                 # run the test
-                new_mask = self.test_query_on_column(filt_type, col_data_, query)
-                if not any(new_mask):
+                new_mask = self.test_query_on_column(
+                    filt_type, col_data_, query
+                ).astype(bool)
+                if not new_mask.any():
                     # no matches for this mask, let user know:
                     log.info(
                         "There were no matches for filter: {}: '{}'".format(
@@ -232,7 +333,7 @@ class PandasModel(QAbstractTableModel):
                 if isinstance(col_mask, pd.Series) and col_mode == "AND":
                     col_mask = col_mask & new_mask
                 elif isinstance(col_mask, pd.Series) and col_mode == "OR":
-                    col_mask = col_mask + new_mask
+                    col_mask = col_mask | new_mask
                 else:
                     col_mask = new_mask
 
@@ -240,7 +341,7 @@ class PandasModel(QAbstractTableModel):
             if isinstance(all_mask, pd.Series) and all_mode == "AND":
                 all_mask = all_mask & col_mask
             elif isinstance(all_mask, pd.Series) and all_mode == "OR":
-                all_mask = all_mask + col_mask
+                all_mask = all_mask | col_mask
             else:
                 all_mask = col_mask
         return all_mask
@@ -276,12 +377,14 @@ class EditableDragPandasModel(EditablePandasModel):
 
 
 class TreeItem(object):
-    __slots__ = ["_data", "_parent", "_children"]
+    __slots__ = ["_data", "_parent", "_children", "pending"]
 
     def __init__(self, data: list, parent=None):
         self._data = data
         self._parent = parent
         self._children = []
+        # nested dict of children that are not built yet, see BaseTreeModel.fetchMore
+        self.pending = None
 
     @classmethod
     def build_root(cls, cols: list) -> "TreeItem":
@@ -297,6 +400,7 @@ class TreeItem(object):
         for c in self._children:
             c.clear()
         self._children = []
+        self.pending = None
 
     def appendChild(self, item) -> None:
         self._children.append(item)
@@ -325,7 +429,13 @@ class TreeItem(object):
 
 
 class BaseTreeModel(QAbstractItemModel):
-    """Base Model used to present data for QTreeView."""
+    """Base Model used to present data for QTreeView.
+
+    Models that are built from a nested dict (see `build_tree`) are populated
+    lazily: only the top level is built on sync, the children of a branch are
+    built when the branch is expanded for the first time through
+    canFetchMore/fetchMore.
+    """
 
     HEADERS = []
     updated = Signal()
@@ -412,6 +522,51 @@ class BaseTreeModel(QAbstractItemModel):
         parent = parent.internalPointer() if parent.isValid() else self.root
         return parent.childCount()
 
+    def hasChildren(self, parent: QModelIndex = QModelIndex()) -> bool:
+        if parent.column() > 0:
+            return False
+        item = parent.internalPointer() if parent.isValid() else self.root
+        if item is None:
+            return False
+        return item.childCount() > 0 or bool(item.pending)
+
+    def canFetchMore(self, parent: QModelIndex = QModelIndex()) -> bool:
+        if not parent.isValid():
+            return False
+        return bool(parent.internalPointer().pending)
+
+    def fetchMore(self, parent: QModelIndex = QModelIndex()) -> None:
+        """Build the children of the parent from its pending data."""
+        if not self.canFetchMore(parent):
+            return
+        item = parent.internalPointer()
+        pending, item.pending = item.pending, None
+        self.beginInsertRows(parent, item.childCount(), item.childCount() + len(pending) - 1)
+        self.build_tree(pending, item)
+        self.endInsertRows()
+
+    def fetch_all(self, index: QModelIndex) -> None:
+        """Build the complete branch below index, use sparingly on large trees."""
+        self.fetchMore(index)
+        for row in range(self.rowCount(index)):
+            self.fetch_all(self.index(row, 0, index))
+
+    def build_tree(self, data: dict, root: TreeItem) -> None:
+        """Assemble a single level of the tree ui from the nested dict data.
+
+        Branches get their sub-dict as pending data and are only built further
+        once they are expanded, see fetchMore.
+        """
+        for key, value in data.items():
+            if isinstance(value, dict):
+                # this is a root or branch node
+                new_data = [key] + [""] * (self.columnCount() - 1)
+                new_root = root.build_item(new_data, root)
+                new_root.pending = value
+            else:
+                # this is a leaf node
+                root.build_item(value, root)
+
     def flags(self, index):
         if not index.isValid():
             return Qt.NoItemFlags
@@ -438,7 +593,15 @@ class ABSortProxyModel(QSortFilterProxyModel):
         If `left` and `right` are not the same type, we check if numerical and empty string are compared, if that is the
         case, we assume empty string == 0.
         Added this case for: https://github.com/LCA-ActivityBrowser/activity-browser/issues/1215
+
+        Columns of numbers or strings are ranked once by the source model, see `PandasModel.sort_ranks`, and then
+        compared by rank.
         """
+        source = self.sourceModel()
+        ranks = source.sort_ranks(left.column()) if hasattr(source, "sort_ranks") else None
+        if ranks is not None:
+            return ranks[left.row()] < ranks[right.row()]
+
         left_data = self.sourceModel().data(left, "sorting")
         right_data = self.sourceModel().data(right, "sorting")
 
@@ -7,6 +7,7 @@ import pandas as pd
 from PySide2.QtCore import QModelIndex, Qt, Slot
 
 from activity_browser import signals
+from activity_browser.bwutils import AB_metadata
 from activity_browser.mod import bw2data as bd
 
 from .base import BaseTreeModel, DragPandasModel, EditablePandasModel, TreeItem
@@ -80,7 +81,8 @@ class MethodsTreeModel(BaseTreeModel):
     self.setup_model_data() initializes data format
     self._dataframe is converted to a nested dict, stored in self.tree_data
     self.tree_data can be queried during sync, pruning the tree
-    finally, the ui side is built with self.build_tree()
+    finally, the ui side is built with self.build_tree(), which only builds the
+    top level, branches are built when they are first expanded (see fetchMore)
 
     for tree nested dict format see self.nest_data()
     """
@@ -125,18 +127,6 @@ class MethodsTreeModel(BaseTreeModel):
         self.endResetModel()
         self.updated.emit()
 
-    def build_tree(self, data: dict, root: ImpactCategoryItem) -> None:
-        """Assemble the tree ui."""
-        for key, value in data.items():
-            if isinstance(value, dict):
-                # this is a root or branch node
-                new_data = [key] + [""] * (self.columnCount() - 1)
-                new_root = root.build_item(new_data, root)
-                self.build_tree(value, new_root)
-            else:
-                # this is a leaf node
-                ImpactCategoryItem.build_item(value, root)
-
     @Slot(name="methodsAltered")
     def setup_model_data(self) -> None:
         """Construct a dataframe of impact categories and a complete nested
@@ -321,28 +311,52 @@ class MethodCharacterizationFactorsModel(EditablePandasModel):
         assert self.method is not None, "A method must first be set using load()."
         if not self.method.registered:
             return  # the method was deleted, this table will soon be closed
-        self._dataframe = pd.DataFrame(
-            [self.build_row(obj) for obj in self.method.load()],
-            columns=self.HEADERS + self.UNCERTAINTY,
-        )
+        self._dataframe = self.build_df(self.method.load())
         self.cf_column = self._dataframe.columns.get_loc("cf")
         self.updated.emit()
 
     @classmethod
-    def build_row(cls, method_cf: tuple) -> dict:
-        key, amount = method_cf[:2]
-        flow = bd.get_activity(tuple(key))
-        row = {cls.HEADERS[i]: flow.get(c) for i, c in enumerate(cls.COLUMNS)}
+    def build_df(cls, method_cfs: list) -> pd.DataFrame:
+        """Build the table for all characterization factors at once.
+
+        The flow data is taken from the metadata of the biosphere databases
+        and the uncertainty dictionaries are unpacked into columns together.
+        """
+        columns = cls.HEADERS + cls.UNCERTAINTY
+        if not method_cfs:
+            return pd.DataFrame(columns=columns)
+
+        keys = [tuple(cf[0]) for cf in method_cfs]
+        AB_metadata.add_metadata({key[0] for key in keys})
+        flows = AB_metadata.get_metadata(
+            keys, ["name", "categories", "database", "unit"]
+        )
+
         # If uncertain, unpack the uncertainty dictionary
-        uncertain = not isinstance(amount, numbers.Number)
-        if uncertain:
-            row.update({k: amount.get(k, "nan") for k in cls.UNCERTAINTY})
-            uncertain = amount.get("uncertainty type")
-            amount = amount["amount"]
-        else:
-            uncertain = 0
-        row.update({"Amount": amount, "Uncertainty": uncertain, "cf": method_cf})
-        return row
+        amounts = pd.Series([cf[1] for cf in method_cfs], dtype=object)
+        uncertain = ~amounts.map(lambda x: isinstance(x, numbers.Number))
+        uncertainty = pd.DataFrame(
+            amounts[uncertain].tolist(), index=amounts.index[uncertain]
+        ).reindex(index=amounts.index, columns=["amount"] + cls.UNCERTAINTY)
+        uncertainty_types = pd.Series(0, index=amounts.index, dtype=object)
+        uncertainty_types[uncertain] = [
+            x.get("uncertainty type") for x in amounts[uncertain]
+        ]
+
+        df = pd.DataFrame(
+            {
+                "Name": flows["name"].to_numpy(),
+                "Category": flows["categories"].to_numpy(),
+                "Database": flows["database"].to_numpy(),
+                "Amount": amounts.where(~uncertain, uncertainty["amount"]),
+                "Unit": flows["unit"].to_numpy(),
+                "Uncertainty": uncertainty_types,
+                "cf": pd.Series(method_cfs, dtype=object),
+            }
+        )
+        df["Amount"] = df["Amount"].infer_objects()
+        df[cls.UNCERTAINTY] = uncertainty[cls.UNCERTAINTY]
+        return df[columns]
 
     def get_cf(self, proxy: QModelIndex) -> tuple:
         """Get the characterization factor data of the selected row."""
@@ -9,7 +9,7 @@ from logging import getLogger
 
 import numpy as np
 import pandas as pd
-from PySide2.QtCore import QModelIndex, Qt, Slot
+from PySide2.QtCore import QModelIndex, Qt, QTimer, Signal, Slot
 from PySide2.QtWidgets import QApplication
 
 import activity_browser
@@ -18,7 +18,9 @@ from activity_browser.bwutils import AB_metadata
 from activity_browser.bwutils import commontasks as bc
 from activity_browser.mod.bw2data import databases, projects, utils
 
-from .base import PandasModel, DragPandasModel, TreeItem, BaseTreeModel
+from ...threading import ABThread
+from .base import (PandasModel, DragPandasModel, TreeItem, BaseTreeModel,
+                   contains, search_text)
 
 log = getLogger(__name__)
 
@@ -28,8 +30,12 @@ class DatabasesModel(PandasModel):
 
     def __init__(self, parent=None):
         super().__init__(parent=parent)
+        # record counts per (database, modified), so only databases that changed since the last sync are re-counted
+        self.records = {}
+
         projects.current_changed.connect(self.sync)
         databases.metadata_changed.connect(self.sync)
+        databases.records_changed.connect(self.apply_changeset)
 
     def get_db_name(self, proxy: QModelIndex) -> str:
         idx = self.proxy_to_source(proxy)
@@ -37,10 +43,16 @@ class DatabasesModel(PandasModel):
 
     def sync(self):
         data = []
+        records = {}
         for name in utils.natural_sort(databases):
             # get the modified time, in case it doesn't exist, just write 'now' in the correct format
-            dt = databases[name].get("modified", datetime.datetime.now().isoformat())
-            dt = datetime.datetime.strptime(dt, "%Y-%m-%dT%H:%M:%S.%f")
+            modified = databases[name].get("modified", datetime.datetime.now().isoformat())
+            dt = datetime.datetime.strptime(modified, "%Y-%m-%dT%H:%M:%S.%f")
+
+            count = self.records.get((name, modified))
+            if count is None:
+                count = bc.count_database_records(name)
+            records[(name, modified)] = count
 
             # final column includes interactive checkbox which shows read-only state of db
             database_read_only = project_settings.db_is_readonly(name)
@@ -49,16 +61,83 @@ class DatabasesModel(PandasModel):
                     "Name": name,
                     "Depends": ", ".join(databases[name].get("depends", [])),
                     "Modified": dt,
-                    "Records": bc.count_database_records(name),
+                    "Records": count,
                     "Read-only": database_read_only,
                 }
             )
 
+        self.records = records
         self._dataframe = pd.DataFrame(data, columns=self.HEADERS)
         self.updated.emit()
 
+    def apply_changeset(self, changeset) -> None:
+        """Update the records and modified time of the databases in the ChangeSet only, and drop the rows of deleted
+        databases."""
+        if self._dataframe.empty:
+            return
+
+        names = self._dataframe["Name"]
+        records_col = self._dataframe.columns.get_loc("Records")
+        modified_col = self._dataframe.columns.get_loc("Modified")
+        for i in np.flatnonzero(names.isin(changeset.databases)):
+            name = names.iat[i]
+            if name not in databases:
+                continue
+            modified = databases[name].get("modified", datetime.datetime.now().isoformat())
+            # the metadata_changed sync may already have counted this version of the database
+            if (name, modified) not in self.records:
+                self.records[(name, modified)] = bc.count_database_records(name)
+            self._dataframe.iat[i, records_col] = self.records[(name, modified)]
+            self._dataframe.iat[i, modified_col] = datetime.datetime.strptime(
+                modified, "%Y-%m-%dT%H:%M:%S.%f"
+            )
+
+        self._dataframe = self._dataframe[
+            ~names.isin(changeset.deleted_databases)
+        ].reset_index(drop=True)
+        self.updated.emit()
+
+
+class FilterThread(ABThread):
+    """Match a search pattern against the search text of an ActivitiesBiosphereListModel.
+
+    The text is matched in chunks, between which the thread stops if the model started a newer search.
+    """
+
+    CHUNK_SIZE = 20000
+    matched = Signal(int, object)
+
+    def __init__(self, model: "ActivitiesBiosphereListModel", pattern: str):
+        super().__init__(model)
+        self.model = model
+        self.search_id = model.search_id
+        self.text = model.search_text
+        self.pattern = pattern
+
+    def is_stale(self) -> bool:
+        return self.search_id != self.model.search_id
+
+    def run_safely(self):
+        masks = []
+        for start in range(0, len(self.text), self.CHUNK_SIZE):
+            if self.is_stale():
+                return
+            masks.append(
+                contains(self.text.iloc[start: start + self.CHUNK_SIZE], self.pattern)
+            )
+        if not self.is_stale():
+            mask = np.concatenate(masks) if masks else np.zeros(0, dtype=bool)
+            self.matched.emit(self.search_id, mask)
+
 
 class ActivitiesBiosphereListModel(DragPandasModel):
+    searched = Signal()
+
+    # shown for the results of a search over all databases of the project
+    PROJECT_FIELDS = ["reference product", "name", "location", "unit", "categories", "database"]
+    RESULT_BATCH_SIZE = 250  # rows added to the table per event loop turn
+    RESULT_LIMIT = 10000  # only the best matches of a project search are shown
+
     def __init__(self, parent=None):
         super().__init__(parent=parent)
         self.act_fields = lambda: AB_metadata.get_existing_fields(
@@ -70,18 +149,39 @@ class ActivitiesBiosphereListModel(DragPandasModel):
         self.technosphere = True
 
         self.query = None
+        # all rows of the database and their search text, searches only select from these
+        self.unfiltered = None
+        self.search_text = None
+        # raised on every sync or search, results of older searches are dropped
+        self.search_id = 0
+
+        # ranked results of a search over all databases, added to the table in batches
+        self.project_search = False
+        self.results = None
+        self.result_fields = []
+        self.results_timer = QTimer(self)
+        self.results_timer.setSingleShot(True)
+        self.results_timer.timeout.connect(self.add_results)
 
     @property
     def fields(self) -> list:
         """Constructs a list of fields relevant for the type of database."""
         return self.act_fields() if self.technosphere else self.ef_fields()
 
+    @property
+    def search_columns(self) -> list:
+        return [bc.bw_keys_to_AB_names.get(c, c) for c in self.fields]
+
     def get_key(self, proxy: QModelIndex) -> tuple:
         """Get the key from the model using the given proxy index"""
         idx = self.proxy_to_source(proxy)
         return self._dataframe.iat[idx.row(), self._dataframe.columns.get_loc("key")]
 
     def clear(self) -> None:
+        self.search_id += 1
+        self.stop_results()
+        self.unfiltered = None
+        self.search_text = None
         self._dataframe = pd.DataFrame([])
         self.updated.emit()
 
@@ -111,6 +211,8 @@ class ActivitiesBiosphereListModel(DragPandasModel):
     @Slot(str, name="syncModel")
     def sync(self, db_name: str, df: pd.DataFrame = None, query=None) -> None:
         self.query = query
+        self.search_id += 1
+        self.stop_results()
 
         if df is not None:
             # skip the rest of the sync here if a dataframe is directly supplied
@@ -126,47 +228,98 @@ class ActivitiesBiosphereListModel(DragPandasModel):
 
         # Get dataframe from metadata and update column-names
         QApplication.setOverrideCursor(Qt.WaitCursor)
-        df = self.df_from_metadata(db_name)
+        df = self.df_from_metadata(db_name).reset_index(drop=True)
+
+        # the search text is built once here, searches only match against it
+        self.search_text = search_text(df, self.search_columns)
+        df.replace("", np.nan, inplace=True)
+        self.unfiltered = df
+
+        self.show_rows(contains(self.search_text, query) if query else None)
+        QApplication.restoreOverrideCursor()
 
-        if query:
-            # apply query if present
-            mask = self.filter_dataframe(df, query)
+    def show_rows(self, mask: np.ndarray = None) -> None:
+        """Show the rows of the database selected by the mask, or all of them."""
+        df = self.unfiltered
+        if mask is not None:
             df = df.loc[mask].reset_index(drop=True)
 
         # remove empty columns
-        df.replace("", np.nan, inplace=True)
-        df.dropna(how="all", axis=1, inplace=True)
-        self._dataframe = df.reset_index(drop=True)
+        self._dataframe = df.dropna(how="all", axis=1)
         self.filterable_columns = {
             col: i for i, col in enumerate(self._dataframe.columns.to_list())
         }
-        QApplication.restoreOverrideCursor()
         self.updated.emit()
 
     def search(self, pattern: str = None) -> None:
-        """Filter the dataframe with pattern."""
-        self.sync(self.database_name, query=pattern)
+        """Filter the dataframe with pattern.
 
-    def filter_dataframe(self, df: pd.DataFrame, pattern: str) -> pd.Series:
-        """Filter the dataframe returning a mask that is True for all rows
-        where a search string has been found.
+        The search text is matched in a FilterThread so typing doesn't block the GUI, the rows are shown when it is
+        done, unless a newer search or sync was started in the meantime.
+        """
+        if not pattern or self.unfiltered is None:
+            self.sync(self.database_name, query=pattern)
+            self.searched.emit()
+            return
 
-        It is a "contains" type of search (e.g. "oal" would find "coal").
-        It also works for columns that contain tuples (e.g. ('water', 'ocean'),
-        and will match on partials i.e. both 'ocean' and 'ean' work.
+        self.query = pattern
+        self.search_id += 1
+        self.stop_results()
+        thread = FilterThread(self, pattern)
+        thread.matched.connect(self.search_matched)
+        thread.finished.connect(thread.deleteLater)
+        thread.start()
+
+    @Slot(int, object, name="searchMatched")
+    def search_matched(self, search_id: int, mask: np.ndarray) -> None:
+        if search_id != self.search_id:
+            return
+        self.show_rows(mask)
+        self.searched.emit()
+
+    def search_project(self, pattern: str) -> None:
+        """Search all databases of the project, best matches first.
 
-        An alternative solution would be to use .str.contains, but this does
-        not work for columns containing tuples (https://stackoverflow.com/a/29463757)
+        The results are ranked by `AB_metadata.iter_search` and added to the table in batches, one per event loop
+        turn, so the best matches are shown directly while the rest is still being added.
         """
-        search_columns = (bc.bw_keys_to_AB_names.get(c, c) for c in self.fields)
-        mask = functools.reduce(
-            np.logical_or,
-            [
-                df[col].apply(lambda x: pattern.lower() in str(x).lower())
-                for col in search_columns
-            ],
+        self.query = pattern
+        self.search_id += 1
+        self.project_search = True
+        self.results = AB_metadata.iter_search(
+            pattern, limit=self.RESULT_LIMIT, chunk_size=self.RESULT_BATCH_SIZE
         )
-        return mask
+        self.result_fields = AB_metadata.get_existing_fields(self.PROJECT_FIELDS)
+        columns = [bc.bw_keys_to_AB_names.get(c, c) for c in self.result_fields]
+        self._dataframe = pd.DataFrame([], columns=columns + ["key"])
+        self.filterable_columns = {col: i for i, col in enumerate(columns)}
+        self.updated.emit()
+        self.results_timer.start(0)
+
+    @Slot(name="addResults")
+    def add_results(self) -> None:
+        """Append the next batch of project search results to the table."""
+        if self.results is None:
+            return
+        chunk = next(self.results, None)
+        if chunk is None:
+            self.results = None
+            self.searched.emit()
+            return
+
+        df = chunk.reindex(columns=self.result_fields + ["key"])
+        df.columns = self._dataframe.columns
+        first = self._dataframe.shape[0]
+        self.beginInsertRows(QModelIndex(), first, first + df.shape[0] - 1)
+        self._dataframe = pd.concat([self._dataframe, df], ignore_index=True)
+        self.endInsertRows()
+        self.results_timer.start(0)
+
+    def stop_results(self) -> None:
+        """Stop adding the results of a project search, the table shows a single database again."""
+        self.results_timer.stop()
+        self.results = None
+        self.project_search = False
 
     def copy_exchanges_for_SDF(self, proxies: list) -> None:
         if len(proxies) > 1:
@@ -183,6 +336,81 @@ class ActivitiesBiosphereListModel(DragPandasModel):
         QApplication.restoreOverrideCursor()
 
 
+NO_CLASSIFICATION = ("No classification",)
+
+
+@functools.lru_cache(maxsize=1)
+def get_isic_tree() -> Tuple[dict, dict, dict]:
+    """Generate an entry for every class of the ISIC and store its path.
+
+    this file is from https://unstats.un.org/unsd/classifications/Econ/isic
+    stored locally under path variable below
+    the file is sorted and structured such that each sub-class of the previous has 1 character more in column
+    'code', that means each super-class is already seen before we get to the sub-class
+    we use that as a feature to create the 'tree path'
+
+    The file is read only once per session, the result is cached and shared by all tree models.
+
+    Returns
+    -------
+    tuple: A tuple of 3 dicts
+        tree_data: keys are str of classification:name, values are the tree path consisting of keys
+        tree_codes: keys are classification number, values are the full keys
+        tree_numeric_order: keys are classification number, values are the row number in file
+    """
+    path = os.path.join(
+        os.path.dirname(os.path.abspath(activity_browser.__file__)),
+        "static",
+        "database_classifications",
+        "ISIC_Rev_4_english_structure.txt",
+    )
+
+    df = pd.read_csv(path, dtype=str)
+
+    tree_data = {}
+    tree_codes = {}
+    tree_numeric_order = {}
+    last_super = tuple()
+    for idx, (cls, name) in enumerate(zip(df["Code"], df["Description"])):
+        # cls is the number classification, name is the proper name
+        key = f"{cls}:{name}"
+        tree_codes[cls] = key  # add the full key to the classification cls in dict
+        tree_numeric_order[cls] = idx  # add the row number to the classification cls in dict
+
+        # we measure the depth by the length of cls, clip the path of the last entry to the
+        # super-classes of this one (if any) and add this class
+        depth = len(cls)
+        parents = tuple(k for k in last_super if len(k.split(":")[0]) < depth)
+        path = parents + (key,)
+
+        tree_data[key] = path  # add the treepath to the key in dict
+        last_super = path
+    return tree_data, tree_codes, tree_numeric_order
+
+
+@functools.lru_cache(maxsize=1)
+def get_isic_code_paths() -> dict:
+    """Return a dict of ISIC classification number to its complete tree path."""
+    tree_data, tree_codes, _ = get_isic_tree()
+    return {code: tree_data[key] for code, key in tree_codes.items()}
+
+
+def isic_class_codes(classifications: pd.Series) -> pd.Series:
+    """Extract the ISIC class code from the classification strings.
+
+    Only the numeric part of the code is used, so e.g. '0111a:Growing of ...' becomes '0111'.
+    Values that are not a string result in NaN.
+    """
+    codes = classifications.where(
+        classifications.map(lambda x: isinstance(x, str)), np.nan
+    )
+    codes = codes.str.split(":", n=1).str[0]
+    # only read the numeric part of the code
+    last_is_digit = codes.str[-1].str.isdigit().eq(True)
+    strip = (codes.str.len() > 1) & ~last_is_digit
+    return codes.where(~strip, codes.str[:-1])
+
+
 class ActivitiesBiosphereItem(TreeItem):
     """Item in ActivitiesBiosphereTreeModel."""
 
@@ -204,7 +432,8 @@ class ActivitiesBiosphereTreeModel(BaseTreeModel):
     self.setup_model_data() initializes data format
     self._dataframe is converted to a nested dict, stored in self.tree_data
     self.tree_data can be queried during sync, pruning the tree
-    finally, the ui side is built with self.build_tree()
+    finally, the ui side is built with self.build_tree(), which only builds the
+    top level, branches are built when they are first expanded (see fetchMore)
 
     for tree nested dict format see self.nest_data()
     """
@@ -239,64 +468,8 @@ class ActivitiesBiosphereTreeModel(BaseTreeModel):
         return res
 
     def get_isic_tree(self) -> Tuple[dict, dict, dict]:
-        """Generate an entry for every class of the ISIC and store its path.
-
-        this file is from https://unstats.un.org/unsd/classifications/Econ/isic
-        stored locally under path variable below
-        the file is sorted and structured such that each sub-class of the previous has 1 character more in column
-        'code', that means each super-class is already seen before we get to the sub-class
-        we use that as a feature to create the 'tree path'
-
-        Returns
-        -------
-        tuple: A tuple of 3 dicts
-            tree_data: keys are str of classification:name, values are the tree path consisting of keys
-            tree_codes: keys are classification number, values are the full keys
-            tree_numeric_order: keys are classification number, values are the row number in file
-        """
-        path = os.path.join(
-            os.path.dirname(os.path.abspath(activity_browser.__file__)),
-            "static",
-            "database_classifications",
-            "ISIC_Rev_4_english_structure.txt",
-        )
-
-        df = pd.read_csv(path)
-
-        tree_data = {}
-        tree_codes = {}
-        tree_numeric_order = {}
-        last_super = tuple()
-        last_super_depth = 0
-        for idx, row in df.iterrows():
-            cls, name = row  # cls is the number classification, name is the proper name
-            current_depth = len(cls)  # we measure the depth by the length of cls
-            key = f"{cls}:{name}"
-            tree_codes[cls] = key  # add the full key to the classification cls in dict
-            tree_numeric_order[cls] = (
-                idx  # add the row number to the classification cls in dict
-            )
-
-            if current_depth > last_super_depth:
-                # this is a sub-class at a deeper level as the last entry we read
-                path = tuple(
-                    list(last_super) + [key]
-                )  # create a tuple of the tree path
-            elif current_depth <= last_super_depth:
-                # this is a (sub-)class at a same or higher level than the last entry we read
-                depth = (
-                    last_super_depth - current_depth + 1
-                )  # find how many entries to clip of the path
-                path = tuple(
-                    list(last_super)[:-depth] + [key]
-                )  # create a tuple of the tree path
-
-            tree_data[key] = path  # add the treepath to the key in dict
-            last_super = path  # add as last_super
-
-            # take the last class level, split on ':' and take the length of the class as depth
-            last_super_depth = len(last_super[-1].split(":")[0])
-        return tree_data, tree_codes, tree_numeric_order
+        """Return the ISIC lookup dicts, see the module level `get_isic_tree`."""
+        return get_isic_tree()
 
     def setup_and_sync(self) -> None:
         self.setup_model_data()
@@ -318,18 +491,6 @@ class ActivitiesBiosphereTreeModel(BaseTreeModel):
         QApplication.restoreOverrideCursor()
         self.updated.emit()
 
-    def build_tree(self, data: dict, root: ActivitiesBiosphereItem) -> None:
-        """Assemble the tree ui."""
-        for key, value in data.items():
-            if isinstance(value, dict):
-                # this is a root or branch node
-                new_data = [key] + [""] * (self.columnCount() - 1)
-                new_root = root.build_item(new_data, root)
-                self.build_tree(value, new_root)
-            else:
-                # this is a leaf node
-                ActivitiesBiosphereItem.build_item(value, root)
-
     @Slot(name="activitiesAltered")
     def setup_model_data(self) -> None:
         """Construct a dataframe of activities and a complete nested
@@ -344,14 +505,24 @@ class ActivitiesBiosphereTreeModel(BaseTreeModel):
         # remove empty columns
         df.replace("", np.nan, inplace=True)
         df.dropna(how="all", axis=1, inplace=True)
-        df["tree_order"] = df.apply(lambda row: self.tree_order(row), axis=1)
-        df["tree_path_tuple"] = df.apply(lambda row: self.tree_path_tuple(row), axis=1)
+        codes = isic_class_codes(df["ISIC rev.4 ecoinvent"])
+        df["tree_order"] = codes.map(self.ISIC_order).fillna(99999).astype(int)
+        paths = codes.map(get_isic_code_paths())
+        df["tree_path_tuple"] = [
+            (path if isinstance(path, tuple) else NO_CLASSIFICATION) + (product,)
+            for path, product in zip(paths, df["Product"])
+        ]
         df = df.reset_index(drop=True)
 
-        # Sort dataframe on column: 'product' and then on 'tree_order'
+        # Sort dataframe on column: 'tree_order' and then on 'product' (case-insensitive)
         sort_field = df.columns[0]
-        df = df.iloc[df[sort_field].str.lower().argsort()]
-        df = df.iloc[df["tree_order"].argsort()]
+        order = np.lexsort(
+            (
+                df[sort_field].fillna("").astype(str).str.lower().to_numpy(dtype=str),
+                df["tree_order"].to_numpy(),
+            )
+        )
+        df = df.iloc[order]
         del df["tree_order"]
         self._dataframe = df
 
@@ -375,36 +546,6 @@ class ActivitiesBiosphereTreeModel(BaseTreeModel):
         df.columns = [bc.bw_keys_to_AB_names.get(col, col) for col in self.HEADERS]
         return df
 
-    def tree_order(self, row) -> int:
-        """Give item order to row, if no class exists, move to lowest rank."""
-        classification = row["ISIC rev.4 ecoinvent"]
-        if not isinstance(classification, str):
-            # this is not a valid number, return high number (low rank)
-            return 99999
-        # match based on the actual number code, ignore letters or text
-        class_code = classification.split(":")[0]  # take only class code
-        if len(class_code) > 1 and not class_code[-1].isdigit():
-            class_code = class_code[:-1]  # only read the numeric part of the code
-        order = self.ISIC_order.get(
-            class_code, 99999
-        )  # get the row number from the ISIC file for this class
-        return order
-
-    def tree_path_tuple(self, row) -> tuple:
-        """Convert the row to a tuple"""
-        classification = row["ISIC rev.4 ecoinvent"]
-        if not isinstance(classification, str):
-            # this is not a valid number, return 'No classification'
-            return tuple(list(("No classification",)) + [row["Product"]])
-        # match based on the actual number code, ignore letters or text
-        class_code = classification.split(":")[0]
-        if len(class_code) > 1 and not class_code[-1].isdigit():
-            class_code = class_code[:-1]
-        classification = self.ISIC_tree_codes.get(class_code, ("No classification",))
-        tup = self.ISIC_tree[classification]
-        tup = tuple(list(tup) + [row["Product"]])
-        return tup
-
     @staticmethod
     def nest_data(df: pd.DataFrame, method: tuple = None) -> dict:
         """Convert impact category dataframe into nested dict format.
@@ -501,10 +642,7 @@ class ActivitiesBiosphereTreeModel(BaseTreeModel):
         if not isinstance(df, pd.DataFrame):
             df = deepcopy(self._dataframe)
         cols = cols or df.columns
-        mask = functools.reduce(
-            np.logical_or,
-            [df[col].apply(lambda x: query.lower() in str(x).lower()) for col in cols],
-        )
+        mask = contains(search_text(df, cols), query)
         return df.loc[mask].reset_index(drop=True)
 
     def search_tree(self, query: str) -> Tuple[dict, int]:
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 import numpy as np
+from PySide2.QtCore import QModelIndex
 
 from .base import PandasModel
 
@@ -11,8 +12,46 @@ class LCAResultsModel(PandasModel):
 
 
 class InventoryModel(PandasModel):
+    """Inventory of the calculation setup, with a row per biosphere or technosphere flow.
+
+    Inventories of large systems can hold many thousands of rows, these are handed to the view in batches of
+    BATCH_SIZE through canFetchMore/fetchMore as the user scrolls down.
+    """
+
+    BATCH_SIZE = 500
+
+    def __init__(self, df=None, parent=None):
+        super().__init__(df, parent)
+        self._loaded = 0
+
+    def rowCount(self, parent=None, *args, **kwargs):
+        if parent is not None and parent.isValid():
+            return 0
+        return self._loaded
+
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        if parent.isValid() or self._dataframe is None:
+            return False
+        return self._loaded < self._dataframe.shape[0]
+
+    def fetchMore(self, parent=QModelIndex(), count: int = None) -> None:
+        if parent.isValid() or self._dataframe is None:
+            return
+        remainder = self._dataframe.shape[0] - self._loaded
+        count = min(count or self.BATCH_SIZE, remainder)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+
+    def fetch_all(self) -> None:
+        """Load all remaining rows, sorting and filtering need the complete inventory."""
+        self.fetchMore(count=self._dataframe.shape[0] if self._dataframe is not None else 0)
+
     def sync(self, df):
         self._dataframe = df
+        self._loaded = min(self.BATCH_SIZE, self._dataframe.shape[0])
         # set the visible columns
         self.filterable_columns = {
             col: i for i, col in enumerate(self._dataframe.columns.to_list())
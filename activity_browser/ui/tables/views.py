@@ -2,6 +2,7 @@ import os
 from typing import Optional
 from logging import getLogger
 
+import numpy as np
 from PySide2 import QtGui, QtWidgets
 from PySide2.QtCore import QPoint, QRect, QSize, Qt, QTimer, Signal, Slot
 from PySide2.QtWidgets import QApplication, QSizePolicy, QTableView
@@ -578,7 +579,8 @@ class ABMultiColumnSortProxyModel(ABSortProxyModel):
         self.activate_filter = False
 
     def set_filters(self, mask) -> None:
-        self.mask = mask
+        # filterAcceptsRow is called for every row, so index a plain array
+        self.mask = np.asarray(mask, dtype=bool)
         self.matches = 0
         self.activate_filter = True
         self.invalidateFilter()
@@ -594,7 +596,7 @@ class ABMultiColumnSortProxyModel(ABSortProxyModel):
         if not self.activate_filter:
             return True
         # get the right index from the mask
-        matched = self.mask.iloc[row]
+        matched = self.mask[row]
         if matched:
             self.matches += 1
         return matched
@@ -636,6 +638,8 @@ class ABDictTreeView(QtWidgets.QTreeView):
             for childNo in range(0, childCount):
                 childIndex = index.child(childNo, 0)
                 if expand:  # if expanding, do that first (wonky animation otherwise)
+                    # make sure lazily populated branches are built before expanding them
+                    childIndex.model().fetchMore(childIndex)
                     self.setExpanded(childIndex, expand)
                 subChildCount = childIndex.internalPointer().childCount()
                 if subChildCount > 0:
@@ -646,6 +650,8 @@ class ABDictTreeView(QtWidgets.QTreeView):
         QApplication.setOverrideCursor(Qt.WaitCursor)
         if not expand:  # if collapsing, do that first (wonky animation otherwise)
             self.setExpanded(index, expand)
+        else:
+            index.model().fetchMore(index)
         childCount = index.internalPointer().childCount()
         recursive_expand_or_collapse(index, childCount, expand)
         if expand:  # if expanding, do that last (wonky animation otherwise)
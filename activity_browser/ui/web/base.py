@@ -129,6 +129,7 @@ def to_svg(svg):
 
 class Bridge(QObject):
     graph_ready = Signal(str)
+    graph_changed = Signal(str)
     update_graph = Signal(object)
     style = Signal(str)
 
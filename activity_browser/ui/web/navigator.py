@@ -5,14 +5,15 @@ from copy import deepcopy
 from typing import Optional
 from logging import getLogger
 
-import networkx as nx
 from PySide2 import QtWidgets
 from PySide2.QtCore import Slot
 
 from activity_browser import signals
 from activity_browser.mod.bw2data import Database, get_activity, databases, Edge
-from activity_browser.mod.bw2data.backends import ExchangeDataset, ActivityDataset
+from activity_browser.mod.bw2data.backends import Activity, ExchangeDataset, ActivityDataset
 
+from ...bwutils.activity_index import AB_activity_index
+from ...bwutils.adjacency import AB_adjacency
 from ...bwutils.commontasks import identify_activity_type, get_activity_name
 from .base import BaseGraph, BaseNavigatorWidget
 
@@ -273,8 +274,8 @@ class Graph(BaseGraph):
     def update_datasets(self):
         """Update the activities in the graph."""
         try:
-            self.nodes = [get_activity(act.key) for act in self.nodes]
-            self.edges = [Edge(document=ExchangeDataset.get_by_id(exc._document.id)) for exc in self.edges]
+            self.nodes = Graph.get_activities([act.key for act in self.nodes])
+            self.edges = Graph.get_exchanges([exc._document.id for exc in self.edges])
         except (ActivityDataset.DoesNotExist, ExchangeDataset.DoesNotExist):
             try:
                 get_activity(self.central_activity.key)  # test whether the activity still exists
@@ -294,13 +295,44 @@ class Graph(BaseGraph):
     def retrieve_future(self) -> None:
         self.nodes, self.edges = self.forward_stack.pop()
 
+    @staticmethod
+    def _chunks(items: list, size: int = 500):
+        """Split the items in chunks that stay below the SQLite limit of query parameters."""
+        for i in range(0, len(items), size):
+            yield items[i: i + size]
+
+    @staticmethod
+    def get_activities(keys: list) -> list:
+        """Returns the activity objects for a list of keys, read in bulk instead of a query per activity."""
+        ids = AB_activity_index.ids(keys)
+        documents = {}
+        for chunk in Graph._chunks(list(set(ids))):
+            documents.update(
+                (doc.id, doc) for doc in ActivityDataset.select().where(ActivityDataset.id << chunk)
+            )
+        if len(documents) < len(set(ids)):
+            raise ActivityDataset.DoesNotExist("Graph activity no longer exists.")
+        return [Activity(document=documents[i]) for i in ids]
+
+    @staticmethod
+    def get_exchanges(exc_ids: list) -> list:
+        """Returns the Exchange objects for a list of exchange ids, read in bulk instead of a query per exchange."""
+        documents = {}
+        for chunk in Graph._chunks(list(set(exc_ids))):
+            documents.update(
+                (doc.id, doc) for doc in ExchangeDataset.select().where(ExchangeDataset.id << chunk)
+            )
+        if len(documents) < len(set(exc_ids)):
+            raise ExchangeDataset.DoesNotExist("Graph exchange no longer exists.")
+        return [Edge(document=documents[i]) for i in exc_ids]
+
     @staticmethod
     def upstream_and_downstream_nodes(key: tuple) -> (list, list):
         """Returns the upstream and downstream activity objects for a key."""
-        activity = get_activity(key)
-        upstream_nodes = [ex.input for ex in activity.technosphere()]
-        downstream_nodes = [ex.output for ex in activity.upstream()]
-        return upstream_nodes, downstream_nodes
+        _, upstream_keys = AB_adjacency.upstream(key)
+        _, downstream_keys = AB_adjacency.downstream(key)
+        nodes = Graph.get_activities(upstream_keys + downstream_keys)
+        return nodes[:len(upstream_keys)], nodes[len(upstream_keys):]
 
     @staticmethod
     def upstream_and_downstream_exchanges(key: tuple) -> (list, list):
@@ -308,21 +340,15 @@ class Graph(BaseGraph):
 
         act.upstream refers to downstream exchanges; brightway is confused here)
         """
-        activity = get_activity(key)
-        return [ex for ex in activity.technosphere()], [
-            ex for ex in activity.upstream()
-        ]
+        upstream_ids, _ = AB_adjacency.upstream(key)
+        downstream_ids, _ = AB_adjacency.downstream(key)
+        exchanges = Graph.get_exchanges(upstream_ids + downstream_ids)
+        return exchanges[:len(upstream_ids)], exchanges[len(upstream_ids):]
 
     @staticmethod
     def inner_exchanges(nodes: list) -> list:
         """Returns all exchanges (Exchange objects) between a list of nodes."""
-        node_keys = set(node.key for node in nodes)
-        exchanges = itertools.chain(node.technosphere() for node in nodes)
-        return [
-            ex
-            for ex in exchanges
-            if all(k in node_keys for k in (ex["input"], ex["output"]))
-        ]
+        return Graph.get_exchanges(AB_adjacency.inner(node.key for node in nodes))
 
     def remove_outside_exchanges(self) -> None:
         """
@@ -389,8 +415,7 @@ class Graph(BaseGraph):
         if key == self.central_activity.key:
             log.warning("Cannot remove central activity.")
             return
-        act = get_activity(key)
-        self.nodes.remove(act)
+        self.nodes = [node for node in self.nodes if node.key != key]
         if self.direct_only:
             self.remove_outside_exchanges()
         else:
@@ -403,37 +428,26 @@ class Graph(BaseGraph):
 
     def remove_orphaned_nodes(self) -> None:
         """
-        Remove orphaned nodes from graph using the networkx.
-        Orphaned nodes are defined as having no path to the central_activity.
+        Remove orphaned nodes from graph.
+        Orphaned nodes are defined as having no path to the central_activity, they are found with a single
+        breadth-first search from the central_activity over the edges in either direction.
         """
-
-        def format_as_weighted_edges(exchanges, activity_objects=False):
-            """Returns the exchanges as a list of weighted edges (from, to, weight) for networkx."""
-            if activity_objects:
-                return ((ex.input, ex.output, ex.amount) for ex in exchanges)
-            else:  # keys
-                return ((ex["input"], ex["output"], ex["amount"]) for ex in exchanges)
-
-        # construct networkx graph
-        G = nx.MultiGraph()
-        for node in self.nodes:
-            G.add_node(node.key)
-        G.add_weighted_edges_from(format_as_weighted_edges(self.edges))
-
-        # identify orphaned nodes
-        # checks each node in current dataset whether it is connected to central node
-        # adds node_id of orphaned nodes to list
-        orphaned_node_ids = (
-            node
-            for node in G.nodes
-            if not nx.has_path(G, node, self.central_activity.key)
-        )
-
-        count = 1
-        for count, key in enumerate(orphaned_node_ids, 1):
-            act = get_activity(key)
-            self.nodes.remove(act)
-        log.info(f"Removed ORPHANED nodes: {count}")
+        neighbours = {}
+        for ex in self.edges:
+            neighbours.setdefault(ex["input"], []).append(ex["output"])
+            neighbours.setdefault(ex["output"], []).append(ex["input"])
+
+        connected = {self.central_activity.key}
+        queue = [self.central_activity.key]
+        while queue:
+            for key in neighbours.get(queue.pop(), []):
+                if key not in connected:
+                    connected.add(key)
+                    queue.append(key)
+
+        count = len(self.nodes)
+        self.nodes = [node for node in self.nodes if node.key in connected]
+        log.info(f"Removed ORPHANED nodes: {count - len(self.nodes)}")
 
         # update edges again to remove those that link to nodes that have been deleted
         self.remove_outside_exchanges()
@@ -452,10 +466,12 @@ class Graph(BaseGraph):
             log.info("Graph has no nodes (activities).")
             return
 
+        # the edges take their activities from the nodes, instead of reading them again
+        nodes = {act.key: act for act in self.nodes}
         data = {
             "nodes": [Graph.build_json_node(act) for act in self.nodes],
             "edges": [
-                Graph.build_json_edge(exc, self.flip_negative_edges)
+                Graph.build_json_edge(exc, self.flip_negative_edges, nodes)
                 for exc in self.edges
             ],
             "title": self.central_activity.get("reference product"),
@@ -477,17 +493,21 @@ class Graph(BaseGraph):
         }
 
     @staticmethod
-    def build_json_edge(exc, flip_negative: bool) -> dict:
+    def build_json_edge(exc, flip_negative: bool, nodes: dict = None) -> dict:
         """Take an exchange object and return a valid JSON document.
 
         ``flip_negative`` will change the direction of the edge to represent
         the correct physical flow direction. However, this is experimental,
         and may not be reflected in the actual display of the product/flow.
+        ``nodes`` are the activities of the graph by key, exchange inputs or
+        outputs that are not in it are read from the database.
         """
-        product = exc.input
+        nodes = nodes or {}
+        product = nodes[exc["input"]] if exc["input"] in nodes else exc.input
         reference = product.get("reference product") or product.get("name")
         amount = exc.get("amount")
-        from_act, to_act = exc.input, exc.output
+        from_act = product
+        to_act = nodes[exc["output"]] if exc["output"] in nodes else exc.output
         if flip_negative and amount < 0:
             from_act, to_act = to_act, from_act
             amount = abs(amount)
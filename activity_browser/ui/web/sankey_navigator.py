@@ -2,7 +2,7 @@
 import json
 import os
 import time
-from typing import List
+from typing import List, Optional
 from logging import getLogger
 
 import bw2calc as bc
@@ -12,21 +12,14 @@ from PySide2.QtWidgets import QComboBox
 
 from activity_browser import signals
 from activity_browser.mod import bw2data as bd
-from activity_browser.mod.bw2data.backends import ActivityDataset
 
+from ...bwutils.activity_index import AB_activity_index
+from ...bwutils.metadata import AB_metadata
 from ...bwutils.commontasks import identify_activity_type
-from ...bwutils.superstructure.graph_traversal_with_scenario import \
-    GraphTraversalWithScenario
+from ...bwutils.graph_traversal import ABGraphTraversal
+from ...bwutils.results_cache import AB_results_cache
 from .base import BaseGraph, BaseNavigatorWidget
 
-try:
-    # test whether we're running bw25
-    from bw2calc.graph_traversal import \
-        AssumedDiagonalGraphTraversal as GraphTraversal
-except:
-    # fall back on regular bw
-    from bw2calc import GraphTraversal
-
 log = getLogger(__name__)
 
 
@@ -58,7 +51,6 @@ class SankeyNavigatorWidget(BaseNavigatorWidget):
     def __init__(self, cs_name, parent=None):
         super().__init__(parent, css_file="sankey_navigator.css")
 
-        self.cache = {}  # we cache the calculated data to improve responsiveness
         self.parent = parent
         self.has_scenarios = self.parent.has_scenarios
         self.cs = cs_name
@@ -86,9 +78,19 @@ class SankeyNavigatorWidget(BaseNavigatorWidget):
 
     @Slot(name="loadFinishedHandler")
     def load_finished_handler(self) -> None:
+        # the page starts without a graph, so send it as a whole
+        self.graph.sent = None
         if self.has_sankey:
             self.send_json()
 
+    def send_json(self) -> None:
+        """Send the graph to javascript, or only its changes if javascript shows an earlier version of it."""
+        changes = self.graph.changes()
+        if changes is None:
+            super().send_json()
+        else:
+            self.bridge.graph_changed.emit(changes)
+
     def connect_signals(self):
         super().connect_signals()
         self.button_calculate.clicked.connect(self.new_sankey)
@@ -240,57 +242,62 @@ class SankeyNavigatorWidget(BaseNavigatorWidget):
     ) -> None:
         """Calculate LCA, do graph traversal, get JSON graph data for this, and send to javascript."""
 
-        # the cache key consists of demand/method/scenario indices (index of item in the relevant tables),
-        # the cutoff, max_calc.
-        # together, these are unique.
-        cache_key = (demand_index, method_index, scenario_index, cut_off, max_calc)
-        if data := self.cache.get(cache_key, False):
-            # this Sankey is already cached, generate the Sankey with the cached data
-            log.debug(f"CACHED sankey for: {demand}, {method}, key: {cache_key}")
-            self.graph.new_graph(data)
-            self.has_sankey = bool(self.graph.json_data)
-            self.send_json()
-            return
+        # the cache key consists of demand/method/scenario indices (index of item in the relevant tables) in the
+        # namespace of the calculation and max_calc. together, these are unique. The cached traversal is continued for
+        # a lower cutoff and filtered for a higher cutoff. A traversal is limited by the number of calculations it
+        # made so far, so each max_calc has its own, otherwise the graph would depend on the previous settings.
+        cache_key = (
+            self.parent.cache_namespace, "sankey", demand_index, method_index, scenario_index, max_calc
+        )
+        cached = AB_results_cache.get(cache_key) if demand_index is not None else None
 
         start = time.time()
-        log.debug(f"CALCULATE sankey for: {demand}, {method}, key: {cache_key}")
         try:
-            if scenario_lca:
-                self.parent.mlca.update_lca_calculation_for_sankey(
-                    scenario_index, demand, method_index
-                )
-                data = GraphTraversalWithScenario(self.parent.mlca).calculate(
-                    demand, method, cutoff=cut_off, max_calc=max_calc
-                )
+            if cached:
+                log.debug(f"CACHED sankey for: {demand}, {method}, key: {cache_key}")
+                traversal, metadata = cached
             else:
-                try:
-                    data = GraphTraversal().calculate(
-                        demand, method, cutoff=cut_off, max_calc=max_calc
+                log.debug(f"CALCULATE sankey for: {demand}, {method}, key: {cache_key}")
+                if demand_index is not None and method_index is not None:
+                    # reuse the factorized technosphere and the supply arrays of the calculation setup
+                    self.parent.mlca.update_lca_calculation_for_sankey(
+                        scenario_index, demand_index, method_index
                     )
-                except:
+                    lca = self.parent.mlca.lca
+                else:
                     lca = bc.LCA(demand, method)
-                    data = GraphTraversal().calculate(
-                        lca, cutoff=cut_off, max_calc=max_calc
-                    )
-                    data["lca"] = lca
-            # store the metadata from this calculation
-            data["metadata"] = {
-                "demand": list(data["lca"].demand.items())[0],
-                "score": data["lca"].score,
-                "unit": bd.methods[method]["unit"],
-                "act_dict": data["lca"].activity_dict.items(),
-            }
-            # drop LCA object as it's useless from now on
-            del data["lca"]
+                    lca.lci()
+                    lca.lcia()
+                traversal = ABGraphTraversal(lca, demand)
+                # store the metadata from this calculation
+                metadata = {
+                    "demand": list(demand.items())[0],
+                    "score": lca.score,
+                    "unit": bd.methods[method]["unit"],
+                    "act_dict": traversal.activity_dict.items(),
+                }
+
+            data = traversal.traverse(
+                cutoff=cut_off,
+                max_calc=max_calc,
+                progress=lambda counter: signals.new_statusbar_message.emit(
+                    f"Graph traversal: {counter} exchanges assessed"
+                ),
+            )
+            data["metadata"] = metadata
 
-        except (ValueError, ZeroDivisionError) as e:
+        except (ValueError, ZeroDivisionError, RuntimeError) as e:
+            # splu raises a RuntimeError when the technosphere matrix is singular
             QtWidgets.QMessageBox.information(None, "Not possible.", str(e))
+            return
         log.debug(
             f"Completed graph traversal ({round(time.time() - start, 2)} seconds, {data['counter']} iterations)"
         )
 
-        # cache the generated Sankey data
-        self.cache[cache_key] = data
+        # cache the traversal, so it can be continued or filtered for other cutoffs, also when it was continued to
+        # update its size
+        if demand_index is not None:
+            AB_results_cache.put(cache_key, (traversal, metadata))
 
         # generate the new Sankey
         self.graph.new_graph(data)
@@ -321,29 +328,79 @@ class Graph(BaseGraph):
     A JSON representation of the graph (edges and nodes) enables its use in javascript/html/css.
     """
 
+    def __init__(self):
+        super().__init__()
+        self.sent = None  # the graph data that was last sent to javascript
+
     def new_graph(self, data):
         self.json_data = Graph.get_json_data(data)
         self.update()
 
+    def changes(self) -> Optional[str]:
+        """Return the changes from the graph that was last sent to javascript to the current graph as JSON.
+
+        Only nodes and edges that were added, removed or changed are included. Returns None if the whole graph should
+        be sent instead: when nothing was sent before, or when the reference flow, impact category or total impact
+        differ, as these change every node and edge.
+        """
+        if self.json_data is None:
+            self.sent = None
+            return None
+        current = json.loads(self.json_data)
+        previous, self.sent = self.sent, current
+        if previous is None or any(previous[k] != current[k] for k in ("title", "max_impact")):
+            return None
+
+        nodes = {n["id"]: n for n in current["nodes"]}
+        previous_nodes = {n["id"]: n for n in previous["nodes"]}
+        edges = {(e["source_id"], e["target_id"]): e for e in current["edges"]}
+        previous_edges = {(e["source_id"], e["target_id"]): e for e in previous["edges"]}
+        return json.dumps(
+            {
+                "title": current["title"],
+                "max_impact": current["max_impact"],
+                "removed_nodes": [i for i in previous_nodes if i not in nodes],
+                "removed_edges": [list(k) for k in previous_edges if k not in edges],
+                "nodes": [n for i, n in nodes.items() if previous_nodes.get(i) != n],
+                "edges": [e for k, e in edges.items() if previous_edges.get(k) != e],
+            }
+        )
+
     @staticmethod
     def get_json_data(data) -> str:
-        """Transform bw.Graphtraversal() output to JSON data."""
+        """Transform bw.Graphtraversal() output to JSON data.
+
+        The names, products, locations and units of all activities are read from the metadata at once.
+        """
         meta = data["metadata"]
         lca_score = meta["score"]
         lcia_unit = meta["unit"]
         demand = meta["demand"]
         reverse_activity_dict = {v: k for k, v in meta["act_dict"]}
 
-        build_json_node = Graph.compose_node_builder(lca_score, lcia_unit, demand[0])
-        build_json_edge = Graph.compose_edge_builder(
-            reverse_activity_dict, lca_score, lcia_unit
+        indices = [idx for idx in data["nodes"] if idx != -1]
+        keys = AB_activity_index.keys([reverse_activity_dict[idx] for idx in indices])
+        AB_metadata.add_metadata({key[0] for key in keys})
+        metadata = AB_metadata.get_metadata(
+            keys, ["name", "reference product", "location", "unit"]
         )
+        activities = {
+            idx: {
+                "key": key,
+                "name": name,
+                "product": product or name,
+                "location": location,
+                "unit": unit,
+            }
+            for idx, key, name, product, location, unit in zip(
+                indices, keys, *(metadata[col].tolist() for col in metadata.columns)
+            )
+        }
+
+        demand_key = id_to_key(getattr(demand[0], "key", demand[0]))
+        build_json_node = Graph.compose_node_builder(lca_score, lcia_unit, demand_key)
+        build_json_edge = Graph.compose_edge_builder(activities, lca_score, lcia_unit)
 
-        valid_nodes = (
-            (bd.get_activity(reverse_activity_dict[idx]), v)
-            for idx, v in data["nodes"].items()
-            if idx != -1
-        )
         valid_edges = (
             edge
             for edge in data["edges"]
@@ -351,7 +408,7 @@ class Graph(BaseGraph):
         )
 
         json_data = {
-            "nodes": [build_json_node(act, v) for act, v in valid_nodes],
+            "nodes": [build_json_node(activities[idx], data["nodes"][idx]) for idx in indices],
             "edges": [build_json_edge(edge) for edge in valid_edges],
             "title": Graph.build_title(demand, lca_score, lcia_unit),
             "max_impact": max(abs(n["cum"]) for n in data["nodes"].values()),
@@ -378,43 +435,41 @@ class Graph(BaseGraph):
 
     @staticmethod
     def compose_node_builder(lca_score: float, lcia_unit: str, demand: tuple):
-        """Build and return a function which processes activities and values
-        into valid JSON documents.
+        """Build and return a function which processes activity metadata and
+        values into valid JSON documents.
 
         Inspired by https://stackoverflow.com/a/7045809
         """
 
-        def build_json_node(act, values: dict) -> dict:
+        def build_json_node(act: dict, values: dict) -> dict:
             return {
-                "db": act.key[0],
-                "id": act.key[1],
-                "product": act.get("reference product") or act.get("name"),
-                "name": act.get("name"),
-                "location": act.get("location"),
+                "db": act["key"][0],
+                "id": act["key"][1],
+                "product": act["product"],
+                "name": act["name"],
+                "location": act["location"],
                 "amount": values.get("amount"),
                 "LCIA_unit": lcia_unit,
                 "ind": values.get("ind"),
                 "ind_norm": values.get("ind") / lca_score,
                 "cum": values.get("cum"),
                 "cum_norm": values.get("cum") / lca_score,
-                "class": "demand" if act == demand else identify_activity_type(act),
+                "class": "demand" if act["key"] == demand else identify_activity_type(act),
             }
 
         return build_json_node
 
     @staticmethod
-    def compose_edge_builder(reverse_dict: dict, lca_score: float, lcia_unit: str):
+    def compose_edge_builder(activities: dict, lca_score: float, lcia_unit: str):
         """Build a function which turns graph edges into valid JSON documents."""
 
         def build_json_edge(edge: dict) -> dict:
-            p = bd.get_activity(reverse_dict[edge["from"]])
-            from_key = id_to_key(reverse_dict[edge["from"]])
-            to_key = id_to_key(reverse_dict[edge["to"]])
+            p = activities[edge["from"]]
             return {
-                "source_id": from_key[1],
-                "target_id": to_key[1],
+                "source_id": p["key"][1],
+                "target_id": activities[edge["to"]]["key"][1],
                 "amount": edge["amount"],
-                "product": p.get("reference product") or p.get("name"),
+                "product": p["product"],
                 "impact": edge["impact"],
                 "ind_norm": edge["impact"] / lca_score,
                 "unit": lcia_unit,
@@ -422,7 +477,7 @@ class Graph(BaseGraph):
                 "<br>{:.3g} {} ({:.2g}%) ".format(
                     lcia_unit,
                     edge["amount"],
-                    p.get("unit"),
+                    p["unit"],
                     edge["impact"],
                     lcia_unit,
                     edge["impact"] / lca_score * 100,
@@ -435,4 +490,4 @@ class Graph(BaseGraph):
 def id_to_key(id):
     if isinstance(id, tuple):
         return id
-    return ActivityDataset.get_by_id(id).database, ActivityDataset.get_by_id(id).code
+    return AB_activity_index.key(id)
@@ -6,7 +6,8 @@ from PySide2 import QtGui, QtWidgets
 from PySide2.QtCore import Qt, Signal, Slot
 
 from activity_browser import project_settings, signals
-from activity_browser.bwutils.superstructure import get_sheet_names
+from activity_browser.bwutils.superstructure import (ABParquetImporter,
+                                                     get_sheet_names)
 from activity_browser.mod import bw2data as bd
 
 from ...bwutils.ecoinvent_biosphere_versions.ecospold2biosphereimporter import \
@@ -167,6 +168,8 @@ class ExcelReadDialog(QtWidgets.QDialog):
         ".csv",
         ".feather",
     }
+    if ABParquetImporter.is_available():
+        SUFFIXES.add(".parquet")
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -237,7 +240,9 @@ class ExcelReadDialog(QtWidgets.QDialog):
         path, _ = QtWidgets.QFileDialog.getOpenFileName(
             parent=self,
             caption="Select scenario template file",
-            filter="Excel (*.xlsx);; feather (*.feather);; CSV and Archived (*.csv *.zip *.tar *.bz2 *.gz *.xz);; All Files (*.*)",
+            filter="Excel (*.xlsx);; feather (*.feather);; "
+            + ("parquet (*.parquet);; " if ABParquetImporter.is_available() else "")
+            + "CSV and Archived (*.csv *.zip *.tar *.bz2 *.gz *.xz);; All Files (*.*)",
             selectedFilter="All Files (*.*)",
         )
         if path:
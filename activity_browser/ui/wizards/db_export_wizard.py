@@ -2,9 +2,10 @@
 import os
 
 from PySide2 import QtWidgets
-from PySide2.QtCore import Slot
+from PySide2.QtCore import Qt, Slot
 
 from activity_browser.bwutils import exporters as exp
+from activity_browser.bwutils.errors import SpreadsheetTooLargeError
 from activity_browser.mod import bw2data as bd
 
 EXPORTERS = {
@@ -13,10 +14,13 @@ EXPORTERS = {
     # Export the database, all project parameters and all parameters that are
     # related to that database as an Excel file.
     "Excel": exp.write_lci_excel,
+    # Same as Excel, for databases that are too large for a spreadsheet.
+    "CSV": exp.write_lci_csv,
 }
 EXTENSIONS = {
     "BW2Package": ".bw2package",
     "Excel": ".xlsx",
+    "CSV": ".csv",
 }
 
 
@@ -35,10 +39,11 @@ class DatabaseExportWizard(QtWidgets.QWizard):
             self.setPage(i, page)
 
     def accept(self) -> None:
-        self.perform_export()
-        super().accept()
+        if self.perform_export():
+            super().accept()
 
-    def perform_export(self) -> None:
+    def perform_export(self) -> bool:
+        """Export the chosen database, return whether it succeeded."""
         db_name = self.field("database_choice")
         export_as = self.field("export_option")
         out_path = self.field("output_path")
@@ -49,13 +54,40 @@ class DatabaseExportWizard(QtWidgets.QWizard):
             out_path = path + ext
         elif not ext:
             out_path = path + EXTENSIONS[export_as]
-        EXPORTERS[export_as](db_name, out_path)
+        if export_as == "BW2Package":
+            EXPORTERS[export_as](db_name, out_path)
+            return True
+
+        progress = QtWidgets.QProgressDialog(
+            parent=self, labelText=f"Exporting {db_name}", maximum=0
+        )
+        progress.setCancelButton(None)
+        progress.setWindowTitle("Exporting database")
+        progress.setWindowModality(Qt.WindowModal)
+        progress.show()
+
+        def update(done: int, total: int) -> None:
+            progress.setMaximum(total)
+            progress.setValue(done)
+            QtWidgets.QApplication.processEvents()
+
+        try:
+            EXPORTERS[export_as](db_name, out_path, progress=update)
+        except SpreadsheetTooLargeError as e:
+            # the database doesn't fit in a spreadsheet, keep the wizard open to choose another format
+            progress.close()
+            QtWidgets.QMessageBox.warning(self, "Export not possible", str(e))
+            return False
+        finally:
+            progress.deleteLater()
+        return True
 
 
 class ExportDatabasePage(QtWidgets.QWizardPage):
     FILTERS = {
         "BW2Package": "BW2Package Files (*.bw2package);; All Files (*.*)",
         "Excel": "Excel Files (*.xlsx);; All Files (*.*)",
+        "CSV": "CSV Files (*.csv);; All Files (*.*)",
     }
 
     def __init__(self, parent=None):
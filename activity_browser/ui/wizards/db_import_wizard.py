@@ -1,9 +1,12 @@
 # -*- coding: utf-8 -*-
 import io
+import multiprocessing
 import os.path
 import shutil
+import sys
+import time
 import typing
-from functools import lru_cache
+from functools import lru_cache, partial
 import tempfile
 import zipfile
 from pathlib import Path
@@ -20,6 +23,7 @@ from py7zr import py7zr
 
 from activity_browser.bwutils import errors
 from activity_browser.mod import bw2data as bd
+from activity_browser.mod.bw2data.backends import ActivityDataset, ExchangeDataset
 
 from ...bwutils.importers import ABExcelImporter, ABPackage
 from ...utils import sort_semantic_versions
@@ -1297,10 +1301,13 @@ class ExcelDatabaseImport(QtWidgets.QWizardPage):
 class ActivityBrowserExtractor(Ecospold2DataExtractor):
     """
     - modified from bw2io
-    - qt and python multiprocessing don't like each other on windows
+    - qt and python multiprocessing don't like each other on windows, so the
+      files are only parsed in worker processes where they can be forked
     - need to display progress in gui
     """
 
+    CHUNK_SIZE = 50  # files parsed per task of a worker process
+
     @classmethod
     def extract(cls, dirpath: str, db_name: str, *args, **kwargs):
         dir_path = Path(dirpath)
@@ -1312,9 +1319,27 @@ class ActivityBrowserExtractor(Ecospold2DataExtractor):
         else:
             raise OSError("Can't understand path {}".format(dirpath))
 
+        dir_path = str(dir_path)
+        if cls.use_processes(len(file_list)):
+            return cls.extract_parallel(dir_path, file_list, db_name)
+        return cls.extract_serial(dir_path, file_list, db_name)
+
+    @classmethod
+    def use_processes(cls, file_count: int) -> bool:
+        """Worker processes are only used where they can be forked from the
+        running application, and if there are files for more than one chunk.
+        """
+        return (
+            sys.platform.startswith("linux")
+            and "fork" in multiprocessing.get_all_start_methods()
+            and (os.cpu_count() or 1) > 1
+            and file_count > cls.CHUNK_SIZE
+        )
+
+    @classmethod
+    def extract_serial(cls, dir_path: str, file_list: list, db_name: str) -> list:
         data = []
         total = len(file_list)
-        dir_path = str(dir_path)
         for i, filename in enumerate(file_list, start=1):
             if import_signals.cancel_sentinel:
                 log.info(f"Extraction canceled at position {i}!")
@@ -1325,25 +1350,134 @@ class ActivityBrowserExtractor(Ecospold2DataExtractor):
 
         return data
 
+    @classmethod
+    def extract_parallel(cls, dir_path: str, file_list: list, db_name: str) -> list:
+        """Parse the files in chunks in worker processes.
+
+        The parsed chunks are streamed back in order as soon as they are
+        done, so progress is reported while the other chunks are parsed.
+
+        The workers are forked from the import thread. This is safe because
+        of what they run: a forked child only keeps the forking thread, and
+        it only parses files with bw2io's extract_activity (lxml and plain
+        python). The workers never touch Qt or the databases. They don't
+        use the logging handlers other threads may hold locks on, which
+        CPython re-initializes in the child anyway. Pool workers exit through
+        os._exit, so no Qt or atexit cleanup runs in them. Python 3.12 warns
+        about forking with threads because of these hazards.
+
+        spawn and forkserver are not used: their workers import the main
+        module, which imports activity_browser and would create a
+        QApplication in every worker.
+        """
+        chunks = [
+            file_list[i: i + cls.CHUNK_SIZE]
+            for i in range(0, len(file_list), cls.CHUNK_SIZE)
+        ]
+        processes = min(os.cpu_count() - 1 or 1, len(chunks))
+        log.info(f"Extracting {len(file_list)} files with {processes} processes")
+
+        data = []
+        total = len(file_list)
+        with multiprocessing.get_context("fork").Pool(processes) as pool:
+            # the pool is terminated when leaving the context, also on cancellation
+            results = pool.imap(
+                partial(cls.extract_chunk, dir_path, db_name=db_name), chunks
+            )
+            for chunk in results:
+                if import_signals.cancel_sentinel:
+                    log.info(f"Extraction canceled at position {len(data)}!")
+                    raise errors.ImportCanceledError
+
+                data.extend(chunk)
+                import_signals.extraction_progress.emit(len(data), total)
+
+        return data
+
+    @classmethod
+    def extract_chunk(cls, dir_path: str, file_list: list, db_name: str) -> list:
+        return [
+            cls.extract_activity(dir_path, filename, db_name)
+            for filename in file_list
+        ]
+
 
 class ActivityBrowserBackend(bd.backends.SQLiteBackend):
+    """
+    - bw2data writes the datasets within a single transaction, with the
+      indexes dropped and rebuilt around it for larger databases
+    - the rows are collected here and inserted in large batches with a
+      single prepared statement, instead of bw2data's insert_many batches
+      of 125 rows
+    - need to display progress in gui, at a limited rate
+    """
+
+    BATCH_SIZE = 10000  # rows per executemany
+    PROGRESS_INTERVAL = 0.1  # seconds between progress signals
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._ab_current_index = 0
         self._ab_total = 0
+        self._ab_activities = []
+        self._ab_exchanges = []
+        self._ab_progress_time = 0
 
     def _efficient_write_many_data(self, *args, **kwargs):
         data = args[0]
+        # the last dataset flushes the collected rows, so count from the start for every write
+        self._ab_current_index = 0
         self._ab_total = len(data)
+        self._ab_activities, self._ab_exchanges = [], []
         super()._efficient_write_many_data(*args, **kwargs)
 
     def _efficient_write_dataset(self, *args, **kwargs):
         if import_signals.cancel_sentinel:
             log.info(f"Writing canceled at position {self._ab_current_index}")
             raise errors.ImportCanceledError
+
+        # bw2data passes the index of the dataset first, bw25 doesn't. The
+        # datasets are added to new lists, so they can be collected here
+        # instead of being inserted by bw2data
+        start = 1 if isinstance(args[0], int) else 0
+        exchanges, activities = super()._efficient_write_dataset(
+            *args[: start + 2], [], [], *args[start + 4:], **kwargs
+        )
+        self._ab_exchanges.extend(exchanges)
+        self._ab_activities.extend(activities)
+
         self._ab_current_index += 1
-        import_signals.db_progress.emit(self._ab_current_index, self._ab_total)
-        return super()._efficient_write_dataset(*args, **kwargs)
+        last = self._ab_current_index == self._ab_total
+        if last or len(self._ab_exchanges) >= self.BATCH_SIZE:
+            self._ab_insert(ExchangeDataset, self._ab_exchanges)
+        if last or len(self._ab_activities) >= self.BATCH_SIZE:
+            self._ab_insert(ActivityDataset, self._ab_activities)
+
+        now = time.monotonic()
+        if last or now - self._ab_progress_time >= self.PROGRESS_INTERVAL:
+            self._ab_progress_time = now
+            import_signals.db_progress.emit(self._ab_current_index, self._ab_total)
+        return [], []
+
+    @staticmethod
+    def _ab_insert(model, rows: list) -> None:
+        """Insert the rows with executemany and clear them.
+
+        A single prepared statement is executed for all rows, which has no
+        limit on the number of rows like a multi-row insert does.
+        """
+        if not rows:
+            return
+        fields = [model._meta.fields[name] for name in rows[0]]
+        sql = 'INSERT INTO "{}" ({}) VALUES ({})'.format(
+            model._meta.table_name,
+            ", ".join('"{}"'.format(field.column_name) for field in fields),
+            ", ".join("?" for _ in fields),
+        )
+        model._meta.database.cursor().executemany(
+            sql, ([field.db_value(row[field.name]) for field in fields] for row in rows)
+        )
+        rows.clear()
 
 
 bd.config.backends["activitybrowser"] = ActivityBrowserBackend
@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+import bw2data as bd
+
+from activity_browser.bwutils import AB_activity_index
+from activity_browser.signals import ChangeSet
+
+
+def test_activity_index_lookup(ab_app):
+    key = ("activity_tests", "dd4e2393573c49248e7299fbe03a169c")
+    act_id = bd.get_activity(key).id
+
+    assert AB_activity_index.id(key) == act_id
+    assert AB_activity_index.key(act_id) == key
+    assert AB_activity_index.keys([act_id, key]) == [key, key]
+
+
+def test_activity_index_cleared_on_change(ab_app):
+    AB_activity_index.load()
+    assert AB_activity_index._keys is not None
+
+    changeset = ChangeSet()
+    changeset.add_activity(("activity_tests", "dd4e2393573c49248e7299fbe03a169c"))
+    AB_activity_index.records_changed(changeset)
+    assert AB_activity_index._keys is None
@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+import bw2data as bd
+
+from activity_browser.bwutils.adjacency import AB_adjacency
+
+
+def test_adjacency_matches_queries(ab_app):
+    act = bd.get_activity(("activity_tests", "3fcde3e3bf424e97b32cf29347ac7f33"))
+
+    exc_ids, keys = AB_adjacency.upstream(act.key)
+    assert sorted(exc_ids) == sorted(exc._document.id for exc in act.technosphere())
+    assert sorted(keys) == sorted(exc.input.key for exc in act.technosphere())
+
+    exc_ids, keys = AB_adjacency.downstream(act.key)
+    assert sorted(exc_ids) == sorted(exc._document.id for exc in act.upstream())
+    assert sorted(keys) == sorted(exc.output.key for exc in act.upstream())
+
+
+def test_adjacency_inner(ab_app):
+    act = bd.get_activity(("activity_tests", "3fcde3e3bf424e97b32cf29347ac7f33"))
+    keys = [act.key] + [exc.input.key for exc in act.technosphere()]
+
+    exc_ids = AB_adjacency.inner(keys)
+    assert set(exc._document.id for exc in act.technosphere()) <= set(exc_ids)
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+from activity_browser.bwutils import AB_metadata
+from activity_browser.bwutils.multilca import Contributions
+from activity_browser.mod.bw2analyzer import ABContributionAnalysis
+
+KEYS = [("db", "a"), ("db", "b"), ("db", "c"), ("db", "d"), ("db", "e")]
+
+
+@pytest.fixture
+def contributions(monkeypatch) -> Contributions:
+    """Contributions without an MLCA, aggregating the technosphere items of KEYS.
+
+    The item "d" has no location and "e" has no unit, so they are left out when grouping on those.
+    """
+    metadata = pd.DataFrame(
+        {
+            "location": ["NL", "DE", "NL", np.nan, "DE"],
+            "unit": ["kg", "kg", "MJ", "kg", np.nan],
+        },
+        index=pd.MultiIndex.from_tuples(KEYS),
+    )
+    monkeypatch.setattr(
+        AB_metadata,
+        "get_metadata",
+        lambda keys, columns: metadata.loc[keys, :].reindex(columns, axis="columns"),
+    )
+
+    contributions = Contributions.__new__(Contributions)
+    contributions.aggregate_data = {
+        "technosphere": (
+            dict(enumerate(KEYS)),
+            {key: i for i, key in enumerate(KEYS)},
+            ["location", "unit"],
+        )
+    }
+    contributions.aggregation_cache = {}
+    contributions.aggregation_version = AB_metadata.version
+    return contributions
+
+
+@pytest.mark.parametrize("parameters", ["location", "unit", ["location", "unit"]])
+def test_aggregation_matches_groupby(contributions, parameters):
+    array = np.array([[1.0, 2.0, 3.0, 4.0, 5.0], [-1.0, 0.5, 2.0, 8.0, 0.0]])
+    aggregated, mask_index, _ = contributions.aggregate_by_parameters(
+        array, "technosphere", parameters
+    )
+
+    # the DataFrame join and groupby the aggregation used to be done with
+    rev_index, keys, fields = contributions.aggregate_data["technosphere"]
+    df = pd.DataFrame(array).T
+    df.index = pd.MultiIndex.from_tuples(rev_index.values())
+    joined = AB_metadata.get_metadata(list(keys), fields).join(df).reset_index(drop=True)
+    expected = joined.groupby(parameters)[[0, 1]].sum()
+
+    assert list(mask_index.values()) == expected.index.tolist()
+    np.testing.assert_allclose(aggregated, expected.T.values)
+
+
+def sorted_top(column: np.ndarray, limit, limit_type: str, total_range: bool) -> tuple:
+    """The score, rests and top contributions of a column, as they were selected with sort_array."""
+    total = np.abs(column).sum() if total_range else column.sum()
+    top = ABContributionAnalysis().sort_array(column, limit=limit, limit_type=limit_type, total=total)
+    pos_rest = column[column > 0].sum() - top[top[:, 0] > 0][:, 0].sum()
+    neg_rest = column[column < 0].sum() - top[top[:, 0] < 0][:, 0].sum()
+    return column.sum(), pos_rest, neg_rest, {int(i): v for v, i in top if v != 0}
+
+
+@pytest.mark.parametrize(
+    "limit, limit_type",
+    [(1, "number"), (2, "number"), (3, "number"), (10, "number"), (0.2, "percent"), (0.8, "cum_percent")],
+)
+@pytest.mark.parametrize("total_range", [True, False])
+def test_top_contributions_match_sort_array(limit, limit_type, total_range):
+    contributions = np.array(
+        [
+            [4.0, -3.0, 2.0, 2.0, -1.0, 0.0],  # equal values
+            [1.0, 1.0, 1.0, -5.0, 0.5, 0.0],  # equal values around the limit
+            [-2.0, -6.0, 0.5, 1.5, -0.25, 3.0],  # mostly negative
+            [0.0, 0.0, 0.0, 0.0, 0.0, 0.0],  # nothing to select
+        ]
+    )
+    if limit_type == "cum_percent":
+        # both refuse to calculate a cumulative percentage of a total of 0
+        contributions = contributions[:3]
+    array, rows = Contributions.__new__(Contributions)._build_array(
+        contributions, limit, limit_type, total_range
+    )
+
+    for i, column in enumerate(contributions):
+        score, pos_rest, neg_rest, top = sorted_top(column, limit, limit_type, total_range)
+        assert np.allclose(array[:3, i], [score, pos_rest, neg_rest])
+        selected = {int(row): value for row, value in zip(rows, array[3:, i]) if value != 0}
+        # which of several equal values is selected is arbitrary, their amounts are the same
+        assert sorted(selected.values()) == sorted(top.values())
+        if len(set(np.abs(column))) == len(column):
+            assert selected == top
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+import csv
+
+import bw2data as bd
+import pytest
+from bw2io.export.csv import reformat
+from bw2io.export.excel import CSVFormatter
+
+from activity_browser.bwutils import exporters
+from activity_browser.bwutils.errors import SpreadsheetTooLargeError
+from activity_browser.bwutils.exporters import (ABCSVFormatter, write_lci_csv,
+                                                write_lci_excel)
+
+
+class ReferenceFormatter(CSVFormatter):
+    """The bw2io formatter, reading every activity on its own, with the AB changes to its output."""
+
+    def get_activity_metadata(self, act):
+        excluded = {"database", "name", "activity"}
+        return {
+            "name": act.get("name"),
+            "metadata": sorted(
+                [
+                    (k, reformat(v))
+                    for k, v in act.items()
+                    if k not in excluded and not isinstance(v, (dict, list))
+                ]
+            ),
+            "parameters": self.get_activity_parameters(act),
+        }
+
+    def exchange_as_dict(self, exc):
+        inp = exc.input
+        inp_fields = ("name", "unit", "location", "categories", "database", "reference product")
+        data = {k: v for k, v in exc._data.items() if k not in ("input", "output")}
+        if "product" in data and "reference product" not in data:
+            data["reference product"] = data.pop("product")
+        data.update(**{k: inp[k] for k in inp_fields if inp.get(k)})
+        return data
+
+
+def golden_database() -> bd.Database:
+    db = bd.Database("export_golden")
+    db.write(
+        {
+            ("export_golden", "a"): {
+                "name": "a",
+                "unit": "kg",
+                "location": "GLO",
+                "reference product": "a",
+                "exchanges": [
+                    {"input": ("export_golden", "a"), "amount": 1, "type": "production"},
+                    {"input": ("export_golden", "b"), "amount": 0.5, "type": "technosphere"},
+                ],
+            },
+            ("export_golden", "b"): {
+                "name": "b",
+                "unit": "kg",
+                "location": "CH",
+                "exchanges": [
+                    {"input": ("export_golden", "b"), "amount": 1, "type": "production"},
+                ],
+            },
+        }
+    )
+    bd.parameters.new_activity_parameters(
+        [
+            {"database": "export_golden", "code": "a", "name": "share_a", "amount": 0.5},
+            {"database": "export_golden", "code": "b", "name": "share_b", "amount": 0.2},
+        ],
+        "export_golden_group",
+    )
+    return db
+
+
+def test_write_lci_csv(ab_app, tmp_path):
+    out_file = write_lci_csv("activity_tests", tmp_path)
+    assert out_file.name == "lci-activity_tests.csv"
+
+    with open(out_file, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert sum(row[:1] == ["Activity"] for row in rows) == len(bd.Database("activity_tests"))
+
+
+def test_formatter_matches_bw2io(ab_app, monkeypatch):
+    db = golden_database()
+    try:
+        monkeypatch.setattr(ABCSVFormatter, "CHUNK_SIZE", 1)
+        assert ABCSVFormatter(db.name).get_formatted_data() == ReferenceFormatter(db.name).get_formatted_data()
+
+        # only the parameters of the exported activities are included, not the rest of their group
+        act = bd.get_activity(("export_golden", "a"))
+        rows = ABCSVFormatter(db.name, [act]).get_formatted_data()
+        assert rows == ReferenceFormatter(db.name, [act]).get_formatted_data()
+        names = {cell for row in rows for cell in row if isinstance(cell, str)}
+        assert "share_a" in names and "share_b" not in names
+    finally:
+        del bd.databases[db.name]
+
+
+def test_formatter_chunks(ab_app, monkeypatch):
+    expected = ABCSVFormatter("activity_tests").get_formatted_data()
+
+    # reading the activities in small chunks doesn't change the export
+    monkeypatch.setattr(ABCSVFormatter, "CHUNK_SIZE", 2)
+    progress = []
+    rows = list(
+        ABCSVFormatter("activity_tests").iter_formatted_data(
+            progress=lambda done, total: progress.append(done)
+        )
+    )
+    assert rows == expected
+    assert progress[-1] == len(bd.Database("activity_tests"))
+
+
+def test_write_lci_excel_too_large(ab_app, tmp_path, monkeypatch):
+    monkeypatch.setattr(exporters, "EXCEL_MAX_ROWS", 2)
+
+    with pytest.raises(SpreadsheetTooLargeError):
+        write_lci_excel("activity_tests", tmp_path)
+    assert not list(tmp_path.iterdir())
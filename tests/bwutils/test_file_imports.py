@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+from activity_browser.bwutils.superstructure import (SUPERSTRUCTURE,
+                                                     ABCSVImporter,
+                                                     ABParquetImporter)
+from activity_browser.bwutils.superstructure.file_imports import (parse_keys,
+                                                                  parse_tuples)
+
+
+def scenario_frame() -> pd.DataFrame:
+    df = pd.DataFrame({col: ["NA"] * 3 for col in SUPERSTRUCTURE})
+    df["from key"] = [("db", "a"), ("db", "b, c"), ("db", "it's")]
+    df["to key"] = [("fg", "x")] * 3
+    df["from database"], df["to database"] = "db", "fg"
+    df["from categories"] = [("air", "urban"), np.nan, np.nan]
+    df["to categories"] = np.nan
+    df["flow type"] = ["biosphere", "technosphere", "technosphere"]
+    df["scenario 1"] = [1.0, 2.0, 3.0]
+    return df
+
+
+def test_parse_keys():
+    keys = pd.Series(["('db', 'a')", '("db", "it\'s")', "('db', 'b, c')", np.nan])
+    parsed = parse_keys(keys)
+    assert parsed.tolist()[:3] == [("db", "a"), ("db", "it's"), ("db", "b, c")]
+    assert pd.isna(parsed[3])
+
+
+def test_parse_keys_escaped():
+    keys = pd.Series(["('db', 'a\\\\b')", "('db', 'it\\'s')", '("db", "say \\"hi\\"")'])
+    parsed = parse_keys(keys)
+    assert parsed.tolist() == [("db", "a\\b"), ("db", "it's"), ("db", 'say "hi"')]
+
+
+def test_parse_tuples():
+    categories = pd.Series(["('air', 'urban air')", "('water',)", "NA", np.nan])
+    parsed = parse_tuples(categories)
+    assert parsed.tolist()[:3] == [("air", "urban air"), ("water",), "NA"]
+
+
+def test_csv_import(tmp_path):
+    df = scenario_frame()
+    df.to_csv(tmp_path / "sdf.csv", sep=";", index=False)
+
+    result = ABCSVImporter.read_file(tmp_path / "sdf.csv", separator=";")
+    assert result["from key"].tolist() == df["from key"].tolist()
+    assert result["scenario 1"].dtype == float
+
+    chunks = list(ABCSVImporter.read_chunks(tmp_path / "sdf.csv", chunksize=2, separator=";"))
+    assert len(chunks) == 2
+    assert pd.concat(chunks)["from key"].tolist() == df["from key"].tolist()
+
+
+def test_csv_import_trailing_delimiter(tmp_path):
+    df = scenario_frame()
+    text = df.to_csv(sep=";", index=False).splitlines()
+    # every row except the header ends with a delimiter
+    (tmp_path / "sdf.csv").write_text("\n".join(text[:1] + [line + ";" for line in text[1:]]))
+
+    result = ABCSVImporter.read_file(tmp_path / "sdf.csv", separator=";")
+    assert result.columns.tolist() == df.columns.tolist()
+    assert result["from key"].tolist() == df["from key"].tolist()
+    assert result["scenario 1"].tolist() == [1.0, 2.0, 3.0]
+
+
+def test_parquet_roundtrip(tmp_path):
+    pytest.importorskip("pyarrow")
+    df = scenario_frame()
+    ABParquetImporter.write_file(df, tmp_path / "sdf.parquet")
+
+    result = ABParquetImporter.read_file(tmp_path / "sdf.parquet")
+    assert result["from key"].tolist() == df["from key"].tolist()
+    assert result["from categories"][0] == ("air", "urban")
+    assert result["scenario 1"].tolist() == [1.0, 2.0, 3.0]
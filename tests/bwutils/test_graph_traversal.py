@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+from scipy import sparse
+from scipy.sparse.linalg import spsolve
+
+from activity_browser.bwutils.graph_traversal import ABGraphTraversal
+
+
+class LCA:
+    """Minimal stand-in for a calculated bw2calc LCA.
+
+    a (score 1 per unit) needs 0.5 of b and 0.01 of c, b (score 2) needs 0.1 of c, c has a score of 4. The
+    activity b produces `production` units of its product.
+    """
+
+    def __init__(self, production: float = 1.0):
+        self.technosphere_matrix = sparse.csr_matrix(
+            np.array([[1.0, 0, 0], [-0.5, production, 0], [-0.01, -0.1, 1.0]])
+        )
+        self.biosphere_matrix = sparse.csr_matrix(np.array([[1.0, 2.0, 4.0]]))
+        self.characterization_matrix = sparse.csr_matrix(np.array([[1.0]]))
+        self.activity_dict = {("db", "a"): 0, ("db", "b"): 1, ("db", "c"): 2}
+        self.demand = {("db", "a"): 1.0}
+        self.supply_array = spsolve(
+            self.technosphere_matrix.tocsc(), np.array([1.0, 0, 0])
+        )
+        self.score = float(self.biosphere_matrix @ self.supply_array)
+
+
+def test_traversal_scores():
+    result = ABGraphTraversal(LCA()).traverse(cutoff=0.001)
+
+    assert set(result["nodes"]) == {-1, 0, 1, 2}
+    # cumulative score of b: 0.5 * (2 + 0.1 * 4)
+    assert np.isclose(result["nodes"][1]["cum"], 1.2)
+    assert len(result["edges"]) == 4
+
+
+def test_traversal_cutoff():
+    traversal = ABGraphTraversal(LCA())
+
+    # c only contributes 0.24 of a total score of 2.24
+    high = traversal.traverse(cutoff=0.15)
+    assert set(high["nodes"]) == {-1, 0, 1}
+
+    low = traversal.traverse(cutoff=0.001)
+    assert set(low["nodes"]) == {-1, 0, 1, 2}
+
+    # raising the cutoff again is filtered from the traversal
+    assert traversal.traverse(cutoff=0.15)["nodes"].keys() == high["nodes"].keys()
+
+
+def test_traversal_production_amount():
+    lca = LCA(production=2.0)
+    result = ABGraphTraversal(lca).traverse(cutoff=0.001)
+    technosphere = lca.technosphere_matrix.tocsc()
+
+    # nodes and edges as calculated by brightway's GraphTraversal, which solves for every node
+    for index in (0, 1, 2):
+        node = result["nodes"][index]
+        demand = np.zeros(3)
+        demand[index] = lca.supply_array[index] * technosphere[index, index]
+        assert np.isclose(node["amount"], lca.supply_array[index])
+        assert np.isclose(node["cum"], lca.biosphere_matrix @ spsolve(technosphere, demand))
+    for edge in result["edges"][1:]:
+        child, parent = edge["from"], edge["to"]
+        assert np.isclose(edge["amount"], -technosphere[child, parent] * lca.supply_array[parent])
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+
+from activity_browser.bwutils.results_cache import ResultsCache, estimate_size
+
+
+def test_results_cache_eviction():
+    cache = ResultsCache("Test", max_size=3000)
+    namespace = cache.namespace("cs")
+    for i in range(3):
+        cache.put((namespace, i), np.zeros(125))  # 1000 bytes each
+
+    # using the first entry makes the second one the least recently used
+    assert cache.get((namespace, 0)) is not None
+    cache.put((namespace, 3), np.zeros(125))
+
+    assert (namespace, 1) not in cache
+    assert len(cache) == 3 and cache.size == 3000
+    assert cache.get((namespace, 1)) is None
+    assert (cache.hits, cache.misses, cache.evictions) == (1, 1, 1)
+
+
+def test_results_cache_invalidate():
+    cache = ResultsCache("Test")
+    first, second = cache.namespace("cs"), cache.namespace("cs")
+    assert first != second
+
+    cache.put((first, "sankey", 0), {"a": 1.0})
+    cache.put((second, "sankey", 0), {"a": 1.0})
+    cache.invalidate(first)
+
+    assert (first, "sankey", 0) not in cache
+    assert (second, "sankey", 0) in cache
+    assert cache.size == estimate_size({"a": 1.0})
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+import bw2data as bd
+import pandas as pd
+
+from activity_browser.bwutils import AB_metadata
+from activity_browser.bwutils.searchengine import MetaDataSearchEngine
+from activity_browser.ui.tables.models import ActivitiesBiosphereListModel
+
+
+class Store:
+    """Minimal stand-in for the MetaDataStore."""
+
+    def __init__(self, rows: list):
+        self.dataframe = pd.DataFrame(rows)
+        self.dataframe.index = pd.MultiIndex.from_tuples(self.dataframe["key"])
+        self.version = 1
+
+
+def make_store() -> Store:
+    return Store(
+        [
+            {"key": ("db1", "a"), "database": "db1", "name": "steel production", "reference product": "steel", "location": "GLO"},
+            {"key": ("db1", "b"), "database": "db1", "name": "market for steel", "reference product": "steel", "location": "RER"},
+            {"key": ("db2", "c"), "database": "db2", "name": "stainless steel", "reference product": "stainless", "location": "GLO"},
+            {"key": ("db2", "d"), "database": "db2", "name": "electricity", "reference product": "electricity", "location": "NL"},
+        ]
+    )
+
+
+def test_search_ranking():
+    engine = MetaDataSearchEngine(make_store())
+    result = engine.search("steel")
+
+    assert list(result["key"]) == [("db1", "a"), ("db1", "b"), ("db2", "c")]
+    assert result["score"].is_monotonic_decreasing
+
+
+def test_search_all_terms_and_databases():
+    engine = MetaDataSearchEngine(make_store())
+
+    assert list(engine.search("steel rer")["key"]) == [("db1", "b")]
+    assert list(engine.search("steel", databases=["db2"])["key"]) == [("db2", "c")]
+    assert engine.search("aluminium").empty
+    assert len(engine.search("steel", limit=2)) == 2
+
+
+def test_search_index_follows_store_version():
+    store = make_store()
+    engine = MetaDataSearchEngine(store)
+    assert engine.search("electricity")["key"].tolist() == [("db2", "d")]
+
+    store.dataframe = store.dataframe.iloc[:3]
+    store.version += 1
+    assert engine.search("electricity").empty
+
+    chunks = list(engine.iter_search("steel", chunk_size=2))
+    assert [len(c) for c in chunks] == [2, 1]
+
+
+def test_iter_search_keeps_ranked_rows():
+    store = make_store()
+    engine = MetaDataSearchEngine(store)
+    chunks = engine.iter_search("steel", chunk_size=1)
+    first = next(chunks)
+
+    # the store changing while the results are added doesn't mix up the rows
+    store.dataframe = store.dataframe.iloc[::-1]
+    store.version += 1
+    keys = [first["key"].iat[0]] + [c["key"].iat[0] for c in chunks]
+    assert keys == [("db1", "a"), ("db1", "b"), ("db2", "c")]
+
+
+def test_project_search_model(ab_app, qtbot):
+    name = bd.get_activity(("activity_tests", "834c9010dff24c138c8ffa19924e5935"))["name"]
+    model = ActivitiesBiosphereListModel()
+    model.RESULT_BATCH_SIZE = 1
+
+    # the ranked results of all databases are added to the model one batch at a time
+    inserted = []
+    model.rowsInserted.connect(lambda parent, first, last: inserted.append(last - first + 1))
+    with qtbot.waitSignal(model.searched, timeout=10 * 1000):
+        model.search_project(name)
+
+    expected = AB_metadata.search(name)["key"].tolist()
+    assert model._dataframe["key"].tolist() == expected
+    assert inserted == [1] * len(expected)
+    assert model.project_search
+
+    model.clear()
+    assert not model.project_search and model.results is None
@@ -0,0 +1,17 @@
+# -*- coding: utf-8 -*-
+import bw2data as bd
+import pandas as pd
+
+from activity_browser.bwutils.superstructure import SUPERSTRUCTURE
+from activity_browser.bwutils.superstructure.activities import (
+    data_from_index, data_from_indices)
+from activity_browser.bwutils.utils import Index
+
+
+def test_data_from_indices(ab_app):
+    act = bd.get_activity(("activity_tests", "3fcde3e3bf424e97b32cf29347ac7f33"))
+    indices = [Index.build_from_exchange(exc._document) for exc in act.exchanges()]
+
+    df = data_from_indices(indices)
+    expected = pd.DataFrame(map(data_from_index, indices), columns=SUPERSTRUCTURE)
+    pd.testing.assert_frame_equal(df, expected)
@@ -1,7 +1,11 @@
 # -*- coding: utf-8 -*-
+import multiprocessing
+
+import pytest
 from PySide2 import QtCore, QtWidgets
 
-from activity_browser.ui.wizards.db_import_wizard import DatabaseImportWizard
+from activity_browser.ui.wizards.db_import_wizard import (
+    ActivityBrowserExtractor, DatabaseImportWizard)
 
 #
 #
@@ -32,3 +36,20 @@ def test_open_db_wizard(ab_app, qtbot):
     qtbot.mouseClick(
         wizard.button(QtWidgets.QWizard.CancelButton), QtCore.Qt.LeftButton
     )
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(), reason="Requires forked worker processes"
+)
+def test_extract_parallel(tmp_path, monkeypatch):
+    """Files parsed in worker processes come back in the same order as when parsed one by one."""
+    file_list = [f"{i}.spold" for i in range(120)]
+    monkeypatch.setattr(
+        ActivityBrowserExtractor,
+        "extract_activity",
+        classmethod(lambda cls, dirpath, filename, db_name: {"filename": filename, "database": db_name}),
+    )
+
+    serial = ActivityBrowserExtractor.extract_serial(str(tmp_path), file_list, "db")
+    parallel = ActivityBrowserExtractor.extract_parallel(str(tmp_path), file_list, "db")
+    assert parallel == serial